@@ -11,22 +11,299 @@ import os
 import time
 import argparse
 import signal
+import threading
+import socket
+import struct
+import select
+import mmap
+import ctypes
 from datetime import datetime
 
 # Add parent directory to path to allow running script from examples directory
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Global flag for controlling capture
-running = True
+# Output buffering: packets are streamed to disk through a large write buffer
+# that is flushed on a timer rather than after every packet
+WRITE_BUFFER_SIZE = 1 << 20  # bytes
+FLUSH_INTERVAL = 2.0  # seconds
+STATUS_INTERVAL = 0.25  # seconds between status line updates
 
-def signal_handler(sig, frame):
-    """Handle interrupt signals."""
-    global running
-    running = False
-    print("\nStopping capture...")
+# O_DIRECT output: records are staged in a page-aligned buffer and written
+# in whole blocks, bypassing the page cache
+DIRECT_IO_BUFFER_SIZE = 1 << 20  # bytes
+DIRECT_IO_ALIGNMENT = 4096
+
+# Bytes kept from each packet; 96 is enough for headers-only captures
+DEFAULT_SNAPLEN = 65535
+
+# Linux PACKET_MMAP receive ring (see linux/if_packet.h)
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_VERSION = 10
+TPACKET_V2 = 1
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+ETH_P_ALL = 0x0003
+DLT_EN10MB = 1
+ARPHRD_ETHER = 1
+ARPHRD_LOOPBACK = 772
+ETHERNET_ARPHRD_TYPES = (ARPHRD_ETHER, ARPHRD_LOOPBACK)
+
+RING_BLOCK_SIZE = 1 << 22  # 4 MiB per block
+RING_BLOCK_COUNT = 16      # 64 MiB ring
+POLL_TIMEOUT_MS = 100
+
+TPACKET_REQ = struct.Struct("IIII")
+TPACKET2_HDR = struct.Struct("IIIHHIIHH4x")
+
+# Frame layout: the tpacket2 header and a sockaddr_ll, then the link header
+# placed so the network header starts aligned (see tpacket_rcv)
+TPACKET_ALIGNMENT = 16
+SOCKADDR_LL_SIZE = 20
+TPACKET2_HDRLEN = -(-TPACKET2_HDR.size // TPACKET_ALIGNMENT) * TPACKET_ALIGNMENT + SOCKADDR_LL_SIZE
+MIN_MAC_RESERVE = 16  # Link header room the kernel reserves at minimum
+ETH_HLEN = 14
+# sll_pkttype of the sockaddr_ll that follows the tpacket2 header
+SLL_PKTTYPE_OFFSET = TPACKET2_HDRLEN - SOCKADDR_LL_SIZE + 10
+TP_STATUS = struct.Struct("I")
+
+PCAP_GLOBAL_HEADER = struct.Struct("IHHiIII")
+PCAP_RECORD_HEADER = struct.Struct("IIII")
+PCAP_MAGIC = 0xa1b2c3d4
+
+# Classic BPF socket filters (see linux/filter.h)
+SO_ATTACH_FILTER = 26
+BPF_RET_K = 0x06  # BPF_RET | BPF_K
+
+class DirectPcapWriter:
+    """Minimal PCAP writer that bypasses the page cache with O_DIRECT.
+
+    Implements the subset of Scapy's PcapWriter interface used by this
+    script. The final partial block is padded for the write and the file
+    is truncated back to its real length on close.
+    """
+
+    def __init__(self, filename: str, linktype: int = None, snaplen: int = DEFAULT_SNAPLEN):
+        """Open the output file for direct I/O.
+
+        Args:
+            filename: Path to output PCAP file
+            linktype: Link type for the global header; taken from the first
+                packet if None
+            snaplen: Snapshot length recorded in the global header
+
+        Raises:
+            OSError: If the file cannot be opened with O_DIRECT
+        """
+        self.fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o644)
+        self.linktype = linktype
+        self.snaplen = snaplen
+        self.header_present = False
+        self._buf = mmap.mmap(-1, DIRECT_IO_BUFFER_SIZE)  # Page aligned
+        self._used = 0
+        self._offset = 0
+
+    def _append(self, data) -> None:
+        """Stage bytes, writing the buffer out each time it fills."""
+        view = memoryview(data)
+        while view:
+            count = min(len(view), DIRECT_IO_BUFFER_SIZE - self._used)
+            self._buf[self._used:self._used + count] = view[:count]
+            self._used += count
+            view = view[count:]
+            if self._used == DIRECT_IO_BUFFER_SIZE:
+                self._offset += os.pwrite(self.fd, self._buf, self._offset)
+                self._used = 0
+
+    def write_header(self, packet) -> None:
+        """Write the PCAP global header.
+
+        Args:
+            packet: First packet, used to infer the link type, or None
+        """
+        if self.linktype is None:
+            from scapy.config import conf
+            self.linktype = conf.l2types.layer2num.get(type(packet), DLT_EN10MB)
+        self._append(PCAP_GLOBAL_HEADER.pack(PCAP_MAGIC, 2, 4, 0, 0, self.snaplen, self.linktype))
+        self.header_present = True
+
+    def write_packet(self, packet, sec=None, usec: int = None,
+                     caplen: int = None, wirelen: int = None) -> None:
+        """Write one packet record.
+
+        Args:
+            packet: Raw packet bytes
+            sec: Capture time in seconds, fractional if ``usec`` is None
+            usec: Microseconds after ``sec``
+            caplen: Captured length, defaults to ``len(packet)``
+            wirelen: Original length on the wire, defaults to ``caplen``
+        """
+        if sec is None:
+            sec = time.time()
+        if usec is None:
+            usec = int((sec - int(sec)) * 1000000)
+        caplen = len(packet) if caplen is None else caplen
+        wirelen = caplen if wirelen is None else wirelen
+        self._append(PCAP_RECORD_HEADER.pack(int(sec), usec, caplen, wirelen))
+        self._append(packet)
+
+    def write(self, packet) -> None:
+        """Write a Scapy packet, emitting the global header first if needed."""
+        if not self.header_present:
+            self.write_header(packet)
+        self.write_packet(bytes(packet), sec=packet.time, wirelen=getattr(packet, "wirelen", None))
+
+    def flush(self) -> None:
+        """No-op: data reaches disk in whole blocks as the buffer fills."""
+
+    def close(self) -> None:
+        """Write the remaining partial block and close the file."""
+        if self.fd < 0:
+            return
+        try:
+            if self._used:
+                aligned = -(-self._used // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+                self._buf[self._used:aligned] = bytes(aligned - self._used)
+                with memoryview(self._buf) as view, view[:aligned] as block:
+                    os.pwrite(self.fd, block, self._offset)
+                self._offset += self._used
+                self._used = 0
+                os.ftruncate(self.fd, self._offset)
+        finally:
+            os.close(self.fd)
+            self.fd = -1
+            self._buf.close()
+
+def _interface_type(interface: str):
+    """Return an interface's ARPHRD link type, or None if it cannot be read."""
+    try:
+        with open(f"/sys/class/net/{interface}/type") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+def _mmap_capture_supported(interface: str) -> bool:
+    """Check whether an interface can be captured through a PACKET_MMAP ring."""
+    if not sys.platform.startswith("linux"):
+        return False
+    return _interface_type(interface) in ETHERNET_ARPHRD_TYPES
+
+def _attach_socket_filter(sock: socket.socket, bpf, snaplen: int):
+    """Attach a BPF program that also truncates frames to ``snaplen``.
+
+    Accepting returns of the compiled filter are clamped to ``snaplen`` so
+    the kernel truncates frames before they are copied to userspace. With
+    no filter a single accept-and-truncate instruction is attached.
+
+    Args:
+        sock: Packet socket to attach the program to
+        bpf: Compiled filter program, or None to accept all traffic
+        snaplen: Maximum number of bytes to keep from each frame
+    """
+    from scapy.libs.structures import bpf_insn, sock_fprog
+
+    if bpf is None:
+        insns = (bpf_insn * 1)(bpf_insn(BPF_RET_K, 0, 0, snaplen))
+    else:
+        insns = (bpf_insn * bpf.bf_len)()
+        for i in range(bpf.bf_len):
+            insn = bpf.bf_insns[i]
+            k = insn.k
+            if insn.code == BPF_RET_K and k:
+                k = min(k, snaplen)
+            insns[i] = bpf_insn(insn.code, insn.jt, insn.jf, k)
+
+    fprog = sock_fprog(len(insns), ctypes.cast(insns, ctypes.POINTER(bpf_insn)))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, bytes(fprog))
+
+def _tpacket_align(size: int) -> int:
+    """Round ``size`` up to a multiple of TPACKET_ALIGNMENT."""
+    return -(-size // TPACKET_ALIGNMENT) * TPACKET_ALIGNMENT
+
+def _ring_frame_size(snaplen: int) -> int:
+    """Return the smallest ring frame that holds ``snaplen`` bytes of an Ethernet frame.
+
+    The kernel cuts anything that runs past the end of the ring frame, so
+    the frame has to cover the header area plus the full snapshot.
+    """
+    mac_offset = _tpacket_align(TPACKET2_HDRLEN + MIN_MAC_RESERVE) - ETH_HLEN
+    return _tpacket_align(mac_offset + snaplen)
+
+def _capture_mmap(interface: str, writer, bpf, snaplen: int, should_stop, on_packet,
+                  wakeup_fd: int = None):
+    """Capture raw frames from a PACKET_MMAP receive ring.
+
+    Frames are copied from the kernel ring straight into the PCAP writer
+    without being dissected by Scapy.
+
+    Args:
+        interface: Network interface to capture from
+        writer: Open PcapWriter for the output file
+        bpf: Optional compiled BPF filter, attached to the socket
+        snaplen: Maximum number of bytes to keep from each frame
+        should_stop: Callable returning True when the capture should end
+        on_packet: Callable invoked after each written packet
+        wakeup_fd: Optional signal wakeup fd that interrupts the poll wait
+    """
+    # Protocol 0 receives nothing until the socket is bound, so no
+    # unfiltered frames can land in the ring during setup
+    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, 0)
+    try:
+        _attach_socket_filter(sock, bpf, snaplen)
+
+        # Frames never span blocks, so a block may end in unused space
+        frame_size = _ring_frame_size(snaplen)
+        block_size = max(RING_BLOCK_SIZE, -(-frame_size // mmap.PAGESIZE) * mmap.PAGESIZE)
+        frames_per_block = block_size // frame_size
+        frame_offsets = [block * block_size + i * frame_size
+                         for block in range(RING_BLOCK_COUNT)
+                         for i in range(frames_per_block)]
+        frame_count = len(frame_offsets)
+        sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V2)
+        sock.setsockopt(SOL_PACKET, PACKET_RX_RING, TPACKET_REQ.pack(
+            block_size, RING_BLOCK_COUNT, frame_size, frame_count))
+        ring = mmap.mmap(sock.fileno(), block_size * RING_BLOCK_COUNT,
+                         mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        sock.bind((interface, ETH_P_ALL))
+
+        poller = select.poll()
+        poller.register(sock, select.POLLIN | select.POLLERR)
+        if wakeup_fd is not None:
+            poller.register(wakeup_fd, select.POLLIN)
+        unpack_header = TPACKET2_HDR.unpack_from
+        release_frame = TP_STATUS.pack_into
+        # Loopback shows each packet as sent and again as received
+        skip_outgoing = _interface_type(interface) == ARPHRD_LOOPBACK
+
+        try:
+            frame = 0
+            while not should_stop():
+                offset = frame_offsets[frame]
+                status, wirelen, caplen, mac, _, sec, nsec, _, _ = unpack_header(ring, offset)
+                if not status & TP_STATUS_USER:
+                    poller.poll(POLL_TIMEOUT_MS)
+                    continue
+
+                written = not (skip_outgoing and
+                               ring[offset + SLL_PKTTYPE_OFFSET] == socket.PACKET_OUTGOING)
+                if written:
+                    start = offset + mac
+                    writer.write_packet(ring[start:start + caplen], sec=sec, usec=nsec // 1000,
+                                        caplen=caplen, wirelen=wirelen)
+
+                # Hand the frame back to the kernel
+                release_frame(ring, offset, TP_STATUS_KERNEL)
+                frame = (frame + 1) % frame_count
+                if written:
+                    on_packet()
+        finally:
+            ring.close()
+    finally:
+        sock.close()
 
 def capture_to_pcap(interface: str, output_file: str, duration: float = None,
-                   filter_str: str = None, packet_count: int = None):
+                   filter_str: str = None, packet_count: int = None,
+                   snaplen: int = DEFAULT_SNAPLEN, direct_io: bool = False):
     """Capture network traffic to a PCAP file.
 
     Args:
@@ -35,9 +312,13 @@ def capture_to_pcap(interface: str, output_file: str, duration: float = None,
         duration: Optional duration in seconds
         filter_str: Optional BPF filter string
         packet_count: Optional maximum number of packets to capture
+        snaplen: Maximum number of bytes to keep from each packet
+        direct_io: Write the output file with O_DIRECT, bypassing the page cache
     """
     try:
-        from scapy.all import sniff, wrpcap
+        from scapy.all import sniff
+        from scapy.utils import PcapWriter
+        from scapy.arch.common import compile_filter, free_filter
         import os
 
         # Ensure we have root privileges for capture
@@ -46,14 +327,98 @@ def capture_to_pcap(interface: str, output_file: str, duration: float = None,
             print("Please run with sudo or as root.")
             sys.exit(1)
 
-        # Set up signal handler
+        # Compile the filter up front so a bad expression fails before capture starts
+        bpf = None
+        if filter_str:
+            try:
+                bpf = compile_filter(filter_str, iface=interface)
+            except Exception as e:
+                print(f"Invalid filter '{filter_str}': {e}")
+                sys.exit(1)
+        else:
+            print("Warning: no filter given, all traffic will be passed to Python")
+
+        # Stop flag shared by the callbacks below; the signal handler sets it
+        # and the wakeup fd interrupts any blocking poll
+        stop = [False]
+
+        def signal_handler(sig, frame):
+            """Handle interrupt signals."""
+            stop[0] = True
+            print("\nStopping capture...")
+
         signal.signal(signal.SIGINT, signal_handler)
+        wakeup_r, wakeup_w = os.pipe()
+        os.set_blocking(wakeup_r, False)
+        os.set_blocking(wakeup_w, False)
+        previous_wakeup_fd = signal.set_wakeup_fd(wakeup_w)
+
+        start_time = time.monotonic()
+        captured = 0
+        last_status = 0.0
+
+        # Stream packets straight to the output file instead of keeping them in memory
+        use_mmap = _mmap_capture_supported(interface)
+        linktype = DLT_EN10MB if use_mmap else None
+        writer = None
+        if direct_io:
+            if hasattr(os, "O_DIRECT"):
+                try:
+                    writer = DirectPcapWriter(output_file, linktype=linktype, snaplen=snaplen)
+                except OSError as e:
+                    print(f"Direct I/O unavailable for {output_file} ({e}), using buffered writes")
+            else:
+                print("Direct I/O is not supported on this platform, using buffered writes")
+        if writer is None:
+            writer = PcapWriter(output_file, linktype=linktype, append=False, sync=False,
+                                snaplen=snaplen, bufsz=WRITE_BUFFER_SIZE)
+        flush_stop = threading.Event()
+
+        def flush_periodically():
+            """Flush buffered packets to disk at a fixed interval."""
+            while not flush_stop.wait(FLUSH_INTERVAL):
+                writer.flush()
+
+        stdout_fd = sys.stdout.fileno()
+
+        def record_packet():
+            """Count a written packet and print status (rate limited)."""
+            nonlocal captured, last_status
+            captured += 1
+            now = time.monotonic()
+            if now - last_status >= STATUS_INTERVAL:
+                # Raw write skips print's text layer and per-call flush
+                os.write(stdout_fd, b"\rCaptured %d packets" % captured)
+                last_status = now
+
+        def should_stop():
+            """Check whether the ring capture loop should end."""
+            if duration and (time.monotonic() - start_time) >= duration:
+                return True
+            return stop[0] or bool(packet_count and captured >= packet_count)
+
+        # Define packet callback
+        def packet_callback(packet):
+            # Check if we've reached the duration limit
+            if duration and (time.monotonic() - start_time) >= duration:
+                stop[0] = True
+                return
+
+            if len(packet) > snaplen:
+                if not writer.header_present:
+                    writer.write_header(packet)
+                raw = bytes(packet)
+                writer.write_packet(raw[:snaplen], sec=packet.time, wirelen=len(raw))
+            else:
+                writer.write(packet)
+            record_packet()
 
         # Prepare capture parameters
         kwargs = {
             'iface': interface,
-            'store': True,
-            'prn': lambda x: packet_callback(x),
+            'store': False,
+            'prn': packet_callback,
+            'stop_filter': lambda _: stop[0],
         }
 
         if filter_str:
@@ -70,41 +435,36 @@ def capture_to_pcap(interface: str, output_file: str, duration: float = None,
             print(f"Duration: {duration} seconds")
         if packet_count:
             print(f"Maximum packets: {packet_count}")
+        if snaplen != DEFAULT_SNAPLEN:
+            print(f"Snapshot length: {snaplen} bytes")
         print(f"Output file: {output_file}")
         print("Press Ctrl+C to stop capture")
+        # Status updates bypass sys.stdout, so push out anything it buffered
+        sys.stdout.flush()
 
-        start_time = time.time()
-        captured_packets = []
-
-        # Define packet callback
-        def packet_callback(packet):
-            global running
-
-            # Check if we've reached the duration limit
-            if duration and (time.time() - start_time) >= duration:
-                running = False
-                return
-
-            # Store packet
-            captured_packets.append(packet)
+        flush_thread = threading.Thread(target=flush_periodically, daemon=True)
+        flush_thread.start()
+        try:
+            if use_mmap:
+                writer.write_header(None)
+                _capture_mmap(interface, writer, bpf, snaplen, should_stop, record_packet,
+                              wakeup_fd=wakeup_r)
+            else:
+                sniff(**kwargs)
+        finally:
+            flush_stop.set()
+            flush_thread.join()
+            writer.close()
+            if bpf is not None:
+                free_filter(bpf)
+            signal.set_wakeup_fd(previous_wakeup_fd)
+            os.close(wakeup_r)
+            os.close(wakeup_w)
 
-            # Print status
-            print(f"\rCaptured {len(captured_packets)} packets", end="")
-
-            return running
-
-        # Start capture
-        packets = sniff(**kwargs)
-
-        # If we got here through count limit or manual stop
-        if not packets and captured_packets:
-            packets = captured_packets
-
-        # Write packets to PCAP file
-        if packets:
-            wrpcap(output_file, packets)
-            print(f"\nWrote {len(packets)} packets to {output_file}")
+        if captured:
+            print(f"\nWrote {captured} packets to {output_file}")
         else:
+            os.remove(output_file)
             print("\nNo packets captured")
 
     except ImportError:
@@ -141,6 +501,17 @@ def main():
         type=int,
         help="Maximum number of packets to capture"
     )
+    parser.add_argument(
+        "--direct-io",
+        action="store_true",
+        help="Write the output file with O_DIRECT, bypassing the page cache"
+    )
+    parser.add_argument(
+        "-s", "--snaplen",
+        type=int,
+        default=DEFAULT_SNAPLEN,
+        help=f"Bytes to keep from each packet (default: {DEFAULT_SNAPLEN}, use 96 for headers only)"
+    )
 
     args = parser.parse_args()
 
@@ -154,7 +525,9 @@ def main():
         output_file=args.output,
         duration=args.duration,
         filter_str=args.filter,
-        packet_count=args.count
+        packet_count=args.count,
+        snaplen=args.snaplen,
+        direct_io=args.direct_io
     )
 
 if __name__ == "__main__":
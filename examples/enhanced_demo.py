@@ -14,7 +14,12 @@ import threading
 import curses
 import random
 import signal
-from typing import Optional, Dict, List, Tuple
+import select
+import queue
+from bisect import bisect
+from collections import deque
+from itertools import accumulate
+from typing import Optional, Dict, List, Tuple, Deque
 import numpy as np
 import sounddevice as sd
 from datetime import datetime
@@ -23,39 +28,83 @@ from datetime import datetime
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from netaudio.capture import LiveCapture, PacketData
-from netaudio.processors import FeatureExtractor, WindowProcessor, DataNormalizer, FeatureSet
-from netaudio.audio import AudioMapper, Synthesizer
+from netaudio.processors import FeatureExtractor, WindowProcessor, DataNormalizer, FeatureSet, RollingPacketStats
+from netaudio.audio import AudioMapper, Synthesizer, AudioRingBuffer, AudioBufferPool
 from netaudio.utils import ConfigManager
 
+# Longest tone a pooled render buffer can hold
+MAX_TONE_DURATION = 1.0  # seconds
+RENDER_POOL_SIZE = 8
+
+# Seconds of rendered audio buffered ahead of the output callback
+AUDIO_BUFFER_DURATION = 2.0
+
+# Captured packets waiting for synthesis; newer packets are dropped when full
+PACKET_QUEUE_SIZE = 1024
+QUEUE_POLL_TIMEOUT = 0.1  # seconds
+MAX_BATCH_SIZE = 64  # Packets run through the feature pipeline together
+
+# Terminal UI refresh rate limit
+UI_REFRESH_INTERVAL = 1.0 / 30  # seconds
+
+# Static UI text, built once at import
+PROFILE_NAMES = ("ambient", "musical", "nature", "abstract", "alert")
+UI_HEADERS = {name: f" NetAudio Demo - Profile: {name.upper()} " for name in PROFILE_NAMES}
+UI_HELP = "Press 1-5 to change audio profile, 'q' to quit"
+UI_PROFILE_KEYS = "1: Ambient  2: Musical  3: Nature  4: Abstract  5: Alert"
+BAR_FULL = "█" * 512  # Sliced for the level bars instead of rebuilt per frame
+TCP_FLAG_NAMES = ("SYN", "ACK", "FIN", "RST", "PSH")
+
+# Protocol colors, filled in by init_curses once color pairs exist
+PROTO_COLOR: Dict[str, int] = {}
+DEFAULT_COLOR = 0
+
+# Formatted HH:MM:SS prefixes keyed by whole second
+TIMESTAMP_CACHE_SIZE = 64
+_ts_cache: Dict[int, str] = {}
+
 # Global variables for visualization
-packet_history = []
-audio_params_history = []
+packet_history: Deque[PacketData] = deque(maxlen=1000)
+packet_stats = RollingPacketStats(100)
+audio_params_history: Deque[Dict] = deque(maxlen=100)
 current_profile = "ambient"
-running = True
 stdscr = None  # For curses terminal UI
+_default_output = None  # Cached default output device info
+
+def get_default_output_device() -> Dict:
+    """Query the default output device once and make it the stream default.
 
-def setup_audio_stream(sample_rate: int = 44100) -> sd.OutputStream:
+    Returns:
+        Device info dictionary from sounddevice
+    """
+    global _default_output
+    if _default_output is None:
+        _default_output = sd.query_devices(kind='output')
+        sd.default.device = _default_output['index']
+    return _default_output
+
+def setup_audio_stream(sample_rate: int = 44100, callback=None) -> sd.OutputStream:
     """Set up audio output stream.
 
     Args:
         sample_rate: Audio sample rate in Hz
+        callback: Optional PortAudio callback; blocking write mode if None
 
     Returns:
         Audio output stream
     """
     try:
-        # Get default output device info
-        default_output = sd.query_devices(kind='output')
+        # Resolve the default output device (enumerated only once)
+        get_default_output_device()
 
-        # Configure stream with explicit device and blocksize
+        # Configure stream with explicit blocksize
         stream = sd.OutputStream(
-            device=default_output['index'],
             samplerate=sample_rate,
             channels=1,
             dtype=np.float32,
             blocksize=1024,
             latency='low',
-            callback=None  # Use blocking write mode
+            callback=callback
         )
         stream.start()
         return stream
@@ -65,7 +114,7 @@ def setup_audio_stream(sample_rate: int = 44100) -> sd.OutputStream:
         print(sd.query_devices())
         sys.exit(1)
 
-def setup_audio_permissions():
+def setup_audio_permissions(callback=None):
     """Set up audio permissions while maintaining capture privileges."""
     if os.geteuid() == 0:  # If we're root
         # Get SUDO_UID and SUDO_GID from environment
@@ -76,58 +125,79 @@ def setup_audio_permissions():
             # Create audio stream with original user permissions
             os.setegid(sudo_gid)
             os.seteuid(sudo_uid)
-            stream = setup_audio_stream(44100)
+            stream = setup_audio_stream(44100, callback)
             # Restore root privileges for capture
             os.seteuid(0)
             os.setegid(0)
             return stream
-    return setup_audio_stream(44100)
+    return setup_audio_stream(44100, callback)
 
-def generate_test_traffic(interface: str, intensity: str = "medium", duration: Optional[float] = None):
+def generate_test_traffic(interface: str, intensity: str = "medium", duration: Optional[float] = None,
+                          stop: Optional[List[bool]] = None):
     """Generate test network traffic for demonstration purposes.
 
     Args:
         interface: Network interface to use
         intensity: Traffic intensity (low, medium, high)
         duration: Optional duration in seconds
+        stop: Optional one-element stop flag; generation ends once it is True
     """
+    if stop is None:
+        stop = [False]
     try:
-        from scapy.all import send, IP, TCP, UDP, ICMP, RandIP, RandTCPPort, RandUDPPort
+        from scapy.all import send, IP, TCP, UDP, ICMP, Raw
 
         # Configure traffic parameters based on intensity
         if intensity == "low":
             packet_rate = 0.5  # packets per second
-            protocols = ["TCP", "UDP", "ICMP"]
-            weights = [0.7, 0.2, 0.1]  # Probability weights for each protocol
+            protocols = ("TCP", "UDP", "ICMP")
+            weights = (0.7, 0.2, 0.1)  # Probability weights for each protocol
         elif intensity == "medium":
             packet_rate = 2.0
-            protocols = ["TCP", "UDP", "ICMP"]
-            weights = [0.6, 0.3, 0.1]
+            protocols = ("TCP", "UDP", "ICMP")
+            weights = (0.6, 0.3, 0.1)
         else:  # high
             packet_rate = 5.0
-            protocols = ["TCP", "UDP", "ICMP"]
-            weights = [0.5, 0.4, 0.1]
-
-        start_time = time.time()
+            protocols = ("TCP", "UDP", "ICMP")
+            weights = (0.5, 0.4, 0.1)
+
+        # Cumulative weights for bisect-based protocol selection
+        cum_weights = list(accumulate(weights))
+        total_weight = cum_weights[-1]
+
+        tcp_ports = (80, 443, 8080, 22, 25, 3306)
+        tcp_flags = ("S", "A", "SA", "F", "FA", "R")
+        udp_ports = (53, 123, 161, 5353, 1900)
+        icmp_types = (0, 8, 3, 11)
+        payload_bytes = b"X" * 1000
+
+        # Template packets built once; only header fields change per packet
+        tcp_tmpl = IP(dst="127.0.0.1") / TCP()
+        udp_tmpl = IP(dst="127.0.0.1") / UDP() / Raw()
+        icmp_tmpl = IP(dst="127.0.0.1") / ICMP()
+        tcp_layer = tcp_tmpl[TCP]
+        udp_layer = udp_tmpl[UDP]
+        udp_payload = udp_tmpl[Raw]
+        icmp_layer = icmp_tmpl[ICMP]
+
+        start_time = time.monotonic()
 
         # Define packet generation functions
         def create_tcp_packet():
-            return IP(dst="127.0.0.1") / TCP(
-                sport=RandTCPPort(),
-                dport=random.choice([80, 443, 8080, 22, 25, 3306]),
-                flags=random.choice(["S", "A", "SA", "F", "FA", "R"])
-            )
+            tcp_layer.sport = random.randint(1024, 65535)
+            tcp_layer.dport = random.choice(tcp_ports)
+            tcp_layer.flags = random.choice(tcp_flags)
+            return tcp_tmpl
 
         def create_udp_packet():
-            return IP(dst="127.0.0.1") / UDP(
-                sport=RandUDPPort(),
-                dport=random.choice([53, 123, 161, 5353, 1900])
-            ) / ("X" * random.randint(10, 1000))
+            udp_layer.sport = random.randint(1024, 65535)
+            udp_layer.dport = random.choice(udp_ports)
+            udp_payload.load = payload_bytes[:random.randint(10, 1000)]
+            return udp_tmpl
 
         def create_icmp_packet():
-            return IP(dst="127.0.0.1") / ICMP(
-                type=random.choice([0, 8, 3, 11])
-            )
+            icmp_layer.type = random.choice(icmp_types)
+            return icmp_tmpl
 
         packet_creators = {
             "TCP": create_tcp_packet,
@@ -136,12 +206,12 @@ def generate_test_traffic(interface: str, intensity: str = "medium", duration: O
         }
 
         # Generate traffic until duration is reached
-        while running:
-            if duration and (time.time() - start_time) >= duration:
+        while not stop[0]:
+            if duration and (time.monotonic() - start_time) >= duration:
                 break
 
             # Select protocol based on weights
-            protocol = random.choices(protocols, weights=weights)[0]
+            protocol = protocols[bisect(cum_weights, random.random() * total_weight)]
             packet = packet_creators[protocol]()
 
             # Send packet
@@ -158,7 +228,7 @@ def generate_test_traffic(interface: str, intensity: str = "medium", duration: O
 
 def init_curses():
     """Initialize curses for terminal UI."""
-    global stdscr
+    global stdscr, DEFAULT_COLOR
     stdscr = curses.initscr()
     curses.noecho()
     curses.cbreak()
@@ -174,8 +244,30 @@ def init_curses():
     curses.init_pair(4, curses.COLOR_YELLOW, -1) # Other
     curses.init_pair(5, curses.COLOR_CYAN, -1)   # Headers
 
+    PROTO_COLOR.update({
+        "TCP": curses.color_pair(1),
+        "UDP": curses.color_pair(2),
+        "ICMP": curses.color_pair(3)
+    })
+    DEFAULT_COLOR = curses.color_pair(4)
+
     return stdscr
 
+def format_timestamp(timestamp: float) -> str:
+    """Format a packet timestamp as HH:MM:SS.mmm.
+
+    The whole-second part is cached, so strftime only runs once per second
+    of capture time instead of once per drawn packet.
+    """
+    sec = int(timestamp)
+    prefix = _ts_cache.get(sec)
+    if prefix is None:
+        if len(_ts_cache) >= TIMESTAMP_CACHE_SIZE:
+            _ts_cache.clear()
+        prefix = datetime.fromtimestamp(sec).strftime("%H:%M:%S")
+        _ts_cache[sec] = prefix
+    return f"{prefix}.{int((timestamp - sec) * 1000):03d}"
+
 def cleanup_curses():
     """Clean up curses settings."""
     if stdscr:
@@ -184,42 +276,40 @@ def cleanup_curses():
         curses.nocbreak()
         curses.endwin()
 
-def draw_ui(stdscr, packet_data: List[PacketData], audio_data: List[Dict], profile: str):
+def draw_ui(stdscr, packet_data: Deque[PacketData], audio_data: Deque[Dict], profile: str,
+            stats: Optional[RollingPacketStats] = None):
     """Draw the terminal UI using curses."""
     if not stdscr:
         return
 
     height, width = stdscr.getmaxyx()
-    stdscr.clear()
+    # erase() only blanks the buffer; clear() would force a full repaint
+    stdscr.erase()
 
     # Draw header
-    header = f" NetAudio Demo - Profile: {profile.upper()} "
+    header = UI_HEADERS.get(profile) or f" NetAudio Demo - Profile: {profile.upper()} "
     stdscr.addstr(0, (width - len(header)) // 2, header, curses.color_pair(5) | curses.A_BOLD)
 
     # Draw instructions
-    stdscr.addstr(1, 2, "Press 1-5 to change audio profile, 'q' to quit", curses.A_BOLD)
-    stdscr.addstr(2, 2, "1: Ambient  2: Musical  3: Nature  4: Abstract  5: Alert", curses.A_BOLD)
+    stdscr.addstr(1, 2, UI_HELP, curses.A_BOLD)
+    stdscr.addstr(2, 2, UI_PROFILE_KEYS, curses.A_BOLD)
 
     # Draw packet visualization
     stdscr.addstr(4, 2, "Recent Network Activity:", curses.A_BOLD)
 
+    # Copy the deque in one call before slicing; the capture thread keeps appending
+    recent = list(packet_data)[-10:]
+
     # Draw packet history (most recent first)
-    for i, packet in enumerate(reversed(packet_data[-10:])):
+    for i, packet in enumerate(reversed(recent)):
         if i >= height - 8:  # Ensure we don't exceed terminal height
             break
 
         # Select color based on protocol
-        if packet.protocol == "TCP":
-            color = curses.color_pair(1)
-        elif packet.protocol == "UDP":
-            color = curses.color_pair(2)
-        elif packet.protocol == "ICMP":
-            color = curses.color_pair(3)
-        else:
-            color = curses.color_pair(4)
+        color = PROTO_COLOR.get(packet.protocol, DEFAULT_COLOR)
 
         # Format packet info
-        timestamp = datetime.fromtimestamp(packet.timestamp).strftime("%H:%M:%S.%f")[:-3]
+        timestamp = format_timestamp(packet.timestamp)
         if packet.src_port and packet.dst_port:
             packet_info = f"{timestamp} | {packet.protocol:4} | Size: {packet.size:5} bytes | {packet.src_port:5} → {packet.dst_port:5}"
         else:
@@ -227,18 +317,8 @@ def draw_ui(stdscr, packet_data: List[PacketData], audio_data: List[Dict], profi
 
         # Add flags for TCP
         if packet.protocol == "TCP" and packet.flags:
-            flag_str = " | Flags: "
-            if packet.flags.get("SYN"):
-                flag_str += "SYN "
-            if packet.flags.get("ACK"):
-                flag_str += "ACK "
-            if packet.flags.get("FIN"):
-                flag_str += "FIN "
-            if packet.flags.get("RST"):
-                flag_str += "RST "
-            if packet.flags.get("PSH"):
-                flag_str += "PSH "
-            packet_info += flag_str
+            flags = packet.flags
+            packet_info += " | Flags: " + " ".join(name for name in TCP_FLAG_NAMES if flags.get(name))
 
         stdscr.addstr(5 + i, 2, packet_info, color)
 
@@ -258,59 +338,52 @@ def draw_ui(stdscr, packet_data: List[PacketData], audio_data: List[Dict], profi
         amp_normalized = latest.get('amplitude', 0.5)
 
         stdscr.addstr(height - 7, 2, "Frequency: ")
-        stdscr.addstr(height - 7, 13, "█" * int(freq_normalized * bar_width))
+        stdscr.addstr(height - 7, 13, BAR_FULL[:int(freq_normalized * bar_width)])
 
         stdscr.addstr(height - 6, 2, "Amplitude: ")
-        stdscr.addstr(height - 6, 13, "█" * int(amp_normalized * bar_width))
+        stdscr.addstr(height - 6, 13, BAR_FULL[:int(amp_normalized * bar_width)])
 
     # Draw footer with stats
-    if packet_data:
-        total_bytes = sum(p.size for p in packet_data[-100:])
-        protocols = {}
-        for p in packet_data[-100:]:
-            protocols[p.protocol] = protocols.get(p.protocol, 0) + 1
+    if stats:
+        stdscr.addstr(height - 2, 2, stats.summary())
 
-        stats = f"Last 100 packets: {total_bytes} bytes | "
-        for proto, count in protocols.items():
-            stats += f"{proto}: {count} | "
+    # Stage the frame and push it to the terminal in one update
+    stdscr.noutrefresh()
+    curses.doupdate()
 
-        stdscr.addstr(height - 2, 2, stats.rstrip(" |"))
+_KEY_PROFILES = {
+    ord('1'): "ambient",
+    ord('2'): "musical",
+    ord('3'): "nature",
+    ord('4'): "abstract",
+    ord('5'): "alert"
+}
 
-    stdscr.refresh()
+def handle_keyboard_input(mapper) -> bool:
+    """Handle keyboard input for profile switching.
 
-def handle_keyboard_input(mapper):
-    """Handle keyboard input for profile switching."""
-    global current_profile, running, stdscr
+    Returns:
+        True if the user asked to quit
+    """
+    global current_profile, stdscr
 
     if not stdscr:
-        return
+        return False
 
     try:
         key = stdscr.getch()
-        if key == ord('q'):
-            running = False
-        elif key == ord('1'):
-            current_profile = "ambient"
-            mapper.set_profile(current_profile)
-        elif key == ord('2'):
-            current_profile = "musical"
-            mapper.set_profile(current_profile)
-        elif key == ord('3'):
-            current_profile = "nature"
-            mapper.set_profile(current_profile)
-        elif key == ord('4'):
-            current_profile = "abstract"
-            mapper.set_profile(current_profile)
-        elif key == ord('5'):
-            current_profile = "alert"
-            mapper.set_profile(current_profile)
-    except:
-        pass  # Ignore curses errors
-
-def signal_handler(sig, frame):
-    """Handle interrupt signals."""
-    global running
-    running = False
+    except curses.error:
+        return False
+    if key == -1:
+        return False
+    if key == ord('q'):
+        return True
+
+    profile = _KEY_PROFILES.get(key)
+    if profile:
+        current_profile = profile
+        mapper.set_profile(profile)
+    return False
 
 def run_demo(interface: str, profile: str = "ambient",
              generate_traffic: bool = False, traffic_intensity: str = "medium",
@@ -325,23 +398,31 @@ def run_demo(interface: str, profile: str = "ambient",
         duration: Optional monitoring duration in seconds
         use_curses: Whether to use curses for terminal UI
     """
-    global packet_history, audio_params_history, current_profile, running, stdscr
+    global packet_history, packet_stats, audio_params_history, current_profile, stdscr
 
     # Initialize variables
-    packet_history = []
-    audio_params_history = []
+    packet_history = deque(maxlen=1000)
+    packet_stats = RollingPacketStats(100)
+    audio_params_history = deque(maxlen=100)
     current_profile = profile
-    running = True
 
-    # Set up signal handler
+    # Stop flag shared by the worker threads; the signal handler sets it and
+    # the wakeup fd interrupts the UI loop's wait
+    stop = [False]
+
+    def signal_handler(sig, frame):
+        """Handle interrupt signals."""
+        stop[0] = True
+
     signal.signal(signal.SIGINT, signal_handler)
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    previous_wakeup_fd = signal.set_wakeup_fd(wakeup_w)
 
     # Load configuration
     config = ConfigManager()
 
-    # Set up audio output with proper permissions
-    audio_stream = setup_audio_permissions()
-
     # Initialize components
     capture = LiveCapture(interface=interface)
     extractor = FeatureExtractor()
@@ -355,6 +436,86 @@ def run_demo(interface: str, profile: str = "ambient",
 
     # Set audio profile
     mapper.set_profile(profile)
+    synth.warmup(profile)
+
+    # Rendered tones are queued here and drained by the audio callback
+    audio_ring = AudioRingBuffer(int(config.audio.sample_rate * AUDIO_BUFFER_DURATION))
+    render_pool = AudioBufferPool(RENDER_POOL_SIZE, int(config.audio.sample_rate * MAX_TONE_DURATION))
+    packet_queue: queue.Queue = queue.Queue(maxsize=PACKET_QUEUE_SIZE)
+    errors: List[Exception] = []
+
+    def audio_callback(outdata, frames, time_info, status):
+        """Feed the output device from the audio ring."""
+        audio_ring.read_into(outdata[:, 0])
+
+    def capture_loop():
+        """Producer: hand captured packets to the synthesis thread."""
+        try:
+            with capture.stream() as packets:
+                for packet in packets:
+                    if stop[0]:
+                        break
+                    packet_history.append(packet)
+                    packet_stats.add(packet)
+                    try:
+                        packet_queue.put_nowait(packet)
+                    except queue.Full:
+                        pass  # Synthesis is behind; never stall the capture
+        except Exception as e:
+            errors.append(e)
+            stop[0] = True
+
+    def synth_loop():
+        """Consumer: map packets to tones and queue them for playback."""
+        try:
+            while not stop[0]:
+                try:
+                    batch = [packet_queue.get(timeout=QUEUE_POLL_TIMEOUT)]
+                except queue.Empty:
+                    continue
+
+                # Take whatever else is already waiting, up to a full batch
+                while len(batch) < MAX_BATCH_SIZE:
+                    try:
+                        batch.append(packet_queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                # Extract and process features for the whole batch
+                features = extractor.extract_batch(batch)
+                normalizer.update_stats_batch(features)
+                normalized_features = normalizer.normalize_batch(features)
+
+                for audio_params in mapper.map_batch(normalized_features):
+                    if stop[0]:
+                        break
+
+                    # Store audio parameters for visualization
+                    audio_params_history.append({
+                        'frequency': audio_params.frequency,
+                        'amplitude': audio_params.amplitude,
+                        'waveform': audio_params.waveform,
+                        'duration': audio_params.duration
+                    })
+
+                    if audio_params.duration > MAX_TONE_DURATION:
+                        # Too long for a pooled buffer
+                        audio_ring.write(synth.generate(audio_params, clip=True))
+                        continue
+
+                    buffer = render_pool.acquire()
+                    try:
+                        audio_signal = synth.generate(audio_params, out=buffer, clip=True)
+                        audio_ring.write(audio_signal)
+                    finally:
+                        # The ring has copied the samples, so the buffer is free again
+                        render_pool.release(buffer)
+        except Exception as e:
+            errors.append(e)
+            stop[0] = True
+
+    # Set up audio output with proper permissions
+    audio_stream = setup_audio_permissions(audio_callback)
 
     # Initialize UI if using curses
     if use_curses:
@@ -368,7 +529,7 @@ def run_demo(interface: str, profile: str = "ambient",
     if generate_traffic:
         traffic_thread = threading.Thread(
             target=generate_test_traffic,
-            args=(interface, traffic_intensity, duration),
+            args=(interface, traffic_intensity, duration, stop),
             daemon=True
         )
         traffic_thread.start()
@@ -380,68 +541,54 @@ def run_demo(interface: str, profile: str = "ambient",
         print(f"Using {profile} audio profile")
         print("Press Ctrl+C to stop")
 
-    start_time = time.time()
+    # Capture and synthesis run on worker threads; this thread drives the UI
+    workers = [
+        threading.Thread(target=capture_loop, daemon=True),
+        threading.Thread(target=synth_loop, daemon=True)
+    ]
+    for worker in workers:
+        worker.start()
+
+    start_time = time.monotonic()
     try:
-        with capture.stream() as packets:
-            for packet in packets:
-                if not running:
-                    break
-
-                # Store packet for visualization
-                packet_history.append(packet)
-                if len(packet_history) > 1000:
-                    packet_history = packet_history[-1000:]
-
-                # Extract and process features
-                features = extractor.extract(packet)
-                normalizer.update_stats(features)
-                normalized_features = normalizer.normalize(features)
-
-                # Generate audio
-                audio_params = mapper.map_packet(normalized_features)
-
-                # Store audio parameters for visualization
-                audio_params_dict = {
-                    'frequency': audio_params.frequency,
-                    'amplitude': audio_params.amplitude,
-                    'waveform': audio_params.waveform,
-                    'duration': audio_params.duration
-                }
-                audio_params_history.append(audio_params_dict)
-                if len(audio_params_history) > 100:
-                    audio_params_history = audio_params_history[-100:]
-
-                # Generate and play audio
-                audio_signal = synth.generate(audio_params)
-                audio_signal = np.clip(audio_signal, -1.0, 1.0)
-                audio_stream.write(audio_signal.astype(np.float32))
-
-                # Handle keyboard input for profile switching
-                handle_keyboard_input(mapper)
-
-                # Update UI
-                if use_curses:
-                    draw_ui(stdscr, packet_history, audio_params_history, current_profile)
-                else:
-                    # Simple console output if not using curses
-                    protocol = packet.protocol
-                    size = packet.size
-                    freq = audio_params.frequency
-                    print(f"\r{protocol:4} | Size: {size:5} bytes | Freq: {freq:.1f} Hz | Profile: {current_profile}", end="")
-
-                # Check duration
-                if duration and (time.time() - start_time) >= duration:
-                    break
+        while not stop[0]:
+            # Handle keyboard input for profile switching
+            if handle_keyboard_input(mapper):
+                break
+
+            if use_curses:
+                draw_ui(stdscr, packet_history, audio_params_history, current_profile, packet_stats)
+            elif packet_history and audio_params_history:
+                # Simple console output if not using curses
+                packet = packet_history[-1]
+                freq = audio_params_history[-1]['frequency']
+                print(f"\r{packet.protocol:4} | Size: {packet.size:5} bytes | Freq: {freq:.1f} Hz | Profile: {current_profile}", end="")
+
+            # Check duration
+            if duration and (time.monotonic() - start_time) >= duration:
+                break
+
+            # Sleep until the next frame, waking early on a signal
+            if select.select([wakeup_r], [], [], UI_REFRESH_INTERVAL)[0]:
+                os.read(wakeup_r, 512)
 
     except Exception as e:
         print(f"\nError: {e}")
     finally:
         # Clean up
-        running = False
+        stop[0] = True
+        signal.set_wakeup_fd(previous_wakeup_fd)
+        os.close(wakeup_r)
+        os.close(wakeup_w)
+        audio_ring.close()
+        for worker in workers:
+            worker.join(timeout=1.0)
         if use_curses:
             cleanup_curses()
         audio_stream.stop()
         audio_stream.close()
+        for error in errors:
+            print(f"\nError: {error}")
         print("\nDemo stopped")
 
 def main():
@@ -13,7 +13,10 @@ import argparse
 import curses
 import threading
 import signal
-from typing import Optional, Dict, List
+import queue
+from collections import deque
+from dataclasses import replace
+from typing import Deque, Optional, Dict, List
 import numpy as np
 import sounddevice as sd
 from datetime import datetime
@@ -22,19 +25,67 @@ from datetime import datetime
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from netaudio.capture import PcapReader, PacketData
-from netaudio.processors import FeatureExtractor, WindowProcessor, DataNormalizer, FeatureSet
-from netaudio.audio import AudioMapper, Synthesizer
-from netaudio.utils import ConfigManager
+from netaudio.processors import FeatureExtractor, WindowProcessor, DataNormalizer, FeatureSet, RollingPacketStats
+from netaudio.audio import AudioMapper, Synthesizer, AudioRingBuffer
+from netaudio.utils import ConfigManager, SPSCQueue, pin_current_thread
+
+# Output device block size when fed from the audio ring
+AUDIO_BLOCKSIZE = 256
+
+# Longest tone rendered into the preallocated scratch buffer; longer tones allocate
+MAX_TONE_DURATION = 1.0  # seconds
+
+# Packets are read and processed in batches of up to this many
+PCAP_BATCH_SIZE = 256
+
+# File read buffer; larger buffers cut read() calls on big captures
+PCAP_READ_BUFFER_SIZE = 1 << 20
+
+# Batches read ahead of the DSP thread
+BATCH_QUEUE_SIZE = 4
+QUEUE_POLL_TIMEOUT = 0.1  # seconds
+
+# CPUs for the reader, DSP and audio threads; the audio thread also gets a
+# real-time priority when the process is allowed to set one
+READER_CPU = 0
+DSP_CPU = 1
+AUDIO_CPU = 2
+AUDIO_THREAD_PRIORITY = 50
+
+# Redraw and poll the keyboard at most this often, independent of packet rate
+UI_REFRESH_INTERVAL = 1.0 / 30  # seconds
+
+# History lengths kept for visualization
+PACKET_HISTORY_SIZE = 1000
+AUDIO_HISTORY_SIZE = 100
+
+# Sliced for the progress and level bars instead of rebuilt per frame
+BAR_FULL = "█" * 512
+BAR_EMPTY = "░" * 512
+
+# Protocol colors, filled in by init_curses once color pairs exist
+PROTO_COLOR: Dict[str, int] = {}
+DEFAULT_COLOR = 0
+
+# Formatted HH:MM:SS prefixes keyed by whole second
+TIMESTAMP_CACHE_SIZE = 64
+_ts_cache: Dict[int, str] = {}
 
 # Global variables for visualization
-packet_history = []
-audio_params_history = []
+packet_history: Deque[PacketData] = deque(maxlen=PACKET_HISTORY_SIZE)
+packet_stats = RollingPacketStats(100)
+audio_params_history: Deque[Dict] = deque(maxlen=AUDIO_HISTORY_SIZE)
 current_profile = "ambient"
 running = True
 stdscr = None  # For curses terminal UI
 
-def setup_audio_stream(sample_rate: int = 44100) -> sd.OutputStream:
-    """Set up audio output stream."""
+def setup_audio_stream(sample_rate: int = 44100, callback=None) -> sd.OutputStream:
+    """Set up audio output stream.
+
+    Args:
+        sample_rate: Audio sample rate in Hz
+        callback: Optional PortAudio callback; blocking write mode if None
+    """
     try:
         # Get default output device info
         default_output = sd.query_devices(kind='output')
@@ -45,9 +96,9 @@ def setup_audio_stream(sample_rate: int = 44100) -> sd.OutputStream:
             samplerate=sample_rate,
             channels=1,
             dtype=np.float32,
-            blocksize=1024,
+            blocksize=AUDIO_BLOCKSIZE if callback else 1024,
             latency='low',
-            callback=None  # Use blocking write mode
+            callback=callback
         )
         stream.start()
         return stream
@@ -59,7 +110,7 @@ def setup_audio_stream(sample_rate: int = 44100) -> sd.OutputStream:
 
 def init_curses():
     """Initialize curses for terminal UI."""
-    global stdscr
+    global stdscr, DEFAULT_COLOR
     stdscr = curses.initscr()
     curses.noecho()
     curses.cbreak()
@@ -75,8 +126,30 @@ def init_curses():
     curses.init_pair(4, curses.COLOR_YELLOW, -1) # Other
     curses.init_pair(5, curses.COLOR_CYAN, -1)   # Headers
 
+    PROTO_COLOR.update({
+        "TCP": curses.color_pair(1),
+        "UDP": curses.color_pair(2),
+        "ICMP": curses.color_pair(3)
+    })
+    DEFAULT_COLOR = curses.color_pair(4)
+
     return stdscr
 
+def format_timestamp(timestamp: float) -> str:
+    """Format a packet timestamp as HH:MM:SS.mmm.
+
+    The whole-second part is cached, so strftime only runs once per second
+    of capture time instead of once per drawn packet.
+    """
+    sec = int(timestamp)
+    prefix = _ts_cache.get(sec)
+    if prefix is None:
+        if len(_ts_cache) >= TIMESTAMP_CACHE_SIZE:
+            _ts_cache.clear()
+        prefix = datetime.fromtimestamp(sec).strftime("%H:%M:%S")
+        _ts_cache[sec] = prefix
+    return f"{prefix}.{int((timestamp - sec) * 1000):03d}"
+
 def cleanup_curses():
     """Clean up curses settings."""
     if stdscr:
@@ -85,14 +158,17 @@ def cleanup_curses():
         curses.nocbreak()
         curses.endwin()
 
-def draw_ui(stdscr, packet_data: List[PacketData], audio_data: List[Dict], profile: str,
-            pcap_file: str, speed: float, progress: float):
+def draw_ui(stdscr, packet_data: Deque[PacketData], audio_data: Deque[Dict], profile: str,
+            pcap_file: str, speed: float, progress: float,
+            stats: Optional[RollingPacketStats] = None):
     """Draw the terminal UI using curses."""
     if not stdscr:
         return
 
     height, width = stdscr.getmaxyx()
-    stdscr.clear()
+    # erase() only blanks the buffer, so curses sends just the changed cells;
+    # clear() would force a full repaint of the terminal
+    stdscr.erase()
 
     # Draw header
     header = f" NetAudio PCAP Player - Profile: {profile.upper()} "
@@ -105,9 +181,9 @@ def draw_ui(stdscr, packet_data: List[PacketData], audio_data: List[Dict], profi
     # Draw progress bar
     progress_width = width - 20
     progress_pos = int(progress * progress_width)
-    progress_bar = "█" * progress_pos + "░" * (progress_width - progress_pos)
     stdscr.addstr(2, 2, "Progress: ")
-    stdscr.addstr(2, 12, progress_bar)
+    stdscr.addstr(2, 12, BAR_FULL[:progress_pos])
+    stdscr.addstr(2, 12 + progress_pos, BAR_EMPTY[:progress_width - progress_pos])
     stdscr.addstr(2, width - 8, f"{progress*100:.1f}%")
 
     # Draw instructions
@@ -116,23 +192,19 @@ def draw_ui(stdscr, packet_data: List[PacketData], audio_data: List[Dict], profi
     # Draw packet visualization
     stdscr.addstr(5, 2, "Recent Packets:", curses.A_BOLD)
 
+    # Copy the deque in one call before slicing; the DSP thread keeps appending
+    recent = list(packet_data)[-10:]
+
     # Draw packet history (most recent first)
-    for i, packet in enumerate(reversed(packet_data[-10:])):
+    for i, packet in enumerate(reversed(recent)):
         if i >= height - 12:  # Ensure we don't exceed terminal height
             break
 
         # Select color based on protocol
-        if packet.protocol == "TCP":
-            color = curses.color_pair(1)
-        elif packet.protocol == "UDP":
-            color = curses.color_pair(2)
-        elif packet.protocol == "ICMP":
-            color = curses.color_pair(3)
-        else:
-            color = curses.color_pair(4)
+        color = PROTO_COLOR.get(packet.protocol, DEFAULT_COLOR)
 
         # Format packet info
-        timestamp = datetime.fromtimestamp(packet.timestamp).strftime("%H:%M:%S.%f")[:-3]
+        timestamp = format_timestamp(packet.timestamp)
         if packet.src_port and packet.dst_port:
             packet_info = f"{timestamp} | {packet.protocol:4} | Size: {packet.size:5} bytes | {packet.src_port:5} → {packet.dst_port:5}"
         else:
@@ -171,25 +243,33 @@ def draw_ui(stdscr, packet_data: List[PacketData], audio_data: List[Dict], profi
         amp_normalized = latest.get('amplitude', 0.5)
 
         stdscr.addstr(height - 7, 2, "Frequency: ")
-        stdscr.addstr(height - 7, 13, "█" * int(freq_normalized * bar_width))
+        stdscr.addstr(height - 7, 13, BAR_FULL[:int(freq_normalized * bar_width)])
 
         stdscr.addstr(height - 6, 2, "Amplitude: ")
-        stdscr.addstr(height - 6, 13, "█" * int(amp_normalized * bar_width))
+        stdscr.addstr(height - 6, 13, BAR_FULL[:int(amp_normalized * bar_width)])
 
     # Draw footer with stats
-    if packet_data:
-        total_bytes = sum(p.size for p in packet_data[-100:])
-        protocols = {}
-        for p in packet_data[-100:]:
-            protocols[p.protocol] = protocols.get(p.protocol, 0) + 1
-
-        stats = f"Last 100 packets: {total_bytes} bytes | "
-        for proto, count in protocols.items():
-            stats += f"{proto}: {count} | "
-
-        stdscr.addstr(height - 2, 2, stats.rstrip(" |"))
-
-    stdscr.refresh()
+    if stats:
+        stdscr.addstr(height - 2, 2, stats.summary())
+
+    # Stage the frame and push it to the terminal in one update
+    stdscr.noutrefresh()
+    curses.doupdate()
+
+_KEY_PROFILES = {
+    ord('1'): "ambient",
+    ord('2'): "musical",
+    ord('3'): "nature",
+    ord('4'): "abstract",
+    ord('5'): "alert"
+}
+
+_KEY_SPEED_STEPS = {
+    ord('+'): 0.1,
+    ord('='): 0.1,
+    ord('-'): -0.1,
+    ord('_'): -0.1
+}
 
 def handle_keyboard_input(mapper, speed_ref):
     """Handle keyboard input for profile switching and speed control."""
@@ -200,29 +280,23 @@ def handle_keyboard_input(mapper, speed_ref):
 
     try:
         key = stdscr.getch()
-        if key == ord('q'):
-            running = False
-        elif key == ord('1'):
-            current_profile = "ambient"
-            mapper.set_profile(current_profile)
-        elif key == ord('2'):
-            current_profile = "musical"
-            mapper.set_profile(current_profile)
-        elif key == ord('3'):
-            current_profile = "nature"
-            mapper.set_profile(current_profile)
-        elif key == ord('4'):
-            current_profile = "abstract"
-            mapper.set_profile(current_profile)
-        elif key == ord('5'):
-            current_profile = "alert"
-            mapper.set_profile(current_profile)
-        elif key == ord('+') or key == ord('='):
-            speed_ref[0] = min(10.0, speed_ref[0] + 0.1)
-        elif key == ord('-') or key == ord('_'):
-            speed_ref[0] = max(0.1, speed_ref[0] - 0.1)
-    except:
-        pass  # Ignore curses errors
+    except curses.error:
+        return
+    if key == -1:
+        return
+    if key == ord('q'):
+        running = False
+        return
+
+    profile = _KEY_PROFILES.get(key)
+    if profile:
+        current_profile = profile
+        mapper.set_profile(profile)
+        return
+
+    step = _KEY_SPEED_STEPS.get(key)
+    if step:
+        speed_ref[0] = min(10.0, max(0.1, speed_ref[0] + step))
 
 def signal_handler(sig, frame):
     """Handle interrupt signals."""
@@ -240,11 +314,12 @@ def play_pcap(pcap_file: str, profile: str = "ambient", speed: float = 1.0,
         loop: Whether to loop the PCAP file
         use_curses: Whether to use curses for terminal UI
     """
-    global packet_history, audio_params_history, current_profile, running, stdscr
+    global packet_history, packet_stats, audio_params_history, current_profile, running, stdscr
 
     # Initialize variables
-    packet_history = []
-    audio_params_history = []
+    packet_history = deque(maxlen=PACKET_HISTORY_SIZE)
+    packet_stats = RollingPacketStats(100)
+    audio_params_history = deque(maxlen=AUDIO_HISTORY_SIZE)
     current_profile = profile
     running = True
     speed_ref = [speed]  # Use a list to allow modification in handle_keyboard_input
@@ -255,11 +330,26 @@ def play_pcap(pcap_file: str, profile: str = "ambient", speed: float = 1.0,
     # Load configuration
     config = ConfigManager()
 
+    # Rendered tones are queued here and drained by the audio callback,
+    # sized to the next power of two above one second
+    audio_ring = AudioRingBuffer(1 << (config.audio.sample_rate - 1).bit_length())
+
+    audio_thread_pinned = [False]
+
+    def audio_callback(outdata, frames, time_info, status):
+        """Feed the output device from the audio ring."""
+        if not audio_thread_pinned[0]:
+            # Runs on the PortAudio thread, which only exists once the stream starts
+            audio_thread_pinned[0] = True
+            pin_current_thread(AUDIO_CPU, AUDIO_THREAD_PRIORITY)
+        audio_ring.read_into(outdata[:, 0])
+
     # Set up audio output
-    audio_stream = setup_audio_stream(config.audio.sample_rate)
+    audio_stream = setup_audio_stream(config.audio.sample_rate, audio_callback)
 
     # Initialize components
-    pcap_reader = PcapReader(filepath=pcap_file, loop=loop)
+    pcap_reader = PcapReader(filepath=pcap_file, loop=loop,
+                             read_buffer_size=PCAP_READ_BUFFER_SIZE)
     extractor = FeatureExtractor()
     window_proc = WindowProcessor(
         window_size=config.processing.window_size,
@@ -268,9 +358,11 @@ def play_pcap(pcap_file: str, profile: str = "ambient", speed: float = 1.0,
     normalizer = DataNormalizer(config.processing.feature_ranges)
     mapper = AudioMapper()
     synth = Synthesizer(sample_rate=config.audio.sample_rate)
+    scratch = np.empty(int(config.audio.sample_rate * MAX_TONE_DURATION), dtype=np.float32)
 
     # Set audio profile
     mapper.set_profile(profile)
+    synth.warmup(profile)
 
     # Initialize UI if using curses
     if use_curses:
@@ -286,59 +378,109 @@ def play_pcap(pcap_file: str, profile: str = "ambient", speed: float = 1.0,
         print(f"Using {profile} audio profile at {speed}x speed")
         print("Press Ctrl+C to stop")
 
+    # Packets flow reader -> DSP thread -> audio ring -> output callback
+    batch_queue = SPSCQueue(BATCH_QUEUE_SIZE)
+    processed_packets = 0
+    latest_params = [None]  # Last AudioParameters rendered, for the console status line
+    errors: List[Exception] = []
+
+    def dsp_worker():
+        """Turn queued packet batches into audio and feed the audio ring."""
+        global running
+        nonlocal processed_packets
+        pin_current_thread(DSP_CPU)
+        try:
+            while running:
+                try:
+                    batch = batch_queue.get(timeout=QUEUE_POLL_TIMEOUT)
+                except queue.Empty:
+                    if batch_queue.closed:
+                        break
+                    continue
+
+                # Extract, normalize and map the whole batch at once
+                features = extractor.extract_batch(batch)
+                normalizer.update_stats_batch(features)
+                normalized_features = normalizer.normalize_batch(features)
+                batch_params = mapper.map_batch(normalized_features)
+
+                for packet, audio_params in zip(batch.packets, batch_params):
+                    if not running:
+                        break
+                    latest_params[0] = audio_params
+
+                    # Store packet for visualization
+                    packet_history.append(packet)
+                    packet_stats.add(packet)
+
+                    # Store audio parameters for visualization
+                    audio_params_dict = {
+                        'frequency': audio_params.frequency,
+                        'amplitude': audio_params.amplitude,
+                        'waveform': audio_params.waveform,
+                        'duration': audio_params.duration
+                    }
+                    audio_params_history.append(audio_params_dict)
+
+                    # Playback speed shortens or stretches the rendered tone
+                    tone_params = replace(audio_params, duration=audio_params.duration / speed_ref[0])
+
+                    # Render into the scratch buffer; the ring copies the samples out
+                    out = scratch if tone_params.duration <= MAX_TONE_DURATION else None
+                    audio_signal = synth.generate(tone_params, out=out, clip=True)
+                    # Blocks while the ring is full, so the output device paces playback
+                    audio_ring.write(audio_signal)
+                    processed_packets += 1
+        except Exception as e:
+            errors.append(e)
+            running = False
+
+    dsp_thread = threading.Thread(target=dsp_worker, daemon=True)
+
     try:
         # Start the PCAP reader
         pcap_reader.start()
 
         # Get total packet count for progress calculation
         total_packets = pcap_reader._packet_count
-        processed_packets = 0
+        dsp_thread.start()
+        # Pin after starting the DSP thread so it does not inherit this mask
+        pin_current_thread(READER_CPU)
 
-        # Process packets
+        # Read packet batches and hand them to the DSP thread
+        batch = None
+        next_ui_t = time.monotonic()
         while running:
-            # Get next packet
-            packet = pcap_reader.get_packet()
+            if batch is None:
+                batch = pcap_reader.get_batch(PCAP_BATCH_SIZE)
 
-            if not packet:
+            if batch is None:
                 if loop:
                     # If looping, we should get more packets after a while
                     time.sleep(0.1)
-                    continue
+                elif dsp_thread.is_alive():
+                    # End of file: the DSP thread drains the queue, then exits
+                    batch_queue.close()
+                    time.sleep(UI_REFRESH_INTERVAL)
+                elif audio_ring.available:
+                    # Let the device play out what is still buffered
+                    time.sleep(UI_REFRESH_INTERVAL)
                 else:
-                    # End of file
                     break
-
-            # Store packet for visualization
-            packet_history.append(packet)
-            if len(packet_history) > 1000:
-                packet_history = packet_history[-1000:]
-
-            # Extract and process features
-            features = extractor.extract(packet)
-            normalizer.update_stats(features)
-            normalized_features = normalizer.normalize(features)
-
-            # Generate audio
-            audio_params = mapper.map_packet(normalized_features)
-
-            # Store audio parameters for visualization
-            audio_params_dict = {
-                'frequency': audio_params.frequency,
-                'amplitude': audio_params.amplitude,
-                'waveform': audio_params.waveform,
-                'duration': audio_params.duration
-            }
-            audio_params_history.append(audio_params_dict)
-            if len(audio_params_history) > 100:
-                audio_params_history = audio_params_history[-100:]
-
-            # Generate and play audio
-            audio_signal = synth.generate(audio_params)
-            audio_signal = np.clip(audio_signal, -1.0, 1.0)
-            audio_stream.write(audio_signal.astype(np.float32))
+            else:
+                try:
+                    batch_queue.put(batch, timeout=UI_REFRESH_INTERVAL)
+                    batch = None
+                except queue.Full:
+                    pass  # Retry the same batch after updating the UI
+
+            now = time.monotonic()
+            if now < next_ui_t:
+                continue
+            # Skip missed ticks instead of redrawing in a burst to catch up
+            next_ui_t = max(next_ui_t + UI_REFRESH_INTERVAL, now)
 
             # Calculate progress
-            processed_packets += 1
             progress = processed_packets / total_packets if total_packets > 0 else 0
 
             # Handle keyboard input for profile switching and speed control
@@ -347,31 +489,31 @@ def play_pcap(pcap_file: str, profile: str = "ambient", speed: float = 1.0,
             # Update UI
             if use_curses:
                 draw_ui(stdscr, packet_history, audio_params_history, current_profile,
-                        pcap_file, speed_ref[0], progress)
-            else:
+                        pcap_file, speed_ref[0], progress, packet_stats)
+            elif packet_history and latest_params[0] is not None:
                 # Simple console output if not using curses
-                protocol = packet.protocol
-                size = packet.size
-                freq = audio_params.frequency
-                print(f"\r{protocol:4} | Size: {size:5} bytes | Freq: {freq:.1f} Hz | "
+                last_packet = packet_history[-1]
+                freq = latest_params[0].frequency
+                print(f"\r{last_packet.protocol:4} | Size: {last_packet.size:5} bytes | Freq: {freq:.1f} Hz | "
                       f"Profile: {current_profile} | Speed: {speed_ref[0]:.1f}x | "
                       f"Progress: {progress*100:.1f}%", end="")
 
-            # Control playback speed
-            if audio_params.duration > 0 and speed_ref[0] > 0:
-                # Sleep for a fraction of the duration based on speed
-                time.sleep(audio_params.duration / speed_ref[0])
-
     except Exception as e:
         print(f"\nError: {e}")
     finally:
         # Clean up
         running = False
+        batch_queue.close()
+        audio_ring.close()  # Wake the DSP thread if it is waiting for space
+        if dsp_thread.is_alive():
+            dsp_thread.join(timeout=1.0)
         if use_curses:
             cleanup_curses()
         pcap_reader.stop()
         audio_stream.stop()
         audio_stream.close()
+        for error in errors:
+            print(f"\nError: {error}")
         print("\nPlayback stopped")
 
 def main():
@@ -7,20 +7,47 @@ import time
 import argparse
 import termios
 import tty
-from typing import Optional
+import select
+import queue
+import threading
+from typing import List, Optional
 import sounddevice as sd
 import numpy as np
 
 from netaudio.capture import LiveCapture
 from netaudio.processors import FeatureExtractor, WindowProcessor, DataNormalizer
-from netaudio.audio import AudioMapper, Synthesizer
-from netaudio.utils import ConfigManager
+from netaudio.audio import AudioMapper, Synthesizer, AudioRingBuffer
+from netaudio.utils import ConfigManager, SPSCQueue, pin_current_thread
 
-def setup_audio_stream(sample_rate: int = 44100) -> sd.OutputStream:
+# Output device block size when fed from the audio ring
+AUDIO_BLOCKSIZE = 256
+
+# Longest tone rendered into the preallocated scratch buffer; longer tones allocate
+MAX_TONE_DURATION = 1.0  # seconds
+
+# CPUs for the capture, DSP and audio threads; the audio thread also gets a
+# real-time priority when the process is allowed to set one
+CAPTURE_CPU = 0
+DSP_CPU = 1
+AUDIO_CPU = 2
+AUDIO_THREAD_PRIORITY = 50
+
+# Captured packets waiting for the DSP thread; newer packets are dropped when full
+PACKET_QUEUE_SIZE = 1024
+QUEUE_POLL_TIMEOUT = 0.1  # seconds
+
+# Minimum time between debug signal statistics lines
+DEBUG_PRINT_INTERVAL = 1.0  # seconds
+
+# Minimum time between keyboard polls from the capture loop
+KEY_POLL_INTERVAL = 0.05  # seconds
+
+def setup_audio_stream(sample_rate: int = 44100, callback=None) -> sd.OutputStream:
     """Set up audio output stream.
     
     Args:
         sample_rate: Audio sample rate in Hz
+        callback: Optional PortAudio callback; blocking write mode if None
         
     Returns:
         Audio output stream
@@ -38,9 +65,9 @@ def setup_audio_stream(sample_rate: int = 44100) -> sd.OutputStream:
             samplerate=sample_rate,
             channels=1,
             dtype=np.float32,
-            blocksize=1024,
+            blocksize=AUDIO_BLOCKSIZE if callback else 1024,
             latency='low',
-            callback=None  # Use blocking write mode
+            callback=callback
         )
         stream.start()
         print("Audio stream started successfully")
@@ -51,7 +78,7 @@ def setup_audio_stream(sample_rate: int = 44100) -> sd.OutputStream:
         print(sd.query_devices())
         sys.exit(1)
 
-def setup_audio_permissions():
+def setup_audio_permissions(callback=None):
     """Set up audio permissions while maintaining capture privileges."""
     if os.geteuid() == 0:  # If we're root
         # Get SUDO_UID and SUDO_GID from environment
@@ -62,26 +89,53 @@ def setup_audio_permissions():
             # Create audio stream with original user permissions
             os.setegid(sudo_gid)
             os.seteuid(sudo_uid)
-            stream = setup_audio_stream(44100)
+            stream = setup_audio_stream(44100, callback)
             # Restore root privileges for capture
             os.seteuid(0)
             os.setegid(0)
             return stream
-    return setup_audio_stream(44100)
+    return setup_audio_stream(44100, callback)
+
+def read_key() -> Optional[str]:
+    """Return a pending keypress without blocking, or None if there is none."""
+    if os.name == 'nt':
+        import msvcrt
+        if msvcrt.kbhit():
+            return msvcrt.getch().decode(errors="ignore")
+        return None
+    if select.select([sys.stdin], [], [], 0)[0]:
+        return os.read(sys.stdin.fileno(), 1).decode(errors="ignore")
+    return None
 
-def monitor_network(interface: str, profile: str = "ambient", duration: Optional[float] = None):
+def monitor_network(interface: str, profile: str = "ambient", duration: Optional[float] = None,
+                    debug: bool = False):
     """Monitor network traffic and generate audio in real-time.
     
     Args:
         interface: Network interface to monitor
         profile: Audio profile to use (ambient, musical, nature, abstract, alert)
         duration: Optional monitoring duration in seconds
+        debug: Print audio signal statistics about once per second
     """
     # Load configuration
     config = ConfigManager()
     
+    # Rendered tones are queued here and drained by the audio callback,
+    # sized to the next power of two above one second
+    audio_ring = AudioRingBuffer(1 << (config.audio.sample_rate - 1).bit_length())
+
+    audio_thread_pinned = [False]
+
+    def audio_callback(outdata, frames, time_info, status):
+        """Feed the output device from the audio ring."""
+        if not audio_thread_pinned[0]:
+            # Runs on the PortAudio thread, which only exists once the stream starts
+            audio_thread_pinned[0] = True
+            pin_current_thread(AUDIO_CPU, AUDIO_THREAD_PRIORITY)
+        audio_ring.read_into(outdata[:, 0])
+
     # Set up audio output with proper permissions
-    audio_stream = setup_audio_permissions()
+    audio_stream = setup_audio_permissions(audio_callback)
     
     # Initialize components
     capture = LiveCapture(interface=interface)
@@ -93,9 +147,11 @@ def monitor_network(interface: str, profile: str = "ambient", duration: Optional
     normalizer = DataNormalizer(config.processing.feature_ranges)
     mapper = AudioMapper()
     synth = Synthesizer(sample_rate=config.audio.sample_rate)
+    scratch = np.empty(int(config.audio.sample_rate * MAX_TONE_DURATION), dtype=np.float32)
     
     # Set audio profile
     mapper.set_profile(profile)
+    synth.warmup(profile)
     
     
     print(f"Monitoring network traffic on interface {interface}...")
@@ -118,65 +174,87 @@ def monitor_network(interface: str, profile: str = "ambient", duration: Optional
         "5": "alert"
     }
     
-    start_time = time.time()
-    try:
-        import threading
+    # Packets flow capture -> DSP thread -> audio ring -> output callback
+    packet_queue = SPSCQueue(PACKET_QUEUE_SIZE)
+    errors: List[Exception] = []
 
-        def get_key_windows():
-            """Get keypress for Windows systems."""
-            import msvcrt
+    def dsp_worker():
+        """Turn queued packets into audio and feed the audio ring."""
+        pin_current_thread(DSP_CPU)
+        last_debug_print = 0.0
+        try:
             while True:
-                if msvcrt.kbhit():
-                    key = msvcrt.getch().decode()
-                    if key in profile_map:
-                        new_profile = profile_map[key]
-                        mapper.set_profile(new_profile)
-                        print(f"\nSwitched to {new_profile} profile")
+                try:
+                    packet = packet_queue.get(timeout=QUEUE_POLL_TIMEOUT)
+                except queue.Empty:
+                    if packet_queue.closed:
+                        return
+                    continue
 
-        def get_key_unix():
-            """Get keypress for Unix-like systems."""
-            old_settings = termios.tcgetattr(sys.stdin.fileno())
-            try:
-                tty.setraw(sys.stdin.fileno())
-                while True:
-                    key = sys.stdin.read(1)
-                    if key in profile_map:
-                        new_profile = profile_map[key]
-                        mapper.set_profile(new_profile)
-                        print(f"\nSwitched to {new_profile} profile")
-                    elif key == '\x03':  # Ctrl+C
-                        raise KeyboardInterrupt
-            finally:
-                termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, old_settings)
-
-        # Start input handling thread based on OS
-        if os.name == 'nt':
-            input_thread = threading.Thread(target=get_key_windows, daemon=True)
-        else:
-            input_thread = threading.Thread(target=get_key_unix, daemon=True)
-        input_thread.start()
-        
-        with capture.stream() as packets:
-            for packet in packets:
                 # Extract and process features
                 features = extractor.extract(packet)
                 normalizer.update_stats(features)
                 normalized_features = normalizer.normalize(features)
-                
+            
                 # Generate audio
                 audio_params = mapper.map_packet(normalized_features)
-                audio_signal = synth.generate(audio_params)
-                
+                # Render into the scratch buffer, saturating to the valid range;
+                # the ring copies the samples out
+                out = scratch if audio_params.duration <= MAX_TONE_DURATION else None
+                audio_signal = synth.generate(audio_params, out=out, clip=True)
+            
                 # Play audio with debug info
                 try:
-                    # Ensure signal is in valid range
-                    audio_signal = np.clip(audio_signal, -1.0, 1.0)
-                    # Print signal stats
-                    if len(audio_signal) > 0:
-                        print(f"\rAudio signal - Min: {audio_signal.min():.2f}, Max: {audio_signal.max():.2f}, Mean: {audio_signal.mean():.2f}", end="")
-                    audio_stream.write(audio_signal.astype(np.float32))
+                    # Print signal stats, rate limited so they stay off the hot path
+                    if debug and len(audio_signal) > 0:
+                        now = time.monotonic()
+                        if now - last_debug_print >= DEBUG_PRINT_INTERVAL:
+                            last_debug_print = now
+                            print(f"\rAudio signal - Min: {audio_signal.min():.2f}, Max: {audio_signal.max():.2f}, Mean: {audio_signal.mean():.2f}", end="")
+                    # Never stall the pipeline on the device; drop what does not fit
+                    audio_ring.write(audio_signal, timeout=0)
                 except Exception as e:
                     print(f"\nError playing audio: {e}")
+        except Exception as e:
+            errors.append(e)
+            # Closing the queue stops the capture loop as well
+            packet_queue.close()
+
+    dsp_thread = threading.Thread(target=dsp_worker, daemon=True)
+
+    start_time = time.time()
+    old_settings = None
+    try:
+        # Keys are polled from the capture loop; cbreak mode delivers them
+        # unbuffered while Ctrl+C still raises KeyboardInterrupt
+        if os.name != 'nt' and sys.stdin.isatty():
+            old_settings = termios.tcgetattr(sys.stdin.fileno())
+            tty.setcbreak(sys.stdin.fileno())
+
+        dsp_thread.start()
+        # Pin after starting the DSP thread so it does not inherit this mask
+        pin_current_thread(CAPTURE_CPU)
+        
+        next_key_poll = time.monotonic()
+        with capture.stream() as packets:
+            for packet in packets:
+                if packet_queue.closed:
+                    break  # The DSP thread failed
+
+                # Hand off to the DSP thread; drop rather than stall capture
+                try:
+                    packet_queue.put(packet, timeout=0)
+                except queue.Full:
+                    pass
+
+                # Poll the keyboard a few times per second
+                now = time.monotonic()
+                if now >= next_key_poll:
+                    next_key_poll = now + KEY_POLL_INTERVAL
+                    new_profile = profile_map.get(read_key())
+                    if new_profile:
+                        mapper.set_profile(new_profile)
+                        print(f"\nSwitched to {new_profile} profile")
                 
                 # Check duration
                 if duration and (time.time() - start_time) >= duration:
@@ -185,8 +263,15 @@ def monitor_network(interface: str, profile: str = "ambient", duration: Optional
     except KeyboardInterrupt:
         print("\nStopping monitor...")
     finally:
+        if old_settings is not None:
+            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, old_settings)
+        packet_queue.close()
+        if dsp_thread.is_alive():
+            dsp_thread.join(timeout=1.0)
         audio_stream.stop()
         audio_stream.close()
+        for error in errors:
+            print(f"\nError: {error}")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -208,9 +293,14 @@ def main():
         type=float,
         help="Monitoring duration in seconds"
     )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Print audio signal statistics"
+    )
     
     args = parser.parse_args()
-    monitor_network(args.interface, args.profile, args.duration)
+    monitor_network(args.interface, args.profile, args.duration, debug=args.verbose)
 
 if __name__ == "__main__":
     main()
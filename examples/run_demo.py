@@ -11,13 +11,15 @@ import os
 import time
 import argparse
 import threading
-import subprocess
-import signal
 from typing import Optional
 
 # Add parent directory to path to allow running script from examples directory
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# The demo and the traffic generator run in this interpreter, sharing its imports
+import enhanced_demo
+import test_traffic_generator as traffic
+
 def run_demo(interface: str, profile: str = "ambient",
              traffic_mode: str = "basic", traffic_intensity: str = "medium",
              scenario: str = "normal", duration: Optional[float] = None):
@@ -39,55 +41,19 @@ def run_demo(interface: str, profile: str = "ambient",
         print("Please run with sudo or as root.")
         sys.exit(1)
 
-    # Build command for enhanced demo
-    demo_cmd = [
-        sys.executable,
-        os.path.join(os.path.dirname(__file__), "enhanced_demo.py"),
-        "-i", interface,
-        "-p", profile
-    ]
-
-    if duration:
-        demo_cmd.extend(["-d", str(duration)])
-
-    # Build command for traffic generator
+    # Select traffic generator
     if traffic_mode == "basic":
-        traffic_cmd = [
-            sys.executable,
-            os.path.join(os.path.dirname(__file__), "test_traffic_generator.py"),
-            "-i", interface,
-            "-m", "basic",
-            "--intensity", traffic_intensity
-        ]
+        traffic_target = traffic.generate_basic_traffic
+        traffic_args = (interface, traffic_intensity, duration)
     elif traffic_mode == "port-scan":
-        traffic_cmd = [
-            sys.executable,
-            os.path.join(os.path.dirname(__file__), "test_traffic_generator.py"),
-            "-i", interface,
-            "-m", "port-scan",
-            "--target", "127.0.0.1",
-            "--scan-type", "syn"
-        ]
+        traffic_target = traffic.generate_port_scan
+        traffic_args = (interface, "127.0.0.1", "syn", duration)
     elif traffic_mode == "data-transfer":
-        traffic_cmd = [
-            sys.executable,
-            os.path.join(os.path.dirname(__file__), "test_traffic_generator.py"),
-            "-i", interface,
-            "-m", "data-transfer",
-            "--size", "1.0",
-            "--protocol", "tcp"
-        ]
+        traffic_target = traffic.generate_data_transfer
+        traffic_args = (interface, 1.0, "tcp", duration)
     else:  # scenario
-        traffic_cmd = [
-            sys.executable,
-            os.path.join(os.path.dirname(__file__), "test_traffic_generator.py"),
-            "-i", interface,
-            "-m", "scenario",
-            "--scenario", scenario
-        ]
-
-    if duration:
-        traffic_cmd.extend(["-d", str(duration)])
+        traffic_target = traffic.generate_mixed_scenario
+        traffic_args = (interface, scenario, duration)
 
     # Print demo information
     print("=" * 60)
@@ -105,8 +71,11 @@ def run_demo(interface: str, profile: str = "ambient",
     print("=" * 60)
     print("Starting traffic generator...")
 
-    # Start traffic generator in a separate process
-    traffic_process = subprocess.Popen(traffic_cmd)
+    # Start traffic generator in a background thread, stopped with the demo
+    stop = threading.Event()
+    traffic_thread = threading.Thread(target=traffic_target, args=traffic_args,
+                                      kwargs={"stop": stop}, daemon=True)
+    traffic_thread.start()
 
     # Give the traffic generator a moment to start
     time.sleep(1)
@@ -114,20 +83,12 @@ def run_demo(interface: str, profile: str = "ambient",
     print("Starting enhanced demo...")
     print("=" * 60)
 
-    # Start enhanced demo
-    demo_process = subprocess.Popen(demo_cmd)
-
-    # Wait for processes to complete
+    # The demo installs its own SIGINT handler, so it has to run on the main thread
     try:
-        demo_process.wait()
-    except KeyboardInterrupt:
-        print("\nStopping demo...")
+        enhanced_demo.run_demo(interface=interface, profile=profile, duration=duration)
     finally:
-        # Ensure both processes are terminated
-        if traffic_process.poll() is None:
-            traffic_process.terminate()
-        if demo_process.poll() is None:
-            demo_process.terminate()
+        stop.set()
+        traffic_thread.join(timeout=2.0)
 
     print("Demo completed.")
 
@@ -10,33 +10,193 @@ import sys
 import os
 import time
 import argparse
+import queue
 import random
+import itertools
 import threading
 import signal
-from typing import List, Dict, Optional, Tuple
+import socket
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Dict, Optional, Sequence, Tuple
+
+import numpy as np
 
 # Add parent directory to path to allow running script from examples directory
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Global flag for controlling traffic generation
-running = True
+from netaudio.utils import AliasSampler, SPSCQueue
+
+try:
+    # The inet layers are all the generators build; scapy.all would also load
+    # every other protocol and takes more than twice as long to import
+    from scapy.layers.inet import IP, TCP, UDP, ICMP
+    from scapy.packet import Raw
+    SCAPY_AVAILABLE = True
+except ImportError:
+    SCAPY_AVAILABLE = False
+
+# Default stop signal for the generators; the SIGINT handler sets it
+stop_event = threading.Event()
+
+# Packets are built and sent in bursts covering this many seconds, so one
+# socket and one send call serve the whole burst
+SEND_BATCH_INTERVAL = 1.0  # seconds
+
+# Packets built ahead of the sending loop by the builder thread
+PACKET_QUEUE_SIZE = 256
+QUEUE_POLL_TIMEOUT = 0.1  # seconds
+
+# Uniform random picks are drawn from numpy this many at a time
+CHOICE_BLOCK_SIZE = 1024
+
+# Shared payload bytes; packets slice this instead of building a new string
+PAYLOAD = b"X" * 1400
+
+def batch_size_for(packet_rate: float) -> int:
+    """Return how many packets to send per burst at the given rate."""
+    return max(1, int(packet_rate * SEND_BATCH_INTERVAL))
+
+def wait_for_next_burst(deadline: float, count: int, packet_rate: float,
+                        stop: threading.Event = stop_event) -> float:
+    """Sleep until ``count`` packets after ``deadline`` at ``packet_rate``.
+
+    Deadlines are kept on the monotonic clock, so the time spent building and
+    sending a burst comes out of its own slot instead of being added to it.
+    A sender that has fallen behind carries on from now rather than bursting
+    to catch up.
+
+    Args:
+        deadline: Monotonic time the burst just sent was due
+        count: Number of packets in that burst
+        packet_rate: Target packets per second
+        stop: Event that cuts the wait short when set
+
+    Returns:
+        Monotonic time the next burst is due
+    """
+    deadline += count / packet_rate
+    delay = deadline - time.monotonic()
+    if delay > 0:
+        stop.wait(delay)
+        return deadline
+    return deadline - delay
+
+def choice_stream(choices: Sequence[Any]) -> Iterator[Any]:
+    """Yield uniform random picks from ``choices`` forever.
+
+    Indices are drawn CHOICE_BLOCK_SIZE at a time with one numpy call,
+    instead of one random.choice call per pick.
+    """
+    rng = np.random.default_rng()
+    while True:
+        for i in rng.integers(len(choices), size=CHOICE_BLOCK_SIZE).tolist():
+            yield choices[i]
+
+def open_raw_socket(interface: str) -> socket.socket:
+    """Open a raw IPv4 socket for sending packets built from templates.
+
+    Args:
+        interface: Network interface to send on
+
+    Returns:
+        Socket that takes complete IP packets, header included
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+    if hasattr(socket, "SO_BINDTODEVICE"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, interface.encode())
+    return sock
+
+def with_tcp_dport(packet: bytes, port: int) -> bytes:
+    """Return a built IPv4/TCP packet with its destination port replaced.
+
+    The TCP checksum is updated incrementally (RFC 1624) for the changed
+    word, so the packet never goes back through scapy.
+
+    Args:
+        packet: Built IPv4 packet carrying a TCP segment
+        port: New destination port
+
+    Returns:
+        Patched copy of the packet
+    """
+    buf = bytearray(packet)
+    tcp = (buf[0] & 0x0F) * 4  # IP header length
+    old = int.from_bytes(buf[tcp + 2:tcp + 4], "big")
+    checksum = int.from_bytes(buf[tcp + 16:tcp + 18], "big")
+
+    # HC' = ~(~HC + ~m + m') in ones' complement arithmetic
+    total = (~checksum & 0xFFFF) + (~old & 0xFFFF) + port
+    total = (total & 0xFFFF) + (total >> 16)
+    total = (total & 0xFFFF) + (total >> 16)
+
+    buf[tcp + 2:tcp + 4] = port.to_bytes(2, "big")
+    buf[tcp + 16:tcp + 18] = (~total & 0xFFFF).to_bytes(2, "big")
+    return bytes(buf)
+
+def send_batch(sock: socket.socket, packets: List[bytes], dst: str) -> None:
+    """Send a burst of built IP packets to ``dst`` over a raw socket."""
+    for data in packets:
+        sock.sendto(data, (dst, 0))
+
+@contextmanager
+def packet_builder(create_packet: Callable[[], Any],
+                   stop: threading.Event = stop_event) -> Iterator[SPSCQueue]:
+    """Build packets on a worker thread ahead of the sending loop.
+
+    Args:
+        create_packet: Returns the next packet to queue
+        stop: Event that ends building when set
+
+    Yields:
+        Queue of built packets; it is closed once the builder stops
+    """
+    packets = SPSCQueue(PACKET_QUEUE_SIZE)
+
+    def builder():
+        try:
+            while not stop.is_set() and not packets.closed:
+                item = create_packet()
+                while True:
+                    try:
+                        packets.put(item, timeout=QUEUE_POLL_TIMEOUT)
+                        break
+                    except queue.Full:
+                        if stop.is_set() or packets.closed:
+                            return
+        finally:
+            packets.close()
+
+    thread = threading.Thread(target=builder, daemon=True)
+    thread.start()
+    try:
+        yield packets
+    finally:
+        packets.close()
+        thread.join(timeout=1.0)
+
+def require_scapy() -> None:
+    """Exit with an install hint if scapy could not be imported."""
+    if not SCAPY_AVAILABLE:
+        print("Scapy is required for traffic generation. Install with: pip install scapy")
+        sys.exit(1)
 
 def signal_handler(sig, frame):
     """Handle interrupt signals."""
-    global running
-    running = False
+    stop_event.set()
     print("\nStopping traffic generation...")
 
-def generate_basic_traffic(interface: str, intensity: str = "medium", duration: Optional[float] = None):
+def generate_basic_traffic(interface: str, intensity: str = "medium", duration: Optional[float] = None,
+                           stop: threading.Event = stop_event):
     """Generate basic test network traffic with mixed protocols.
 
     Args:
         interface: Network interface to use
         intensity: Traffic intensity (low, medium, high)
         duration: Optional duration in seconds
+        stop: Event that ends generation when set
     """
     try:
-        from scapy.all import send, IP, TCP, UDP, ICMP, RandIP, RandTCPPort, RandUDPPort
+        require_scapy()
 
         # Configure traffic parameters based on intensity
         if intensity == "low":
@@ -61,24 +221,38 @@ def generate_basic_traffic(interface: str, intensity: str = "medium", duration:
         start_time = time.time()
         packet_count = 0
 
+        # Layers are built once; each packet only updates the fields that vary
+        # and is serialized, with lengths and checksums recomputed on build
+        tcp_template = IP(dst="127.0.0.1") / TCP()
+        udp_template = IP(dst="127.0.0.1") / UDP() / Raw()
+        icmp_template = IP(dst="127.0.0.1") / ICMP()
+
+        # Random field values, drawn in blocks
+        source_ports = choice_stream(range(1, 65536))
+        tcp_ports = choice_stream([80, 443, 8080, 22, 25, 3306])
+        tcp_flags = choice_stream(["S", "A", "SA", "F", "FA", "R"])
+        udp_ports = choice_stream([53, 123, 161, 5353, 1900])
+        udp_sizes = choice_stream(range(10, 1001))
+        icmp_types = choice_stream([0, 8, 3, 11])
+
         # Define packet generation functions
         def create_tcp_packet():
-            return IP(dst="127.0.0.1") / TCP(
-                sport=RandTCPPort(),
-                dport=random.choice([80, 443, 8080, 22, 25, 3306]),
-                flags=random.choice(["S", "A", "SA", "F", "FA", "R"])
-            )
+            tcp = tcp_template[TCP]
+            tcp.sport = next(source_ports)
+            tcp.dport = next(tcp_ports)
+            tcp.flags = next(tcp_flags)
+            return tcp_template.build()
 
         def create_udp_packet():
-            return IP(dst="127.0.0.1") / UDP(
-                sport=RandUDPPort(),
-                dport=random.choice([53, 123, 161, 5353, 1900])
-            ) / ("X" * random.randint(10, 1000))
+            udp = udp_template[UDP]
+            udp.sport = next(source_ports)
+            udp.dport = next(udp_ports)
+            udp_template[Raw].load = PAYLOAD[:next(udp_sizes)]
+            return udp_template.build()
 
         def create_icmp_packet():
-            return IP(dst="127.0.0.1") / ICMP(
-                type=random.choice([0, 8, 3, 11])
-            )
+            icmp_template[ICMP].type = next(icmp_types)
+            return icmp_template.build()
 
         packet_creators = {
             "TCP": create_tcp_packet,
@@ -86,35 +260,45 @@ def generate_basic_traffic(interface: str, intensity: str = "medium", duration:
             "ICMP": create_icmp_packet
         }
 
-        # Generate traffic until duration is reached or interrupted
-        while running:
-            if duration and (time.time() - start_time) >= duration:
-                break
+        batch_size = batch_size_for(packet_rate)
+        protocol_sampler = AliasSampler(protocols, weights)
 
+        def create_packet():
             # Select protocol based on weights
-            protocol = random.choices(protocols, weights=weights)[0]
-            packet = packet_creators[protocol]()
+            protocol = protocol_sampler.draw()
+            return protocol, packet_creators[protocol]()
+
+        # Generate traffic until duration is reached or interrupted; packets
+        # are built on a worker thread while this one sends
+        next_send = time.monotonic()
+        with open_raw_socket(interface) as sock, packet_builder(create_packet, stop) as packets:
+            while not stop.is_set():
+                if duration and (time.time() - start_time) >= duration:
+                    break
+
+                try:
+                    batch = [packets.get() for _ in range(batch_size)]
+                except queue.Empty:
+                    break
 
-            # Send packet
-            send(packet, iface=interface, verbose=0)
-            packet_count += 1
+                # Send the burst over one socket
+                send_batch(sock, [data for _, data in batch], "127.0.0.1")
+                packet_count += len(batch)
 
-            # Print status update
-            elapsed = time.time() - start_time
-            print(f"\rGenerated {packet_count} packets ({protocol}) in {elapsed:.1f} seconds", end="")
+                # Print status update
+                elapsed = time.time() - start_time
+                print(f"\rGenerated {packet_count} packets ({batch[-1][0]}) in {elapsed:.1f} seconds", end="")
 
-            # Wait according to packet rate
-            time.sleep(1.0 / packet_rate)
+                # Wait according to packet rate
+                next_send = wait_for_next_burst(next_send, len(batch), packet_rate, stop)
 
         print(f"\nFinished generating {packet_count} packets in {time.time() - start_time:.1f} seconds")
 
-    except ImportError:
-        print("Scapy is required for traffic generation. Install with: pip install scapy")
-        sys.exit(1)
     except Exception as e:
         print(f"Error generating test traffic: {e}")
 
-def generate_port_scan(interface: str, target_ip: str = "127.0.0.1", scan_type: str = "syn", duration: Optional[float] = None):
+def generate_port_scan(interface: str, target_ip: str = "127.0.0.1", scan_type: str = "syn", duration: Optional[float] = None,
+                       stop: threading.Event = stop_event):
     """Generate port scan traffic.
 
     Args:
@@ -122,9 +306,10 @@ def generate_port_scan(interface: str, target_ip: str = "127.0.0.1", scan_type:
         target_ip: Target IP address
         scan_type: Type of scan (syn, connect, fin)
         duration: Optional duration in seconds
+        stop: Event that ends generation when set
     """
     try:
-        from scapy.all import send, IP, TCP, sr1
+        require_scapy()
 
         # Configure scan parameters
         if scan_type == "syn":
@@ -144,40 +329,42 @@ def generate_port_scan(interface: str, target_ip: str = "127.0.0.1", scan_type:
         print(f"Generating {scan_type} port scan on {target_ip} via {interface}")
         print(f"Scanning {len(ports)} ports at {packet_rate} packets/second")
 
+        # Build the probe once and patch in each port, so scapy is only
+        # involved before the scan starts
+        template = IP(dst=target_ip) / TCP(dport=0, flags=flags)
+        probes = {port: with_tcp_dport(template.build(), port) for port in ports}
+
         start_time = time.time()
         packet_count = 0
+        batch_size = batch_size_for(packet_rate)
+        port_cycle = itertools.cycle(ports)
+        next_send = time.monotonic()
 
         # Generate port scan traffic
-        while running:
-            if duration and (time.time() - start_time) >= duration:
-                break
-
-            # Cycle through ports
-            for port in ports:
-                if not running or (duration and (time.time() - start_time) >= duration):
+        with open_raw_socket(interface) as sock:
+            while not stop.is_set():
+                if duration and (time.time() - start_time) >= duration:
                     break
 
-                # Create and send packet
-                packet = IP(dst=target_ip) / TCP(dport=port, flags=flags)
-                send(packet, iface=interface, verbose=0)
-                packet_count += 1
+                # Cycle through ports, one burst at a time
+                batch_ports = list(itertools.islice(port_cycle, batch_size))
+                send_batch(sock, [probes[port] for port in batch_ports], target_ip)
+                packet_count += len(batch_ports)
 
                 # Print status update
                 elapsed = time.time() - start_time
-                print(f"\rScanned {packet_count} ports in {elapsed:.1f} seconds (current: {port})", end="")
+                print(f"\rScanned {packet_count} ports in {elapsed:.1f} seconds (current: {batch_ports[-1]})", end="")
 
                 # Wait according to packet rate
-                time.sleep(1.0 / packet_rate)
+                next_send = wait_for_next_burst(next_send, len(batch_ports), packet_rate, stop)
 
         print(f"\nFinished port scan with {packet_count} packets in {time.time() - start_time:.1f} seconds")
 
-    except ImportError:
-        print("Scapy is required for traffic generation. Install with: pip install scapy")
-        sys.exit(1)
     except Exception as e:
         print(f"Error generating port scan traffic: {e}")
 
-def generate_data_transfer(interface: str, size_mb: float = 1.0, protocol: str = "tcp", duration: Optional[float] = None):
+def generate_data_transfer(interface: str, size_mb: float = 1.0, protocol: str = "tcp", duration: Optional[float] = None,
+                           stop: threading.Event = stop_event):
     """Generate data transfer traffic.
 
     Args:
@@ -185,9 +372,10 @@ def generate_data_transfer(interface: str, size_mb: float = 1.0, protocol: str =
         size_mb: Size of data to transfer in MB
         protocol: Protocol to use (tcp, udp)
         duration: Optional duration in seconds
+        stop: Event that ends generation when set
     """
     try:
-        from scapy.all import send, IP, TCP, UDP
+        require_scapy()
 
         # Calculate packet parameters
         total_bytes = int(size_mb * 1024 * 1024)
@@ -207,52 +395,53 @@ def generate_data_transfer(interface: str, size_mb: float = 1.0, protocol: str =
         start_time = time.time()
         packet_count = 0
 
-        # Generate data transfer traffic
-        while running and packet_count < total_packets:
-            if duration and (time.time() - start_time) >= duration:
-                break
+        # The payload is a slice of the shared PAYLOAD bytes, built into one packet
+        if protocol.lower() == "tcp":
+            packet = (IP(dst="127.0.0.1") / TCP(dport=dst_port) / PAYLOAD[:packet_size]).build()
+        else:
+            packet = (IP(dst="127.0.0.1") / UDP(dport=dst_port) / PAYLOAD[:packet_size]).build()
 
-            # Create packet batch
-            batch_size = min(int(packet_rate), total_packets - packet_count)
-            if batch_size <= 0:
-                break
+        # Generate data transfer traffic
+        next_send = time.monotonic()
+        with open_raw_socket(interface) as sock:
+            while not stop.is_set() and packet_count < total_packets:
+                if duration and (time.time() - start_time) >= duration:
+                    break
 
-            for _ in range(batch_size):
-                # Create and send packet
-                if protocol.lower() == "tcp":
-                    packet = IP(dst="127.0.0.1") / TCP(dport=dst_port) / ("X" * packet_size)
-                else:
-                    packet = IP(dst="127.0.0.1") / UDP(dport=dst_port) / ("X" * packet_size)
+                # Create packet batch
+                batch_size = min(int(packet_rate), total_packets - packet_count)
+                if batch_size <= 0:
+                    break
 
-                send(packet, iface=interface, verbose=0)
-                packet_count += 1
+                # Every packet is identical, so the batch repeats one packet
+                send_batch(sock, [packet] * batch_size, "127.0.0.1")
+                packet_count += batch_size
 
-            # Print status update
-            elapsed = time.time() - start_time
-            mb_sent = (packet_count * packet_size) / (1024 * 1024)
-            print(f"\rSent {packet_count}/{total_packets} packets ({mb_sent:.2f}/{size_mb:.2f} MB) in {elapsed:.1f} seconds", end="")
+                # Print status update
+                elapsed = time.time() - start_time
+                mb_sent = (packet_count * packet_size) / (1024 * 1024)
+                print(f"\rSent {packet_count}/{total_packets} packets ({mb_sent:.2f}/{size_mb:.2f} MB) in {elapsed:.1f} seconds", end="")
 
-            # Wait according to packet rate
-            time.sleep(batch_size / packet_rate)
+                # Wait according to packet rate
+                next_send = wait_for_next_burst(next_send, batch_size, packet_rate, stop)
 
         print(f"\nFinished data transfer with {packet_count} packets in {time.time() - start_time:.1f} seconds")
 
-    except ImportError:
-        print("Scapy is required for traffic generation. Install with: pip install scapy")
-        sys.exit(1)
     except Exception as e:
         print(f"Error generating data transfer traffic: {e}")
 
-def generate_mixed_scenario(interface: str, scenario: str = "normal", duration: Optional[float] = None):
+def generate_mixed_scenario(interface: str, scenario: str = "normal", duration: Optional[float] = None,
+                            stop: threading.Event = stop_event):
     """Generate mixed traffic scenario.
 
     Args:
         interface: Network interface to use
         scenario: Scenario type (normal, busy, attack)
         duration: Optional duration in seconds
+        stop: Event that ends generation when set
     """
     try:
-        from scapy.all import send, IP, TCP, UDP, ICMP
+        require_scapy()
 
         # Configure scenario parameters
         if scenario == "normal":
@@ -307,54 +496,73 @@ def generate_mixed_scenario(interface: str, scenario: str = "normal", duration:
             udp_ports = [53, 123, 5353, 1900, 5004, 111, 137]
             udp_sizes = [64, 128, 256, 512, 1024, 1400]
 
-        # Generate traffic until duration is reached or interrupted
-        while running:
-            if duration and (time.time() - start_time) >= duration:
-                break
+        # Layers are built once; each packet only updates the fields that vary
+        tcp_template = IP(dst="127.0.0.1") / TCP()
+        udp_template = IP(dst="127.0.0.1") / UDP() / Raw()
+        icmp_template = IP(dst="127.0.0.1") / ICMP()
 
-            # Determine packet type
-            packet_type = random.choices(
-                ["TCP", "UDP", "ICMP"],
-                weights=[tcp_weight, udp_weight, icmp_weight]
-            )[0]
+        # Weighted choices are drawn from tables built once per scenario
+        type_sampler = AliasSampler(["TCP", "UDP", "ICMP"], [tcp_weight, udp_weight, icmp_weight])
+        flag_sampler = AliasSampler(tcp_flags, tcp_weights)
 
+        batch_size = batch_size_for(packet_rate)
+        stats = ""
+
+        # Uniform field values, drawn in blocks
+        tcp_port_stream = choice_stream(tcp_ports)
+        udp_port_stream = choice_stream(udp_ports)
+        udp_size_stream = choice_stream(udp_sizes)
+        icmp_type_stream = choice_stream([0, 8, 3, 11])
+
+        def create_packet():
             # Create packet based on type and scenario
+            packet_type = type_sampler.draw()
             if packet_type == "TCP":
-                port = random.choice(tcp_ports)
-                flag = random.choices(tcp_flags, weights=tcp_weights)[0]
-                packet = IP(dst="127.0.0.1") / TCP(dport=port, flags=flag)
-                protocol_counts["TCP"] += 1
-            elif packet_type == "UDP":
-                port = random.choice(udp_ports)
-                size = random.choice(udp_sizes)
-                packet = IP(dst="127.0.0.1") / UDP(dport=port) / ("X" * size)
-                protocol_counts["UDP"] += 1
-            else:  # ICMP
-                if scenario == "attack" and random.random() < 0.7:
-                    # ICMP flood in attack scenario
-                    packet = IP(dst="127.0.0.1") / ICMP(type=8)
-                else:
-                    packet = IP(dst="127.0.0.1") / ICMP(type=random.choice([0, 8, 3, 11]))
-                protocol_counts["ICMP"] += 1
-
-            # Send packet
-            send(packet, iface=interface, verbose=0)
-            packet_count += 1
-
-            # Print status update
-            elapsed = time.time() - start_time
-            stats = f"TCP: {protocol_counts['TCP']}, UDP: {protocol_counts['UDP']}, ICMP: {protocol_counts['ICMP']}"
-            print(f"\rGenerated {packet_count} packets in {elapsed:.1f} seconds ({stats})", end="")
-
-            # Wait according to packet rate
-            time.sleep(1.0 / packet_rate)
+                tcp = tcp_template[TCP]
+                tcp.dport = next(tcp_port_stream)
+                tcp.flags = flag_sampler.draw()
+                return packet_type, tcp_template.build()
+            if packet_type == "UDP":
+                udp_template[UDP].dport = next(udp_port_stream)
+                udp_template[Raw].load = PAYLOAD[:next(udp_size_stream)]
+                return packet_type, udp_template.build()
+            if scenario == "attack" and random.random() < 0.7:
+                # ICMP flood in attack scenario
+                icmp_template[ICMP].type = 8
+            else:
+                icmp_template[ICMP].type = next(icmp_type_stream)
+            return packet_type, icmp_template.build()
+
+        # Generate traffic until duration is reached or interrupted; packets
+        # are built on a worker thread while this one sends
+        next_send = time.monotonic()
+        with open_raw_socket(interface) as sock, packet_builder(create_packet, stop) as packets:
+            while not stop.is_set():
+                if duration and (time.time() - start_time) >= duration:
+                    break
+
+                try:
+                    batch = [packets.get() for _ in range(batch_size)]
+                except queue.Empty:
+                    break
+                for packet_type, _ in batch:
+                    protocol_counts[packet_type] += 1
+
+                # Send the burst over one socket
+                send_batch(sock, [data for _, data in batch], "127.0.0.1")
+                packet_count += len(batch)
+
+                # Print status update
+                elapsed = time.time() - start_time
+                stats = f"TCP: {protocol_counts['TCP']}, UDP: {protocol_counts['UDP']}, ICMP: {protocol_counts['ICMP']}"
+                print(f"\rGenerated {packet_count} packets in {elapsed:.1f} seconds ({stats})", end="")
+
+                # Wait according to packet rate
+                next_send = wait_for_next_burst(next_send, len(batch), packet_rate, stop)
 
         print(f"\nFinished generating {packet_count} packets in {time.time() - start_time:.1f} seconds")
         print(f"Protocol distribution: {stats}")
 
-    except ImportError:
-        print("Scapy is required for traffic generation. Install with: pip install scapy")
-        sys.exit(1)
     except Exception as e:
         print(f"Error generating scenario traffic: {e}")
 
@@ -424,14 +632,15 @@ def main():
 
     args = parser.parse_args()
 
-    # Set up signal handler
-    signal.signal(signal.SIGINT, signal_handler)
-
-    # Check for root privileges
+    # Check for root privileges and scapy before setting anything up
     if os.geteuid() != 0:
         print("Root privileges are required for packet generation.")
         print("Please run with sudo or as root.")
         sys.exit(1)
+    require_scapy()
+
+    # Set up signal handler
+    signal.signal(signal.SIGINT, signal_handler)
 
     # Run selected traffic generation mode
     if args.mode == "basic":
@@ -10,10 +10,13 @@ import sys
 import os
 import time
 import random
+import functools
 import numpy as np
 import soundfile as sf
 from datetime import datetime
 
+from netaudio.utils import AliasSampler
+
 # Define packet types and their characteristics
 PACKET_TYPES = {
     "TCP_SYN": {"size_range": (40, 60), "frequency_range": (300, 400), "duration": 0.1},
@@ -46,6 +49,28 @@ AUDIO_PROFILES = {
     }
 }
 
+# Packet type ranges as arrays so a batch of packets maps to tones in one pass
+_TYPE_NAMES = list(PACKET_TYPES)
+_TYPE_INDEX = {name: i for i, name in enumerate(_TYPE_NAMES)}
+_SIZE_RANGES = np.array([info["size_range"] for info in PACKET_TYPES.values()], dtype=np.int64)
+_FREQ_RANGES = np.array([info["frequency_range"] for info in PACKET_TYPES.values()], dtype=np.float64)
+
+# Packets drawn and mapped to tones per vectorized step of the export
+EXPORT_BATCH_SIZE = 256
+
+# Reverb decay envelopes by (length, decay, sample rate); tone lengths are fixed
+# per packet type, so this stays small
+_DECAY_CACHE = {}
+
+# Tone frequencies are rounded to this step so repeated packets reuse a cached tone
+FREQ_BUCKET_HZ = 2.0
+
+# Number of distinct rendered tones kept in memory
+TONE_CACHE_SIZE = 512
+
+# Minimum time between progress line updates
+PROGRESS_INTERVAL = 0.1  # seconds
+
 class SimulatedPacket:
     """Simulated network packet."""
 
@@ -62,35 +87,84 @@ class SimulatedPacket:
         """String representation."""
         return f"{self.type} packet, {self.size} bytes, {datetime.fromtimestamp(self.timestamp).strftime('%H:%M:%S.%f')[:-3]}"
 
+def _phase(frequency, duration, sample_rate):
+    """Return the phase in cycles of each sample as a float32 array."""
+    phase = np.arange(int(sample_rate * duration), dtype=np.float32)
+    phase *= np.float32(frequency / sample_rate)
+    return phase
+
+def _wrap_phase(phase):
+    """Wrap a non-negative phase in cycles to [-0.5, 0.5) in place.
+
+    Same as ``phase - np.floor(phase + 0.5)`` without the temporary arrays.
+    """
+    phase += np.float32(0.5)
+    np.remainder(phase, np.float32(1.0), out=phase)
+    phase -= np.float32(0.5)
+
 def generate_sine_wave(frequency, duration, amplitude=0.5, sample_rate=44100):
     """Generate a sine wave."""
-    t = np.linspace(0, duration, int(sample_rate * duration))
-    return amplitude * np.sin(2 * np.pi * frequency * t)
+    phase = _phase(frequency, duration, sample_rate)
+    phase *= np.float32(2 * np.pi)
+    np.sin(phase, out=phase)
+    phase *= np.float32(amplitude)
+    return phase
 
 def generate_triangle_wave(frequency, duration, amplitude=0.5, sample_rate=44100):
     """Generate a triangle wave."""
-    t = np.linspace(0, duration, int(sample_rate * duration))
-    return amplitude * 2 * np.abs(2 * (t * frequency - np.floor(t * frequency + 0.5))) - amplitude
+    phase = _phase(frequency, duration, sample_rate)
+    # Fold the sawtooth in place: |2 * (x - round(x))| runs 0..1..0 per cycle
+    _wrap_phase(phase)
+    np.abs(phase, out=phase)
+    phase *= np.float32(4 * amplitude)
+    phase -= np.float32(amplitude)
+    return phase
 
 def generate_sawtooth_wave(frequency, duration, amplitude=0.5, sample_rate=44100):
     """Generate a sawtooth wave."""
-    t = np.linspace(0, duration, int(sample_rate * duration))
-    return amplitude * 2 * (t * frequency - np.floor(0.5 + t * frequency))
+    phase = _phase(frequency, duration, sample_rate)
+    _wrap_phase(phase)
+    phase *= np.float32(2 * amplitude)
+    return phase
+
+# Waveform name -> generator
+WAVE_GENERATORS = {
+    "sine": generate_sine_wave,
+    "triangle": generate_triangle_wave,
+    "sawtooth": generate_sawtooth_wave,
+}
+
+def _decay_envelope(length, decay, sample_rate):
+    """Return the cached exponential reverb decay envelope for a tone length."""
+    key = (length, decay, sample_rate)
+    envelope = _DECAY_CACHE.get(key)
+    if envelope is None:
+        envelope = np.arange(length, dtype=np.float32)
+        envelope *= np.float32(-1.0 / (decay * sample_rate))
+        np.exp(envelope, out=envelope)
+        _DECAY_CACHE[key] = envelope
+    return envelope
 
 def apply_reverb(signal, mix=0.3, decay=1.0, sample_rate=44100):
-    """Apply a simple reverb effect."""
+    """Apply a simple reverb effect, mixing it into ``signal`` in place."""
     if mix == 0:
         return signal
 
     # Create a simple delay-based reverb
     delay_samples = int(0.05 * sample_rate)  # 50ms delay
-    decay_factor = np.exp(-np.arange(len(signal)) / (decay * sample_rate))
+    if delay_samples >= len(signal):
+        signal *= 1 - mix
+        return signal
 
-    reverb = np.zeros_like(signal)
-    if delay_samples < len(signal):
-        reverb[delay_samples:] = signal[:-delay_samples] * decay_factor[:-delay_samples]
+    decay_factor = _decay_envelope(len(signal), decay, sample_rate)
+    reverb = np.empty_like(signal)
+    reverb[:delay_samples] = 0
+    np.multiply(signal[:-delay_samples], decay_factor[:-delay_samples], out=reverb[delay_samples:])
 
-    return (1 - mix) * signal + mix * reverb
+    signal *= 1 - mix
+    reverb *= mix
+    signal += reverb
+    return signal
 
 def packet_to_audio(packet, profile="ambient", sample_rate=44100):
     """Convert a packet to audio based on its characteristics and the selected profile."""
@@ -111,24 +185,76 @@ def packet_to_audio(packet, profile="ambient", sample_rate=44100):
     frequency = freq_range[0] + normalized_size * (freq_range[1] - freq_range[0])
     frequency *= profile_info["frequency_scale"]
 
+    # Steps this small are inaudible, so neighbouring sizes share one tone
+    freq_bucket = round(frequency / FREQ_BUCKET_HZ)
+
+    return _render_tone(packet.type, profile, freq_bucket, sample_rate), frequency
+
+@functools.lru_cache(maxsize=TONE_CACHE_SIZE)
+def _render_tone(packet_type, profile, freq_bucket, sample_rate):
+    """Render the reverb-applied tone for a packet type, profile and frequency bucket.
+
+    The result is shared between calls and therefore read-only.
+    """
+    profile_info = AUDIO_PROFILES[profile]
+    frequency = freq_bucket * FREQ_BUCKET_HZ
+
     # Get duration and amplitude
-    duration = packet_info["duration"]
+    duration = PACKET_TYPES[packet_type]["duration"]
     amplitude = profile_info["amplitude"]
 
-    # Generate waveform based on profile
-    if profile_info["waveform"] == "sine":
-        signal = generate_sine_wave(frequency, duration, amplitude, sample_rate)
-    elif profile_info["waveform"] == "triangle":
-        signal = generate_triangle_wave(frequency, duration, amplitude, sample_rate)
-    elif profile_info["waveform"] == "sawtooth":
-        signal = generate_sawtooth_wave(frequency, duration, amplitude, sample_rate)
-    else:
-        signal = generate_sine_wave(frequency, duration, amplitude, sample_rate)
+    # Generate waveform based on profile; unknown waveforms fall back to sine
+    generate = WAVE_GENERATORS.get(profile_info["waveform"], generate_sine_wave)
+    signal = generate(frequency, duration, amplitude, sample_rate)
 
     # Apply reverb
     signal = apply_reverb(signal, profile_info["reverb"], 1.0, sample_rate)
 
-    return signal, frequency
+    signal.flags.writeable = False
+    return signal
+
+def _pattern_sampler(pattern):
+    """Return a sampler of packet types for a traffic pattern."""
+    if pattern == "web_browsing":
+        # Simulate web browsing: mostly TCP, some small UDP
+        return AliasSampler(["TCP_SYN", "TCP_ACK", "TCP_DATA", "UDP_SMALL"], [0.1, 0.3, 0.5, 0.1])
+    if pattern == "port_scan":
+        # Simulate port scan: many TCP SYN packets
+        return AliasSampler(["TCP_SYN", "TCP_ACK"], [0.9, 0.1])
+    if pattern == "data_transfer":
+        # Simulate data transfer: mostly large TCP data packets
+        return AliasSampler(["TCP_SYN", "TCP_ACK", "TCP_DATA"], [0.05, 0.15, 0.8])
+    # Random pattern and anything unknown: every packet type equally likely
+    return AliasSampler(list(PACKET_TYPES), [1.0] * len(PACKET_TYPES))
+
+def _draw_packet_batch(sampler, profile, count, rng):
+    """Draw a batch of packets and map them to tone frequencies.
+
+    Vectorized equivalent of creating ``count`` SimulatedPackets and mapping
+    each one with packet_to_audio.
+
+    Args:
+        sampler: AliasSampler of packet type names
+        profile: Audio profile name
+        count: Number of packets to draw
+        rng: numpy Generator for the packet sizes
+
+    Returns:
+        Tuple of (packet types, sizes, frequencies) with one entry per packet
+    """
+    types = sampler.draw_many(count)
+    index = np.fromiter((_TYPE_INDEX[t] for t in types), dtype=np.intp, count=count)
+
+    size_lo, size_hi = _SIZE_RANGES[index].T
+    sizes = rng.integers(size_lo, size_hi, endpoint=True)
+
+    # Map size within the type's range onto its frequency range, then scale
+    freq_lo, freq_hi = _FREQ_RANGES[index].T
+    normalized_size = (sizes - size_lo) / (size_hi - size_lo)
+    frequencies = freq_lo + normalized_size * (freq_hi - freq_lo)
+    frequencies *= AUDIO_PROFILES[profile]["frequency_scale"]
+
+    return types, sizes, frequencies
 
 def export_audio_sample(output_file, duration=30, profile="ambient", pattern="random", sample_rate=44100):
     """Generate a network traffic audio sample and export it to a WAV file.
@@ -144,73 +270,57 @@ def export_audio_sample(output_file, duration=30, profile="ambient", pattern="ra
     print(f"Pattern: {pattern}")
     print(f"Output file: {output_file}")
 
-    # Create an empty audio buffer
-    audio_buffer = np.array([], dtype=np.float32)
+    # Preallocate the output with room for the last packet to run past the end
+    samples_needed = int(duration * sample_rate)
+    max_chunk = max(int(sample_rate * info["duration"]) for info in PACKET_TYPES.values())
+    audio_buffer = np.empty(samples_needed + max_chunk, dtype=np.float32)
+    write_pos = 0
+
+    # Packet type mix for the pattern, drawn from an alias table built once
+    packet_sampler = _pattern_sampler(pattern)
 
     # Simulate network traffic
+    rng = np.random.default_rng()
     start_time = time.time()
     packet_count = 0
+    last_progress = 0.0
 
     # Continue until we have enough audio
-    while len(audio_buffer) / sample_rate < duration:
-        # Generate packet based on pattern
-        if pattern == "random":
-            packet_type = random.choice(list(PACKET_TYPES.keys()))
-        elif pattern == "web_browsing":
-            # Simulate web browsing: mostly TCP, some small UDP
-            packet_type = random.choices(
-                ["TCP_SYN", "TCP_ACK", "TCP_DATA", "UDP_SMALL"],
-                weights=[0.1, 0.3, 0.5, 0.1]
-            )[0]
-        elif pattern == "port_scan":
-            # Simulate port scan: many TCP SYN packets
-            packet_type = random.choices(
-                ["TCP_SYN", "TCP_ACK"],
-                weights=[0.9, 0.1]
-            )[0]
-        elif pattern == "data_transfer":
-            # Simulate data transfer: mostly large TCP data packets
-            packet_type = random.choices(
-                ["TCP_SYN", "TCP_ACK", "TCP_DATA"],
-                weights=[0.05, 0.15, 0.8]
-            )[0]
-        else:
-            packet_type = random.choice(list(PACKET_TYPES.keys()))
-
-        # Create packet
-        packet = SimulatedPacket(packet_type)
-        packet_count += 1
-
-        # Convert to audio
-        audio_signal, frequency = packet_to_audio(packet, profile, sample_rate)
-
-        # Add to buffer
-        audio_buffer = np.append(audio_buffer, audio_signal)
-
-        # Print progress
-        progress = min(100, int(len(audio_buffer) / sample_rate / duration * 100))
-        print(f"\rProgress: {progress}% | Packets: {packet_count} | Current: {packet.type} | Size: {packet.size} bytes | Freq: {frequency:.1f} Hz", end="")
-
-        # Wait a bit between packets based on pattern
-        if pattern == "port_scan":
-            time.sleep(0.01)  # Fast packets for port scan
-        elif pattern == "data_transfer":
-            time.sleep(0.05)  # Steady stream for data transfer
-        else:
-            time.sleep(random.uniform(0.02, 0.1))  # Random timing for other patterns
+    while write_pos < samples_needed:
+        # Generate a batch of packets based on pattern
+        types, sizes, frequencies = _draw_packet_batch(packet_sampler, profile, EXPORT_BATCH_SIZE, rng)
+        freq_buckets = np.rint(frequencies / FREQ_BUCKET_HZ).astype(np.int64)
+
+        for packet_type, size, frequency, freq_bucket in zip(
+                types, sizes.tolist(), frequencies.tolist(), freq_buckets.tolist()):
+            if write_pos >= samples_needed:
+                break
+            packet_count += 1
+
+            # Convert to audio
+            audio_signal = _render_tone(packet_type, profile, freq_bucket, sample_rate)
+
+            # Add to buffer
+            audio_buffer[write_pos:write_pos + len(audio_signal)] = audio_signal
+            write_pos += len(audio_signal)
+
+            # Print progress at most every PROGRESS_INTERVAL, and always for the last packet
+            now = time.monotonic()
+            if now - last_progress >= PROGRESS_INTERVAL or write_pos >= samples_needed:
+                last_progress = now
+                progress = min(100, int(write_pos / samples_needed * 100))
+                print(f"\rProgress: {progress}% | Packets: {packet_count} | Current: {packet_type} | Size: {size} bytes | Freq: {frequency:.1f} Hz", end="", flush=True)
 
     # Trim to exact duration
-    samples_needed = int(duration * sample_rate)
-    if len(audio_buffer) > samples_needed:
-        audio_buffer = audio_buffer[:samples_needed]
+    audio_buffer = audio_buffer[:samples_needed]
 
-    # Normalize audio to prevent clipping
-    max_amplitude = np.max(np.abs(audio_buffer))
+    # Normalize audio to prevent clipping; min/max avoid a full-size abs() temporary
+    max_amplitude = max(audio_buffer.max(), -audio_buffer.min())
     if max_amplitude > 0:
-        audio_buffer = audio_buffer / max_amplitude * 0.9
+        audio_buffer *= np.float32(0.9 / max_amplitude)
 
-    # Write to WAV file
-    sf.write(output_file, audio_buffer, sample_rate)
+    # Write to WAV file; libsndfile quantizes the float32 samples to 16 bit
+    sf.write(output_file, audio_buffer, sample_rate, subtype="PCM_16")
 
     print(f"\nAudio sample exported to {output_file}")
     print(f"Duration: {duration} seconds")
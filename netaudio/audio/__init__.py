@@ -1,12 +1,20 @@
 """Audio synthesis and mapping module."""
 
-from typing import Dict, List, Optional, Tuple, Union, Any
+import sys
+from typing import Callable, Dict, List, Optional, Tuple, Union, Any
 import numpy as np
 from dataclasses import dataclass
-from ..processors import FeatureSet
+from ..capture import PROTOCOL_NAMES
+from ..processors import FeatureSet, FeatureBatch
 from .profiles import AudioProfile, AudioProfileManager
+from .buffers import AudioRingBuffer, AudioBufferPool
+from . import _synth_kernels
+from ._filters import quantize_wn, zero_phase_butter
 
-@dataclass
+# dataclass(slots=True) needs Python 3.10; older versions keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class AudioParameters:
     """Container for audio synthesis parameters."""
     frequency: float  # Base frequency in Hz
@@ -16,16 +24,30 @@ class AudioParameters:
     effects: Dict[str, Any]  # Audio effects parameters
     profile: Optional[str] = None  # Audio profile name
 
+# Periods within this many samples of a whole number are rendered as one
+# repeated cycle; see Synthesizer._render_periodic
+PERIOD_TOLERANCE = 1e-9
+
+# Waveforms rendered by a phase-continuous kernel
+_PERIODIC_KERNELS = {
+    "sine": _synth_kernels.sine,
+    "square": _synth_kernels.square,
+    "sawtooth": _synth_kernels.sawtooth,
+    "triangle": _synth_kernels.triangle
+}
+
 class Synthesizer:
     """Audio signal synthesizer."""
     
-    def __init__(self, sample_rate: int = 44100):
+    def __init__(self, sample_rate: int = 44100, dtype: Any = np.float32):
         """Initialize synthesizer.
         
         Args:
             sample_rate: Audio sample rate in Hz
+            dtype: Sample dtype of generated signals
         """
         self.sample_rate = sample_rate
+        self.dtype = np.dtype(dtype)
         self._supported_waveforms = {
             "sine": self._generate_sine,
             "square": self._generate_square,
@@ -35,16 +57,154 @@ class Synthesizer:
             "triangle": self._generate_triangle
         }
         self.profile_manager = AudioProfileManager()
+        self._phase = 0.0  # Carried across tones to avoid clicks between them
+        self._rng = np.random.default_rng()
+        # (id(profile), waveform) -> (profile, renderer); see _compile
+        self._compiled: Dict[Tuple[int, str], Tuple[AudioProfile, Callable]] = {}
 
-    def generate(self, params: AudioParameters) -> np.ndarray:
+    def generate(self, params: AudioParameters, out: Optional[np.ndarray] = None,
+                 clip: bool = False) -> np.ndarray:
         """Generate audio signal from parameters.
         
         Args:
             params: Audio parameters
+            out: Optional preallocated buffer to write the signal into
+            clip: Saturate samples to [-1, 1]; fused with the copy into ``out``
             
         Returns:
-            Audio signal as numpy array
+            Audio signal as numpy array (a view of ``out`` if given)
         """
+        profile, frequency, waveform = self._resolve(params)
+        signal = self._compile(profile, waveform)(frequency, params.duration, params.amplitude)
+
+        if out is not None:
+            if len(out) < len(signal):
+                raise ValueError(f"Output buffer too small: {len(out)} < {len(signal)} samples")
+            out = out[:len(signal)]
+            if clip:
+                np.clip(signal, -1.0, 1.0, out=out)
+            else:
+                np.copyto(out, signal)
+            return out
+
+        if clip:
+            np.clip(signal, -1.0, 1.0, out=signal)
+        return signal
+
+    def warmup(self, profile: Optional[str] = None, duration: float = 0.1) -> None:
+        """Render one short tone per waveform of a profile, discarding them.
+
+        The first tone of each profile and waveform otherwise pays for
+        designing filters, building decay tables and compiling the render
+        path, which would land on the first captured packet. The running
+        phase is left untouched.
+
+        Args:
+            profile: Profile name; the current profile if None
+            duration: Tone length in seconds, ideally the typical tone length
+        """
+        resolved = (self.profile_manager.get_profile(profile) if profile
+                    else self.profile_manager.get_current_profile())
+        low, high = resolved.frequency_range
+        phase = self._phase
+        for waveform in resolved.waveforms:
+            self.generate(AudioParameters(
+                frequency=(low + high) / 2, amplitude=0.5, waveform=waveform,
+                duration=duration, effects={}, profile=profile
+            ))
+        self._phase = phase
+
+    def generate_batch(self, params_list: List[AudioParameters],
+                       clip: bool = False) -> List[np.ndarray]:
+        """Generate audio signals for many parameter sets at once.
+
+        Tones that share a waveform, length and profile are rendered as rows of
+        one 2-D array, so the kernels, amplitude scaling and profile effects
+        run once per group rather than once per tone. Periodic tones continue
+        each other's phase in list order, as with repeated ``generate`` calls.
+
+        Args:
+            params_list: Audio parameters, one per tone
+            clip: Saturate samples to [-1, 1]
+
+        Returns:
+            One signal per entry of ``params_list``, in order. Signals from the
+            same group are row views of a shared array.
+        """
+        groups: Dict[tuple, List[int]] = {}
+        resolved = []
+        phases = np.zeros(len(params_list))
+        phase = self._phase
+        for i, params in enumerate(params_list):
+            profile, frequency, waveform = self._resolve(params)
+            count = int(self.sample_rate * params.duration)
+            amplitude = params.amplitude * profile.scaling.get('amplitude', 1.0)
+            resolved.append((profile, frequency, amplitude))
+
+            key = (waveform, count, id(profile))
+            if waveform in _PERIODIC_KERNELS:
+                phases[i] = phase
+                phase = _synth_kernels.end_phase(_PERIODIC_KERNELS[waveform], count,
+                                                 frequency, phase, self.sample_rate)
+            elif waveform == "filtered_noise":
+                # Each cutoff needs its own filter
+                key += (frequency,)
+            groups.setdefault(key, []).append(i)
+        self._phase = phase
+
+        signals: List[Optional[np.ndarray]] = [None] * len(params_list)
+        for key, rows in groups.items():
+            waveform, count = key[:2]
+            profile = resolved[rows[0]][0]
+            block = np.empty((len(rows), count), dtype=self.dtype)
+            if waveform in _PERIODIC_KERNELS:
+                frequencies = np.array([resolved[i][1] for i in rows], dtype=np.float64)
+                _PERIODIC_KERNELS[waveform](block, frequencies, phases[rows], self.sample_rate)
+            elif waveform == "noise":
+                _synth_kernels.noise(block, self._rng)
+            else:
+                _synth_kernels.uniform_noise(block, self._rng)
+                block = self._lowpass_noise(block, resolved[rows[0]][1])
+
+            block *= np.array([resolved[i][2] for i in rows], dtype=self.dtype)[:, None]
+            block = self.profile_manager.apply_profile(block, profile)
+            if clip:
+                np.clip(block, -1.0, 1.0, out=block)
+            for row, i in enumerate(rows):
+                signals[i] = block[row]
+
+        return signals
+
+    def _compile(self, profile: AudioProfile, waveform: str) -> Callable[[float, float, float], np.ndarray]:
+        """Return a renderer specialized for one profile and waveform.
+
+        The generator, amplitude scaling and the profile's effect chain are
+        looked up once, so rendering a tone is a direct call sequence.
+        """
+        key = (id(profile), waveform)
+        cached = self._compiled.get(key)
+        if cached is not None and cached[0] is profile:
+            return cached[1]
+
+        generator = self._supported_waveforms[waveform]
+        effects = self.profile_manager.effect_chain(profile)
+        scaling = profile.scaling
+
+        def render(frequency: float, duration: float, amplitude: float) -> np.ndarray:
+            # Generate base waveform
+            signal = generator(frequency, duration)
+
+            # Apply amplitude with profile scaling
+            signal *= amplitude * scaling.get('amplitude', 1.0)
+
+            # Apply profile effects
+            return effects(signal)
+
+        self._compiled[key] = (profile, render)
+        return render
+
+    def _resolve(self, params: AudioParameters) -> Tuple[AudioProfile, float, str]:
+        """Return the profile, constrained frequency and waveform for ``params``."""
         # Get active profile
         profile = None
         if params.profile:
@@ -53,11 +213,8 @@ class Synthesizer:
             profile = self.profile_manager.get_current_profile()
 
         # Apply profile frequency constraints
-        frequency = np.clip(
-            params.frequency,
-            profile.frequency_range[0],
-            profile.frequency_range[1]
-        )
+        low, high = profile.frequency_range
+        frequency = min(max(params.frequency, low), high)
 
         # Quantize to musical scale if available
         frequency = self.profile_manager.quantize_to_scale(frequency, profile)
@@ -70,61 +227,71 @@ class Synthesizer:
         if waveform not in self._supported_waveforms:
             raise ValueError(f"Unsupported waveform: {waveform}")
 
-        # Generate base waveform
-        generator = self._supported_waveforms[waveform]
-        signal = generator(frequency, params.duration)
-
-        # Apply amplitude with profile scaling
-        amplitude = params.amplitude * profile.scaling.get('amplitude', 1.0)
-        signal *= amplitude
+        return profile, frequency, waveform
 
-        # Apply profile effects
-        signal = self.profile_manager.apply_profile(signal, profile)
+    def _render_periodic(self, kernel, frequency: float, duration: float) -> np.ndarray:
+        """Render a periodic waveform kernel, continuing from the last tone's phase.
 
-        return signal
+        When a cycle spans a whole number of samples, only the first cycle is
+        rendered and the rest of the tone is copied from it.
+        """
+        count = int(self.sample_rate * duration)
+        out = np.empty(count, dtype=self.dtype)
+        period = self.sample_rate / frequency if frequency > 0 else 0.0
+        whole = round(period)
+        if whole and abs(period - whole) < PERIOD_TOLERANCE and count >= 2 * whole:
+            start = self._phase
+            kernel(out[:whole], frequency, start, self.sample_rate)
+            _synth_kernels.repeat_period(out, whole)
+            self._phase = _synth_kernels.end_phase(kernel, count, frequency, start, self.sample_rate)
+        else:
+            self._phase = kernel(out, frequency, self._phase, self.sample_rate)
+        return out
 
     def _generate_sine(self, frequency: float, duration: float) -> np.ndarray:
         """Generate sine wave."""
-        t = np.linspace(0, duration, int(self.sample_rate * duration))
-        return np.sin(2 * np.pi * frequency * t)
+        return self._render_periodic(_synth_kernels.sine, frequency, duration)
 
     def _generate_square(self, frequency: float, duration: float) -> np.ndarray:
         """Generate square wave."""
-        t = np.linspace(0, duration, int(self.sample_rate * duration))
-        return np.sign(np.sin(2 * np.pi * frequency * t))
+        return self._render_periodic(_synth_kernels.square, frequency, duration)
 
     def _generate_sawtooth(self, frequency: float, duration: float) -> np.ndarray:
         """Generate sawtooth wave."""
-        t = np.linspace(0, duration, int(self.sample_rate * duration))
-        return 2 * (t * frequency - np.floor(0.5 + t * frequency))
+        return self._render_periodic(_synth_kernels.sawtooth, frequency, duration)
 
     def _generate_noise(self, frequency: float, duration: float) -> np.ndarray:
         """Generate white noise."""
-        samples = int(self.sample_rate * duration)
-        return np.random.normal(0, 1, samples)
+        out = np.empty(int(self.sample_rate * duration), dtype=self.dtype)
+        _synth_kernels.noise(out, self._rng)
+        return out
 
     def _generate_filtered_noise(self, frequency: float, duration: float) -> np.ndarray:
         """Generate filtered noise."""
-        noise = self._generate_noise(frequency, duration)
-        
+        noise = np.empty(int(self.sample_rate * duration), dtype=self.dtype)
+        _synth_kernels.uniform_noise(noise, self._rng)
+        return self._lowpass_noise(noise, frequency)
+
+    def _lowpass_noise(self, noise: np.ndarray, frequency: float) -> np.ndarray:
+        """Low-pass ``noise`` (1-D, or one tone per row) at ``frequency``."""
         if frequency > 0:
-            from scipy import signal
             nyquist = self.sample_rate / 2
             cutoff = min(frequency, nyquist)
-            b, a = signal.butter(4, cutoff/nyquist)
-            noise = signal.filtfilt(b, a, noise)
+            # The cutoff follows the tone frequency, so FIR taps would rarely be reused
+            noise = zero_phase_butter(noise, 4, quantize_wn(cutoff/nyquist), fir=False)
             
         return noise
 
     def _generate_triangle(self, frequency: float, duration: float) -> np.ndarray:
         """Generate triangle wave."""
-        t = np.linspace(0, duration, int(self.sample_rate * duration))
-        return 2 * np.abs(2 * (t * frequency - np.floor(t * frequency + 0.5))) - 1
+        return self._render_periodic(_synth_kernels.triangle, frequency, duration)
 
     def _apply_effects(self, signal: np.ndarray, effects: Dict[str, Any]) -> np.ndarray:
-        """Apply audio effects to signal."""
-        processed = signal.copy()
-        
+        """Apply audio effects to signal.
+
+        Effects may mutate ``signal`` in place.
+        """
+        processed = signal
         for effect, params in effects.items():
             if effect == "reverb":
                 processed = self._apply_reverb(processed, params)
@@ -134,22 +301,19 @@ class Synthesizer:
         return processed
 
     def _apply_reverb(self, signal: np.ndarray, params: Dict[str, float]) -> np.ndarray:
-        """Apply simple reverb effect."""
+        """Apply simple reverb effect, mixing it into ``signal`` in place."""
         delay_samples = int(params.get("delay", 0.1) * self.sample_rate)
         decay = params.get("decay", 0.5)
         
-        if delay_samples == 0:
+        if delay_samples == 0 or delay_samples >= len(signal):
             return signal
             
-        delayed = np.zeros_like(signal)
-        delayed[delay_samples:] = signal[:-delay_samples]
-        
-        return signal + decay * delayed
+        # ufuncs buffer the overlapping slices, so this reads the dry signal
+        signal[delay_samples:] += decay * signal[:-delay_samples]
+        return signal
 
     def _apply_filter(self, signal: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
         """Apply filter effect."""
-        from scipy import signal as sig
-        
         filter_type = params.get("type", "lowpass")
         cutoff = params.get("cutoff", 1000)
         order = params.get("order", 4)
@@ -158,13 +322,16 @@ class Synthesizer:
         normalized_cutoff = min(cutoff / nyquist, 0.99)
         
         if filter_type == "lowpass":
-            b, a = sig.butter(order, normalized_cutoff, btype="low")
+            btype = "low"
         elif filter_type == "highpass":
-            b, a = sig.butter(order, normalized_cutoff, btype="high")
+            btype = "high"
         else:
             return signal
             
-        return sig.filtfilt(b, a, signal)
+        return zero_phase_butter(signal, order, quantize_wn(normalized_cutoff), btype)
+
+# Profiles AudioMapper can map onto, in the row order of its range tables
+MAPPER_PROFILES = ["ambient", "musical", "nature", "abstract", "alert"]
 
 class AudioMapper:
     """Map network features to audio parameters."""
@@ -236,12 +403,45 @@ class AudioMapper:
             }
         }
         self._current_profile = "ambient"
+        self._profile_index = MAPPER_PROFILES.index(self._current_profile)
+        self._build_range_tables()
+
+    def _build_range_tables(self) -> None:
+        """Flatten the feature mappings into per-profile range arrays.
+
+        Row ``p`` of ``_range_low`` / ``_range_span`` holds the parameter range
+        of every mapped feature under ``MAPPER_PROFILES[p]``, so mapping a batch
+        is one multiply-add over all features.
+        """
+        names = list(self._feature_mappings)
+        self._feature_index = {name: i for i, name in enumerate(names)}
+        self._feature_params = [self._feature_mappings[name]["param"] for name in names]
+        ranges = np.array([
+            [
+                # Mappings added without per-profile ranges use their global range
+                mapping.get("profile_mapping", {}).get(profile, mapping["range"])
+                for mapping in self._feature_mappings.values()
+            ]
+            for profile in MAPPER_PROFILES
+        ], dtype=np.float64).reshape(len(MAPPER_PROFILES), len(names), 2)
+        self._range_low = ranges[..., 0]
+        self._range_span = ranges[..., 1] - ranges[..., 0]
+        # Plain floats for map_packet, where numpy scalars would only add overhead
+        self._scalar_ranges = [
+            {
+                name: (param, low, span)
+                for name, param, low, span in zip(names, self._feature_params,
+                                                  lows.tolist(), spans.tolist())
+            }
+            for lows, spans in zip(self._range_low, self._range_span)
+        ]
 
     def set_profile(self, profile_name: str) -> None:
         """Set current audio profile."""
-        if profile_name not in ["ambient", "musical", "nature", "abstract", "alert"]:
+        if profile_name not in MAPPER_PROFILES:
             raise ValueError(f"Unknown profile: {profile_name}")
         self._current_profile = profile_name
+        self._profile_index = MAPPER_PROFILES.index(profile_name)
 
     def map_packet(self, feature_set: FeatureSet) -> AudioParameters:
         """Map packet features to audio parameters.
@@ -260,16 +460,14 @@ class AudioMapper:
         }
         
         # Map features to parameters using profile-specific ranges
+        ranges = self._scalar_ranges[self._profile_index]
         for feature_name, feature_value in feature_set.features.items():
-            if feature_name in self._feature_mappings:
-                mapping = self._feature_mappings[feature_name]
-                param_name = mapping["param"]
-                
-                # Get profile-specific range
-                param_min, param_max = mapping["profile_mapping"][self._current_profile]
+            mapping = ranges.get(feature_name)
+            if mapping is not None:
+                param_name, param_min, param_span = mapping
                 
                 # Linear mapping of feature to parameter range
-                params[param_name] = param_min + feature_value * (param_max - param_min)
+                params[param_name] = param_min + feature_value * param_span
         
         # Determine waveform based on protocol and current profile
         protocol = feature_set.metadata.get("original_packet", {}).protocol
@@ -285,6 +483,66 @@ class AudioMapper:
             profile=self._current_profile
         )
 
+    def map_batch(self, feature_batch: FeatureBatch) -> List[AudioParameters]:
+        """Map a batch of packet features to audio parameters.
+
+        Args:
+            feature_batch: Extracted features for a batch of packets
+
+        Returns:
+            One AudioParameters per packet, in batch order
+        """
+        count = len(feature_batch)
+        params = {
+            "frequency": np.full(count, 440.0),
+            "amplitude": np.full(count, 0.5),
+            "duration": np.full(count, 0.1)
+        }
+
+        # Map all features at once using the current profile's range row
+        names = [name for name in feature_batch.features if name in self._feature_index]
+        if names:
+            columns = [self._feature_index[name] for name in names]
+            values = np.column_stack([feature_batch.features[name] for name in names])
+            mapped = (self._range_low[self._profile_index, columns]
+                      + values * self._range_span[self._profile_index, columns])
+            for j, column in enumerate(columns):
+                params[self._feature_params[column]] = mapped[:, j]
+
+        # Determine waveforms based on protocol and current profile
+        profile = self._current_profile
+        waveforms = {
+            protocol: mapping[profile] for protocol, mapping in self._waveform_mapping.items()
+        }
+        default_waveform = waveforms["default"]
+        codes = feature_batch.metadata.get("protocols")
+        if codes is not None:
+            # Look waveforms up by protocol code so packets need not be built
+            by_code = [waveforms.get(name, default_waveform) for name in PROTOCOL_NAMES]
+            packet_waveforms = [by_code[code] for code in codes.tolist()]
+        else:
+            packet_waveforms = [
+                waveforms.get(packet.protocol, default_waveform)
+                for packet in feature_batch.metadata["original_packets"]
+            ]
+
+        return [
+            AudioParameters(
+                frequency=frequency,
+                amplitude=amplitude,
+                waveform=waveform,
+                duration=duration,
+                effects={},
+                profile=profile
+            )
+            for waveform, frequency, amplitude, duration in zip(
+                packet_waveforms,
+                params["frequency"].tolist(),
+                params["amplitude"].tolist(),
+                params["duration"].tolist()
+            )
+        ]
+
     def add_mapping(self, feature_name: str, param_name: str, 
                    value_range: Tuple[float, float]) -> None:
         """Add new feature to parameter mapping.
@@ -298,3 +556,4 @@ class AudioMapper:
             "param": param_name,
             "range": value_range
         }
+        self._build_range_tables()
@@ -0,0 +1,217 @@
+"""Waveform kernels that render into preallocated arrays.
+
+Periodic kernels take a starting phase in cycles and return the phase
+after the last sample, so consecutive tones can continue the waveform
+without a discontinuity. All work is done in place on ``out``.
+
+``out`` may also be 2-D, one tone per row, with ``frequency`` and ``phase``
+given per row; the returned end phases are then an array as well.
+
+Square, sawtooth and triangle run on a 32-bit integer phase accumulator:
+uint32 arithmetic wraps the phase for free, and each waveform is then a
+few integer operations, cheaper than ``np.mod`` or ``np.sin`` on floats.
+"""
+
+import math
+from typing import Tuple, Union
+import numpy as np
+
+Phase = Union[float, np.ndarray]
+
+# One cycle of the integer phase accumulator
+PHASE_CYCLE = 1 << 32
+
+# Float64 sines at least this long are built by phasor doubling, which
+# beats np.sin on doubles; float32 np.sin is already faster than both
+PHASOR_MIN_SAMPLES = 2048
+
+_SQRT3 = math.sqrt(3.0)
+
+_ramp = np.arange(0, dtype=np.float64)
+_ramp_u32 = np.arange(0, dtype=np.uint32)
+
+def _sample_ramp(count: int) -> np.ndarray:
+    """Return a cached read-only view of ``0, 1, ..., count - 1``."""
+    global _ramp
+    if len(_ramp) < count:
+        _ramp = np.arange(max(count, 2 * len(_ramp)), dtype=np.float64)
+        # Shared by every tone, so a stray in-place write must fail loudly
+        _ramp.flags.writeable = False
+    return _ramp[:count]
+
+def _sample_ramp_u32(count: int) -> np.ndarray:
+    """Return a cached read-only uint32 view of ``0, 1, ..., count - 1``."""
+    global _ramp_u32
+    if len(_ramp_u32) < count:
+        _ramp_u32 = np.arange(max(count, 2 * len(_ramp_u32)), dtype=np.uint32)
+        _ramp_u32.flags.writeable = False
+    return _ramp_u32[:count]
+
+def _accumulator_end_phase(count: int, frequency: float, phase: float,
+                           sample_rate: int) -> float:
+    """Return the accumulator phase in cycles after ``count`` samples."""
+    increment = round(frequency / sample_rate * PHASE_CYCLE) % PHASE_CYCLE
+    start = int(phase * PHASE_CYCLE) % PHASE_CYCLE
+    return (start + count * increment) % PHASE_CYCLE / PHASE_CYCLE
+
+def _ramp_end_phase(count: int, frequency: Phase, phase: Phase, sample_rate: int) -> Phase:
+    """Return the floating-point ramp phase in cycles after ``count`` samples."""
+    return (phase + count * (frequency / sample_rate)) % 1.0
+
+def _phase_accumulator(shape: Tuple[int, ...], frequency: Phase, phase: Phase,
+                       sample_rate: int) -> Tuple[np.ndarray, Phase]:
+    """Return the integer phase of each sample as a signed view.
+
+    A full cycle is 2**32, so the int32 view runs from 0 up to 2**31 - 1 over
+    the first half cycle and from -2**31 back up to 0 over the second.
+
+    Returns:
+        Tuple of (int32 phase per sample, phase in cycles after the last sample)
+    """
+    count = shape[-1]
+    if len(shape) == 1:
+        increment = round(frequency / sample_rate * PHASE_CYCLE) % PHASE_CYCLE
+        start = int(phase * PHASE_CYCLE) % PHASE_CYCLE
+        end_phase = _accumulator_end_phase(count, frequency, phase, sample_rate)
+    else:
+        # Same arithmetic per row; uint64 holds count * increment exactly
+        increment = (np.rint(np.asarray(frequency) / sample_rate * PHASE_CYCLE)
+                     .astype(np.uint64) % PHASE_CYCLE)
+        start = (np.asarray(phase) * PHASE_CYCLE).astype(np.uint64) % PHASE_CYCLE
+        end_phase = (start + np.uint64(count) * increment) % PHASE_CYCLE / PHASE_CYCLE
+        increment = increment.astype(np.uint32)[:, None]
+        start = start.astype(np.uint32)[:, None]
+    accumulator = np.multiply(_sample_ramp_u32(count), np.uint32(increment))
+    accumulator += np.uint32(start)
+    return accumulator.view(np.int32), end_phase
+
+def _phase_ramp(out: np.ndarray, frequency: Phase, phase: Phase, sample_rate: int,
+                scale: float = 1.0) -> Phase:
+    """Fill ``out`` with the phase (in cycles, times ``scale``) of each sample.
+
+    Returns:
+        Phase of the sample following the last one in cycles, wrapped to [0, 1)
+    """
+    count = out.shape[-1]
+    step = frequency / sample_rate
+    offset = phase * scale
+    if out.ndim > 1:
+        step = np.asarray(step)[:, None]
+        offset = np.asarray(offset)[:, None]
+    np.multiply(_sample_ramp(count), step * scale, out=out, casting="same_kind")
+    out += offset
+    return _ramp_end_phase(count, frequency, phase, sample_rate)
+
+def _scale(out: np.ndarray, amplitude: float) -> None:
+    if amplitude != 1.0:
+        out *= amplitude
+
+def _phasor_sine(out: np.ndarray, frequency: Phase, phase: Phase, sample_rate: int) -> None:
+    """Fill ``out`` with a sine by repeatedly doubling a complex phasor.
+
+    Each pass multiplies the samples rendered so far by one rotation, so a
+    tone takes log2(count) passes of complex multiplies and no ``np.sin``.
+    Every rotation is computed directly rather than by squaring, so the
+    error grows with the number of passes, not the number of samples.
+    """
+    count = out.shape[-1]
+    rows = out.shape[:-1]
+    step = np.asarray(frequency, dtype=np.float64) * (math.tau / sample_rate)
+    z = np.empty(rows + (count,), dtype=np.complex128)
+    z[..., 0] = np.exp(1j * math.tau * np.asarray(phase, dtype=np.float64))
+    if rows:
+        step = step[:, None]
+    filled = 1
+    while filled < count:
+        n = min(filled, count - filled)
+        np.multiply(z[..., :n], np.exp(1j * filled * step), out=z[..., filled:filled + n])
+        filled += n
+    np.copyto(out, z.imag, casting="same_kind")
+
+def sine(out: np.ndarray, frequency: Phase, phase: Phase, sample_rate: int,
+         amplitude: float = 1.0) -> Phase:
+    """Render a sine wave into ``out`` and return the end phase."""
+    if out.dtype == np.float64 and out.shape[-1] >= PHASOR_MIN_SAMPLES:
+        _phasor_sine(out, frequency, phase, sample_rate)
+        _scale(out, amplitude)
+        return _ramp_end_phase(out.shape[-1], frequency, phase, sample_rate)
+    # Radians straight from the ramp; saves a separate 2*pi pass over ``out``
+    end_phase = _phase_ramp(out, frequency, phase, sample_rate, math.tau)
+    np.sin(out, out=out)
+    _scale(out, amplitude)
+    return end_phase
+
+def square(out: np.ndarray, frequency: Phase, phase: Phase, sample_rate: int,
+           amplitude: float = 1.0) -> Phase:
+    """Render a square wave into ``out`` and return the end phase."""
+    ramp, end_phase = _phase_accumulator(out.shape, frequency, phase, sample_rate)
+    # Sign bit spread to 0 / -1, then mapped to +1 / -1
+    np.right_shift(ramp, 31, out=ramp)
+    ramp <<= 1
+    ramp |= 1
+    np.copyto(out, ramp, casting="unsafe")
+    _scale(out, amplitude)
+    return end_phase
+
+def sawtooth(out: np.ndarray, frequency: Phase, phase: Phase, sample_rate: int,
+             amplitude: float = 1.0) -> Phase:
+    """Render a sawtooth wave into ``out`` and return the end phase."""
+    ramp, end_phase = _phase_accumulator(out.shape, frequency, phase, sample_rate)
+    np.multiply(ramp, 2.0 ** -31, out=out, casting="same_kind")
+    _scale(out, amplitude)
+    return end_phase
+
+def triangle(out: np.ndarray, frequency: Phase, phase: Phase, sample_rate: int,
+             amplitude: float = 1.0) -> Phase:
+    """Render a triangle wave into ``out`` and return the end phase."""
+    ramp, end_phase = _phase_accumulator(out.shape, frequency, phase, sample_rate)
+    # |phase| without overflowing at -2**31, then 0..2**31 mapped onto -1..1
+    ramp ^= ramp >> 31
+    np.multiply(ramp, 2.0 ** -30, out=out, casting="same_kind")
+    out -= 1.0
+    _scale(out, amplitude)
+    return end_phase
+
+def noise(out: np.ndarray, rng: np.random.Generator, amplitude: float = 1.0) -> None:
+    """Render standard normal white noise into ``out``."""
+    if out.dtype in (np.float32, np.float64):
+        rng.standard_normal(out=out, dtype=out.dtype)
+    else:
+        out[:] = rng.standard_normal(out.shape)
+    _scale(out, amplitude)
+
+def uniform_noise(out: np.ndarray, rng: np.random.Generator, amplitude: float = 1.0) -> None:
+    """Render uniform white noise with unit variance into ``out``.
+
+    Cheaper to draw than normal noise and indistinguishable once filtered,
+    so it is the source for ``filtered_noise``.
+    """
+    if out.dtype in (np.float32, np.float64):
+        rng.random(out=out, dtype=out.dtype)
+    else:
+        out[:] = rng.random(out.shape)
+    # [0, 1) onto [-sqrt(3), sqrt(3)), which has the same power as standard normal
+    out *= 2 * _SQRT3 * amplitude
+    out -= _SQRT3 * amplitude
+
+def repeat_period(out: np.ndarray, period: int) -> None:
+    """Fill ``out`` by repeating its first ``period`` samples.
+
+    Copies double the filled prefix each pass, so only one period has to
+    be computed by a kernel.
+    """
+    filled = period
+    total = out.shape[-1]
+    while filled < total:
+        n = min(filled, total - filled)
+        out[..., filled:filled + n] = out[..., :n]
+        filled += n
+
+def end_phase(kernel, count: int, frequency: float, phase: float, sample_rate: int) -> float:
+    """Return the phase ``kernel`` would return after rendering ``count`` samples.
+
+    Lets a caller chain the phases of many tones before rendering any of them.
+    """
+    if kernel is sine:
+        return _ramp_end_phase(count, frequency, phase, sample_rate)
+    return _accumulator_end_phase(count, frequency, phase, sample_rate)
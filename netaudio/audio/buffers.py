@@ -0,0 +1,130 @@
+"""Sample buffers shared between synthesis and audio output threads."""
+
+import threading
+from collections import deque
+from typing import Deque, Optional
+import numpy as np
+
+class AudioBufferPool:
+    """Pool of reusable float32 sample buffers.
+
+    Rendering into pooled buffers keeps the audio path free of per-tone
+    allocations. ``acquire`` falls back to a fresh buffer when the pool is
+    empty, so a burst never blocks; released buffers are kept for reuse.
+    """
+
+    def __init__(self, count: int, size: int):
+        """Initialize buffer pool.
+
+        Args:
+            count: Number of buffers to preallocate
+            size: Length of each buffer in samples
+        """
+        self.size = size
+        self._free: Deque[np.ndarray] = deque(
+            np.empty(size, dtype=np.float32) for _ in range(count)
+        )
+
+    def acquire(self) -> np.ndarray:
+        """Take a buffer from the pool, allocating one if none are free."""
+        try:
+            return self._free.popleft()
+        except IndexError:
+            return np.empty(self.size, dtype=np.float32)
+
+    def release(self, buffer: np.ndarray) -> None:
+        """Return a buffer obtained from ``acquire`` to the pool."""
+        self._free.append(buffer)
+
+class AudioRingBuffer:
+    """Single-producer/single-consumer float32 sample ring.
+
+    A synthesis thread writes rendered samples with ``write`` while a
+    PortAudio callback drains them with ``read_into``. Each side only
+    advances its own position counter, so no lock is taken on the audio
+    path; the producer waits on an event when the ring is full.
+    """
+
+    def __init__(self, capacity: int):
+        """Initialize ring buffer.
+
+        Args:
+            capacity: Maximum number of buffered samples
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._read_pos = 0   # Total samples consumed
+        self._write_pos = 0  # Total samples produced
+        self._space_available = threading.Event()
+        self._closed = False
+
+    @property
+    def available(self) -> int:
+        """Number of samples ready to be read."""
+        return self._write_pos - self._read_pos
+
+    @property
+    def free(self) -> int:
+        """Number of samples that can be written without blocking."""
+        return self.capacity - self.available
+
+    def write(self, samples: np.ndarray, timeout: Optional[float] = None) -> int:
+        """Write samples, blocking while the ring is full.
+
+        Args:
+            samples: 1-D array of samples to append
+            timeout: Optional maximum time in seconds to wait for space
+
+        Returns:
+            Number of samples written, which is less than ``len(samples)``
+            only if the timeout expired or the buffer was closed
+        """
+        written = 0
+        total = len(samples)
+        while written < total and not self._closed:
+            free = self.free
+            if free == 0:
+                self._space_available.clear()
+                # Re-check after clearing so a concurrent read is not missed
+                if self.free == 0 and not self._space_available.wait(timeout):
+                    break
+                continue
+
+            count = min(free, total - written)
+            start = self._write_pos % self.capacity
+            first = min(count, self.capacity - start)
+            self._data[start:start + first] = samples[written:written + first]
+            if count > first:
+                self._data[:count - first] = samples[written + first:written + count]
+            self._write_pos += count
+            written += count
+        return written
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Fill ``out`` with buffered samples, zero-padding on underrun.
+
+        Args:
+            out: 1-D output array, typically a PortAudio callback buffer
+
+        Returns:
+            Number of buffered samples copied into ``out``
+        """
+        count = min(self.available, len(out))
+        start = self._read_pos % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        if count > first:
+            out[first:count] = self._data[:count - first]
+        if count < len(out):
+            out[count:] = 0.0
+        self._read_pos += count
+        if count:
+            self._space_available.set()
+        return count
+
+    def close(self) -> None:
+        """Wake any blocked writer and reject further writes."""
+        self._closed = True
+        self._space_available.set()
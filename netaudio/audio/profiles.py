@@ -1,9 +1,36 @@
 """Audio profile definitions and management."""
 
+import bisect
+import functools
+import math
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 import numpy as np
-from scipy import signal
+from scipy import signal as sig
+from ._filters import _peak_sos, quantize_wn, zero_phase_butter
+
+@functools.lru_cache(maxsize=64)
+def _decay_table(decay: float, sample_rate: int, size: int) -> np.ndarray:
+    """Return a read-only float32 exponential decay of ``size`` samples."""
+    table = np.arange(size, dtype=np.float32)
+    table *= np.float32(-1.0 / (decay * sample_rate))
+    np.exp(table, out=table)
+    table.flags.writeable = False
+    return table
+
+def _decay_envelope(decay: float, sample_rate: int, count: int) -> np.ndarray:
+    """Return the first ``count`` samples of a cached reverb decay envelope.
+
+    Tables are sized to the next power of two so tones of different lengths
+    share one table per decay time.
+    """
+    size = 1 << max(count - 1, 0).bit_length()
+    return _decay_table(decay, sample_rate, size)[:count]
+
+@functools.lru_cache(maxsize=64)
+def _db_to_amplitude(db: float) -> float:
+    """Convert a level in dB to a linear amplitude."""
+    return math.pow(10.0, db / 20.0)
 
 @dataclass
 class AudioProfile:
@@ -13,7 +40,11 @@ class AudioProfile:
     waveforms: List[str]
     effects: Dict[str, Dict[str, Any]]
     scaling: Dict[str, float]
-    musical_scale: Optional[List[float]] = None
+    musical_scale: Optional[List[float]] = None  # Kept in ascending order
+
+    def __post_init__(self):
+        if self.musical_scale:
+            self.musical_scale = sorted(self.musical_scale)
 
 class AudioProfileManager:
     """Manage and apply audio profiles."""
@@ -21,6 +52,8 @@ class AudioProfileManager:
     def __init__(self):
         self._profiles = {}
         self._current_profile = None
+        # id(profile) -> (profile, compiled effect chain); see effect_chain
+        self._chains: Dict[int, Tuple[AudioProfile, Callable[[np.ndarray], np.ndarray]]] = {}
         self._initialize_default_profiles()
 
     def _initialize_default_profiles(self):
@@ -140,59 +173,94 @@ class AudioProfileManager:
         self._profiles[name] = profile
 
     def apply_profile(self, signal: np.ndarray, profile: Optional[AudioProfile] = None) -> np.ndarray:
-        """Apply profile effects to audio signal."""
+        """Apply profile effects to audio signal.
+
+        Effects may mutate ``signal`` in place; pass a copy to keep the
+        original. The result has the same dtype as ``signal``. A 2-D
+        ``signal`` is treated as one tone per row.
+
+        Args:
+            signal: Audio signal, or a stack of equal-length signals
+            profile: Profile to apply; the current profile if None
+        """
         if profile is None:
             profile = self._current_profile
 
-        processed = signal.copy()
-        
-        # Apply effects
+        return self.effect_chain(profile)(signal)
+
+    def effect_chain(self, profile: AudioProfile) -> Callable[[np.ndarray], np.ndarray]:
+        """Return a function that applies ``profile``'s effects in place.
+
+        The effect sequence is resolved once per profile, so applying it skips
+        the name dispatch. Effect parameters are read on each call, but adding
+        or removing effects on a profile that has already been applied is not
+        picked up.
+        """
+        cached = self._chains.get(id(profile))
+        if cached is not None and cached[0] is profile:
+            return cached[1]
+
+        steps = []
         for effect_name, params in profile.effects.items():
             if effect_name == 'reverb':
-                processed = self._apply_reverb(processed, params)
+                steps.append(functools.partial(self._apply_reverb, params=params))
             elif effect_name == 'compression':
-                processed = self._apply_compression(processed, params)
+                steps.append(functools.partial(self._apply_compression, params=params))
             elif effect_name in ['lowpass', 'highpass', 'bandpass']:
-                processed = self._apply_filter(processed, effect_name, params)
+                steps.append(functools.partial(self._apply_filter, filter_type=effect_name,
+                                               params=params))
+        scaling = profile.scaling
 
-        # Apply scaling
-        processed *= profile.scaling.get('amplitude', 1.0)
-        
-        return processed
+        def apply(signal: np.ndarray) -> np.ndarray:
+            processed = signal
+            for step in steps:
+                processed = step(processed)
+
+            # Apply scaling
+            processed *= scaling.get('amplitude', 1.0)
+            return processed
+
+        self._chains[id(profile)] = (profile, apply)
+        return apply
 
     def _apply_reverb(self, signal: np.ndarray, params: Dict[str, float]) -> np.ndarray:
-        """Apply reverb effect."""
+        """Apply reverb effect, mixing it into ``signal`` in place."""
         mix = params.get('mix', 0.3)
         decay = params.get('decay', 1.0)
         
         # Create simple delay-based reverb
         delay_samples = int(0.05 * 44100)  # 50ms delay
-        decay_factor = np.exp(-np.arange(len(signal)) / (decay * 44100))
+        count = signal.shape[-1]
+        if delay_samples >= count:
+            signal *= 1 - mix
+            return signal
+        decay_factor = _decay_envelope(decay, 44100, count - delay_samples)
         
-        reverb = np.zeros_like(signal)
-        reverb[delay_samples:] = signal[:-delay_samples] * decay_factor[:-delay_samples]
-        
-        return (1 - mix) * signal + mix * reverb
+        # Only the delayed tail needs a temporary; the dry part is scaled in place
+        reverb = np.multiply(signal[..., :-delay_samples], decay_factor, dtype=signal.dtype)
+        reverb *= mix
+        signal *= 1 - mix
+        signal[..., delay_samples:] += reverb
+        return signal
 
     def _apply_compression(self, signal: np.ndarray, params: Dict[str, float]) -> np.ndarray:
-        """Apply dynamic range compression."""
+        """Apply dynamic range compression to ``signal`` in place."""
         threshold = params.get('threshold', -20)
         ratio = params.get('ratio', 4.0)
         
         # Convert threshold from dB
-        threshold_amp = 10 ** (threshold / 20)
-        
-        # Compute amplitude envelope
-        envelope = np.abs(signal)
-        
-        # Apply compression
-        compressed = np.where(
-            envelope > threshold_amp,
-            threshold_amp + (envelope - threshold_amp) / ratio,
-            envelope
-        )
+        threshold_amp = _db_to_amplitude(threshold)
+        slope = 1.0 / ratio
         
-        return np.sign(signal) * compressed
+        # Above the threshold the excess is scaled by 1/ratio. Splitting the
+        # signal into its part clipped at the threshold plus the excess gives
+        # the same curve without abs, sign or a select:
+        #   out = clip(s, -t, t) * (1 - 1/ratio) + s / ratio
+        clipped = np.clip(signal, -threshold_amp, threshold_amp)
+        clipped *= 1.0 - slope
+        signal *= slope
+        signal += clipped
+        return signal
 
     def _apply_filter(self, signal: np.ndarray, filter_type: str, params: Dict[str, Any]) -> np.ndarray:
         """Apply various types of filters."""
@@ -202,25 +270,35 @@ class AudioProfileManager:
         if filter_type == 'lowpass':
             cutoff = params.get('cutoff', 1000)
             order = params.get('order', 4)
-            b, a = signal.butter(order, cutoff / nyquist, btype='low')
+            return zero_phase_butter(signal, order, quantize_wn(cutoff / nyquist), 'low')
             
         elif filter_type == 'highpass':
             cutoff = params.get('cutoff', 1000)
             order = params.get('order', 4)
-            b, a = signal.butter(order, cutoff / nyquist, btype='high')
+            return zero_phase_butter(signal, order, quantize_wn(cutoff / nyquist), 'high')
             
         elif filter_type == 'bandpass':
             center_freq = params.get('center_freq', 1000)
             q = params.get('q', 1.0)
-            b, a = signal.iirpeak(center_freq / nyquist, q)
+            sos = _peak_sos(quantize_wn(center_freq / nyquist), q)
             
-        return signal.filtfilt(b, a, signal)
+        # sosfiltfilt always works in float64; cast straight back so the
+        # effects after it run in the signal's own dtype
+        return sig.sosfiltfilt(sos, signal).astype(signal.dtype, copy=False)
 
     def quantize_to_scale(self, frequency: float, profile: Optional[AudioProfile] = None) -> float:
         """Quantize frequency to nearest note in scale."""
         if profile is None:
             profile = self._current_profile
             
-        if profile.musical_scale:
-            return min(profile.musical_scale, key=lambda x: abs(x - frequency))
-        return frequency
+        scale = profile.musical_scale
+        if not scale:
+            return frequency
+        i = bisect.bisect_left(scale, frequency)
+        if i == 0:
+            return scale[0]
+        if i == len(scale):
+            return scale[-1]
+        # Ties go to the lower note
+        lower, upper = scale[i - 1], scale[i]
+        return upper if upper - frequency < frequency - lower else lower
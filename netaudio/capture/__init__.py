@@ -1,23 +1,277 @@
 """Network traffic capture module."""
 
 from abc import ABC, abstractmethod
-from typing import Iterator, Optional, Any, Dict, Deque
+from typing import Iterator, Optional, Any, Dict, Deque, List, Sequence, Tuple
 from dataclasses import dataclass
 from contextlib import contextmanager
 from collections import deque
+import os
+import socket
+import struct
 import threading
+import time
+import numpy as np
 
 @dataclass
 class PacketData:
     """Standardized packet data structure."""
+    # One is built per captured packet, so skip the per-instance __dict__
+    __slots__ = ("timestamp", "size", "protocol", "src_port", "dst_port", "flags", "payload")
+
     timestamp: float
     size: int
+    # Captured packets use the literal names of PROTOCOL_NAMES, which are
+    # interned, so protocol lookups hit the cached hash and compare by identity
     protocol: str
     src_port: Optional[int]
     dst_port: Optional[int]
     flags: Dict[str, Any]
     payload: bytes
 
+# Integer codes for protocols in PacketBatch; anything else is UNKNOWN
+PROTOCOL_CODES: Dict[str, int] = {"UNKNOWN": 0, "TCP": 1, "UDP": 2, "ICMP": 3}
+PROTOCOL_NAMES: List[str] = sorted(PROTOCOL_CODES, key=PROTOCOL_CODES.get)
+
+# Bit position of each flag in the TCP header's flag byte
+TCP_FLAG_BITS: Dict[str, int] = {"SYN": 1, "ACK": 4, "FIN": 0, "RST": 2, "PSH": 3, "URG": 5}
+
+# Decoded flags dict of every flag byte; decode_tcp_flags hands out copies
+_TCP_FLAG_DICTS: Tuple[Dict[str, bool], ...] = tuple(
+    {name: bool(value >> bit & 1) for name, bit in TCP_FLAG_BITS.items()}
+    for value in range(256)
+)
+
+def decode_tcp_flags(value: int) -> Dict[str, bool]:
+    """Expand a raw TCP flag byte into the ``PacketData.flags`` dict."""
+    # Bits above the byte are not in TCP_FLAG_BITS, so masking drops nothing
+    return _TCP_FLAG_DICTS[value & 0xFF].copy()
+
+def encode_tcp_flags(flags: Dict[str, Any]) -> int:
+    """Pack a ``PacketData.flags`` dict back into a TCP flag byte."""
+    return sum(1 << bit for name, bit in TCP_FLAG_BITS.items() if flags.get(name))
+
+def _packet_flags(protocol: int, tcp_flags: int, icmp_type: int, icmp_code: int) -> Dict[str, Any]:
+    """Build the ``PacketData.flags`` dict from raw column values."""
+    if protocol == PROTOCOL_CODES["TCP"]:
+        return decode_tcp_flags(tcp_flags)
+    if protocol == PROTOCOL_CODES["ICMP"]:
+        return {"type": icmp_type, "code": icmp_code}
+    return {}
+
+@dataclass
+class PacketBatch:
+    """Column-oriented view of a group of packets for vectorized processing."""
+    timestamps: np.ndarray  # float64
+    sizes: np.ndarray       # int32
+    protocols: np.ndarray   # int8 codes from PROTOCOL_CODES
+    src_ports: np.ndarray   # int32, 0 where unknown
+    dst_ports: np.ndarray   # int32, 0 where unknown
+    packets: Sequence[PacketData]
+    tcp_flags: Optional[np.ndarray] = None  # uint8 raw flag bytes, 0 for non-TCP
+
+    def __len__(self) -> int:
+        return len(self.packets)
+
+    @classmethod
+    def from_packets(cls, packets: Sequence[PacketData]) -> "PacketBatch":
+        """Build a batch from a sequence of packets.
+
+        Args:
+            packets: Packets to include in the batch
+
+        Returns:
+            PacketBatch with one array entry per packet
+        """
+        packets = list(packets)
+        count = len(packets)
+        codes = PROTOCOL_CODES
+        tcp = codes["TCP"]
+        return cls(
+            timestamps=np.fromiter((p.timestamp for p in packets), dtype=np.float64, count=count),
+            sizes=np.fromiter((p.size for p in packets), dtype=np.int32, count=count),
+            protocols=np.fromiter((codes.get(p.protocol, 0) for p in packets), dtype=np.int8, count=count),
+            src_ports=np.fromiter((p.src_port or 0 for p in packets), dtype=np.int32, count=count),
+            dst_ports=np.fromiter((p.dst_port or 0 for p in packets), dtype=np.int32, count=count),
+            packets=packets,
+            tcp_flags=np.fromiter(
+                (encode_tcp_flags(p.flags) if codes.get(p.protocol) == tcp else 0 for p in packets),
+                dtype=np.uint8, count=count
+            )
+        )
+
+class _BatchPackets(Sequence):
+    """PacketData for each row of ring columns, built only when accessed."""
+
+    def __init__(self, batch: "PacketBatch", icmp_types: np.ndarray, icmp_codes: np.ndarray,
+                 payloads: List[bytes]):
+        self._batch = batch
+        self._icmp_types = icmp_types
+        self._icmp_codes = icmp_codes
+        self._payloads = payloads
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        batch = self._batch
+        protocol = int(batch.protocols[index])
+        return PacketData(
+            timestamp=float(batch.timestamps[index]),
+            size=int(batch.sizes[index]),
+            protocol=PROTOCOL_NAMES[protocol],
+            src_port=int(batch.src_ports[index]) or None,
+            dst_port=int(batch.dst_ports[index]) or None,
+            flags=_packet_flags(protocol, int(batch.tcp_flags[index]),
+                                int(self._icmp_types[index]), int(self._icmp_codes[index])),
+            payload=self._payloads[index]
+        )
+
+# Payload bytes kept per packet by PacketRing; enough for a full Ethernet MTU
+DEFAULT_PAYLOAD_SIZE = 2048
+
+class PacketRing:
+    """Fixed-size packet buffer stored as columns, for one writer and one reader.
+
+    Packet fields go straight into preallocated numpy arrays, so a batch
+    read is a few array slices instead of one PacketData object per packet.
+    Payloads are copied into fixed-size slots of one preallocated pool and
+    only turned into ``bytes`` when a PacketData is built from them.
+    As in ``SPSCQueue``, each side only advances its own counter, so neither
+    needs a lock.
+    """
+
+    def __init__(self, capacity: int, payload_size: int = DEFAULT_PAYLOAD_SIZE):
+        """Initialize ring.
+
+        Args:
+            capacity: Number of packet slots, rounded up to a power of two
+            payload_size: Payload bytes kept per packet; longer payloads are
+                truncated and 0 discards them
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = 1 << (capacity - 1).bit_length()
+        self._mask = self.capacity - 1
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.sizes = np.zeros(self.capacity, dtype=np.int32)
+        self.protocols = np.zeros(self.capacity, dtype=np.int8)
+        self.src_ports = np.zeros(self.capacity, dtype=np.int32)
+        self.dst_ports = np.zeros(self.capacity, dtype=np.int32)
+        # Flags stay raw; the PacketData.flags dict is only built on read
+        self.tcp_flags = np.zeros(self.capacity, dtype=np.uint8)
+        self.icmp_types = np.zeros(self.capacity, dtype=np.uint8)
+        self.icmp_codes = np.zeros(self.capacity, dtype=np.uint8)
+        self.payload_size = payload_size
+        self.payload_lengths = np.zeros(self.capacity, dtype=np.int32)
+        self._payload_pool = memoryview(bytearray(self.capacity * payload_size))
+        self._read_pos = 0   # Total packets consumed
+        self._write_pos = 0  # Total packets produced
+
+    def __len__(self) -> int:
+        return self._write_pos - self._read_pos
+
+    def push(self, timestamp: float, size: int, protocol: int, src_port: int = 0,
+             dst_port: int = 0, tcp_flags: int = 0, icmp_type: int = 0, icmp_code: int = 0,
+             payload: bytes = b"") -> bool:
+        """Append a packet; called only from the writer thread.
+
+        Args:
+            protocol: Code from PROTOCOL_CODES
+            src_port: Source port, 0 where unknown
+            dst_port: Destination port, 0 where unknown
+            tcp_flags: Raw TCP flag byte (see TCP_FLAG_BITS)
+            icmp_type: ICMP message type
+            icmp_code: ICMP message code
+            payload: Bytes from the IP header on, copied into the ring's pool
+
+        Returns:
+            False if the ring was full and the packet was dropped
+        """
+        if self._write_pos - self._read_pos >= self.capacity:
+            return False
+        index = self._write_pos & self._mask
+        self.timestamps[index] = timestamp
+        self.sizes[index] = size
+        self.protocols[index] = protocol
+        self.src_ports[index] = src_port
+        self.dst_ports[index] = dst_port
+        self.tcp_flags[index] = tcp_flags
+        self.icmp_types[index] = icmp_type
+        self.icmp_codes[index] = icmp_code
+        length = min(len(payload), self.payload_size)
+        offset = index * self.payload_size
+        self._payload_pool[offset:offset + length] = payload[:length]
+        self.payload_lengths[index] = length
+        # Publish only after the slot is complete
+        self._write_pos += 1
+        return True
+
+    def pop(self) -> Optional[PacketData]:
+        """Remove and return the oldest packet, or None if the ring is empty."""
+        if self._write_pos == self._read_pos:
+            return None
+        index = self._read_pos & self._mask
+        protocol = int(self.protocols[index])
+        packet = PacketData(
+            timestamp=float(self.timestamps[index]),
+            size=int(self.sizes[index]),
+            protocol=PROTOCOL_NAMES[protocol],
+            src_port=int(self.src_ports[index]) or None,
+            dst_port=int(self.dst_ports[index]) or None,
+            flags=_packet_flags(protocol, int(self.tcp_flags[index]),
+                                int(self.icmp_types[index]), int(self.icmp_codes[index])),
+            payload=bytes(self._payload(index))
+        )
+        self._read_pos += 1
+        return packet
+
+    def _payload(self, index: int) -> memoryview:
+        """Return the pool slice holding the payload in slot ``index``."""
+        offset = index * self.payload_size
+        return self._payload_pool[offset:offset + self.payload_lengths[index]]
+
+    def pop_batch(self, max_packets: int) -> Optional[PacketBatch]:
+        """Remove up to ``max_packets`` oldest packets as one batch.
+
+        Returns:
+            PacketBatch with copies of the columns, or None if the ring is empty
+        """
+        count = min(max_packets, self._write_pos - self._read_pos)
+        if count <= 0:
+            return None
+        start = self._read_pos & self._mask
+        # Split a read that wraps past the end of the arrays into two slices
+        first = min(count, self.capacity - start)
+        spans = [slice(start, start + first), slice(0, count - first)]
+
+        def take(column):
+            if first == count:
+                return column[spans[0]].copy()
+            return np.concatenate([column[span] for span in spans])
+
+        # Copy out of the pool now; the slots are reused once the read is published
+        pool = self._payload_pool
+        size = self.payload_size
+        payloads = [
+            bytes(pool[index * size:index * size + length])
+            for span in spans
+            for index, length in enumerate(self.payload_lengths[span].tolist(), span.start)
+        ]
+        batch = PacketBatch(
+            timestamps=take(self.timestamps),
+            sizes=take(self.sizes),
+            protocols=take(self.protocols),
+            src_ports=take(self.src_ports),
+            dst_ports=take(self.dst_ports),
+            packets=[],
+            tcp_flags=take(self.tcp_flags)
+        )
+        batch.packets = _BatchPackets(batch, take(self.icmp_types), take(self.icmp_codes), payloads)
+        self._read_pos += count
+        return batch
+
 class CaptureSource(ABC):
     """Abstract base class for network traffic capture sources."""
 
@@ -54,44 +308,171 @@ class CaptureSource(ABC):
         finally:
             self.stop()
 
+# Link-layer constants for AF_PACKET capture (linux/if_ether.h, linux/if_arp.h)
+ETH_P_IP = 0x0800
+ETH_HEADER_SIZE = 14
+ARPHRD_ETHER = 1
+ARPHRD_LOOPBACK = 772
+
+# Largest frame read from the capture socket; bigger (GRO) frames are truncated
+MAX_FRAME_SIZE = 1 << 16
+
+# How often the capture thread checks whether it should stop
+CAPTURE_POLL_TIMEOUT = 0.1  # seconds
+
+_IP_PROTOCOLS = {6: PROTOCOL_CODES["TCP"], 17: PROTOCOL_CODES["UDP"], 1: PROTOCOL_CODES["ICMP"]}
+_PORTS = struct.Struct("!HH")
+
+def parse_ip_header(frame, offset: int, length: int):
+    """Read protocol, ports and flags from the IPv4 packet at ``offset``.
+
+    Args:
+        frame: Buffer holding the captured frame
+        offset: Start of the IP header in ``frame``
+        length: Number of captured bytes in ``frame``
+
+    Returns:
+        Tuple of (protocol code, src port, dst port, TCP flags, ICMP type, ICMP code),
+        with zeros for fields the protocol does not have
+    """
+    unknown = (PROTOCOL_CODES["UNKNOWN"], 0, 0, 0, 0, 0)
+    if length < offset + 20 or frame[offset] >> 4 != 4:
+        return unknown
+    transport = offset + (frame[offset] & 0x0F) * 4
+    protocol = _IP_PROTOCOLS.get(frame[offset + 9])
+    # Later fragments carry no transport header
+    if protocol is None or (frame[offset + 6] & 0x1F or frame[offset + 7]):
+        return unknown
+
+    if protocol == PROTOCOL_CODES["ICMP"]:
+        if length < transport + 2:
+            return unknown
+        return protocol, 0, 0, 0, frame[transport], frame[transport + 1]
+    if protocol == PROTOCOL_CODES["TCP"]:
+        if length < transport + 14:
+            return unknown
+        src_port, dst_port = _PORTS.unpack_from(frame, transport)
+        return protocol, src_port, dst_port, frame[transport + 13], 0, 0
+    if length < transport + 4:
+        return unknown
+    src_port, dst_port = _PORTS.unpack_from(frame, transport)
+    return protocol, src_port, dst_port, 0, 0, 0
+
 class LiveCapture(CaptureSource):
     """Live network interface capture implementation."""
 
-    def __init__(self, interface: str, buffer_size: int = 1024):
+    def __init__(self, interface: str, buffer_size: int = 1024,
+                 payload_size: int = DEFAULT_PAYLOAD_SIZE):
+        """Initialize live capture.
+
+        Args:
+            interface: Network interface to capture on
+            buffer_size: Maximum number of captured packets buffered
+            payload_size: Payload bytes kept per packet; 0 discards payloads
+        """
         super().__init__(buffer_size)
         self.interface = interface
         self._capture_handle = None
-        self._packet_buffer: Deque[PacketData] = deque(maxlen=buffer_size)
-        self._buffer_lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._capture_thread: Optional[threading.Thread] = None
+        # The capture thread is the only writer and the reader the only
+        # consumer, so the ring needs no lock
+        self._packet_ring = PacketRing(buffer_size, payload_size)
 
     def start(self) -> None:
-        """Start capturing from network interface."""
-        try:
-            from scapy.all import sniff
-            import os
+        """Start capturing from network interface in a background thread.
 
-            # Ensure we have root privileges for capture
-            if os.geteuid() != 0:
-                raise PermissionError("Root privileges required for network capture")
+        On Linux packets are read from an AF_PACKET socket and their headers
+        parsed directly; elsewhere Scapy's sniffer is used.
+        """
+        # Ensure we have root privileges for capture
+        if os.geteuid() != 0:
+            raise PermissionError("Root privileges required for network capture")
 
-            # Initialize capture before potentially dropping privileges
-            super().start()
-            self._capture_handle = sniff(iface=self.interface, store=False,
-                                       prn=self._packet_callback, count=0,
-                                       filter="ip")  # Only capture IP packets
+        if not hasattr(socket, "AF_PACKET"):
+            self._start_scapy()
+            return
+
+        # Only IPv4 frames are delivered, as with a BPF "ip" filter
+        self._socket = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_IP))
+        self._socket.bind((self.interface, 0))
+        self._socket.settimeout(CAPTURE_POLL_TIMEOUT)
+        super().start()
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._capture_thread.start()
+
+    def _start_scapy(self) -> None:
+        """Capture through Scapy's sniffer where raw packet sockets are unavailable."""
+        try:
+            from scapy.all import AsyncSniffer
         except ImportError:
             raise ImportError("Scapy is required for live capture. Install with: pip install scapy")
 
+        super().start()
+        self._capture_handle = AsyncSniffer(iface=self.interface, store=False,
+                                            prn=self._packet_callback,
+                                            filter="ip")  # Only capture IP packets
+        self._capture_handle.start()
+
     def stop(self) -> None:
         """Stop the live capture."""
+        super().stop()
         if self._capture_handle:
             self._capture_handle.stop()
-        super().stop()
+            self._capture_handle = None
+        if self._capture_thread:
+            self._capture_thread.join()
+            self._capture_thread = None
+        if self._socket:
+            self._socket.close()
+            self._socket = None
+
+    def _capture_loop(self) -> None:
+        """Read frames from the packet socket into the ring until stopped."""
+        frame = bytearray(MAX_FRAME_SIZE)
+        view = memoryview(frame)
+        push = self._packet_ring.push
+        recvfrom_into = self._socket.recvfrom_into
+
+        while self._is_running:
+            try:
+                # MSG_TRUNC reports the full frame length even if it was cut short
+                size, address = recvfrom_into(frame, 0, socket.MSG_TRUNC)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            timestamp = time.time()
+            _, _, packet_type, link_type, _ = address
+
+            if link_type in (ARPHRD_ETHER, ARPHRD_LOOPBACK):
+                # Loopback shows each packet as sent and again as received
+                if link_type == ARPHRD_LOOPBACK and packet_type == socket.PACKET_OUTGOING:
+                    continue
+                offset = ETH_HEADER_SIZE
+            else:
+                offset = 0  # Link types without a MAC header, e.g. tun devices
+            length = min(size, MAX_FRAME_SIZE)
+
+            # Dropped if the consumer has fallen behind; the ring copies the
+            # payload into its pool, so the frame buffer can be reused
+            push(timestamp, size, *parse_ip_header(frame, offset, length),
+                 view[offset:length])
 
     def get_packet(self) -> Optional[PacketData]:
         """Get next packet from the live capture."""
-        with self._buffer_lock:
-            return self._packet_buffer.popleft() if self._packet_buffer else None
+        return self._packet_ring.pop()
+
+    def get_batch(self, max_packets: int = 256) -> Optional[PacketBatch]:
+        """Get up to ``max_packets`` captured packets as a single batch.
+
+        Args:
+            max_packets: Maximum number of packets in the batch
+
+        Returns:
+            PacketBatch of the oldest buffered packets, or None if none are buffered
+        """
+        return self._packet_ring.pop_batch(max_packets)
 
     def _packet_callback(self, packet: Any) -> None:
         """Process captured packet."""
@@ -103,26 +484,17 @@ class LiveCapture(CaptureSource):
             size = len(packet)
             timestamp = float(packet.time)
 
-            # Determine protocol and ports
+            # Determine protocol and ports; flags are kept as raw header values
             protocol = "UNKNOWN"
-            src_port = None
-            dst_port = None
-            flags = {}
+            src_port = dst_port = 0
+            tcp_flags = icmp_type = icmp_code = 0
 
             if TCP in packet:
                 protocol = "TCP"
                 tcp = packet[TCP]
                 src_port = tcp.sport
                 dst_port = tcp.dport
-                # Extract TCP flags
-                flags = {
-                    "SYN": (tcp.flags & 0x02) != 0,
-                    "ACK": (tcp.flags & 0x10) != 0,
-                    "FIN": (tcp.flags & 0x01) != 0,
-                    "RST": (tcp.flags & 0x04) != 0,
-                    "PSH": (tcp.flags & 0x08) != 0,
-                    "URG": (tcp.flags & 0x20) != 0
-                }
+                tcp_flags = int(tcp.flags) & 0xFF
             elif UDP in packet:
                 protocol = "UDP"
                 udp = packet[UDP]
@@ -131,32 +503,31 @@ class LiveCapture(CaptureSource):
             elif ICMP in packet:
                 protocol = "ICMP"
                 icmp = packet[ICMP]
-                flags = {
-                    "type": icmp.type,
-                    "code": icmp.code
-                }
-
-            # Create standardized packet data
-            packet_data = PacketData(
-                timestamp=timestamp,
-                size=size,
-                protocol=protocol,
-                src_port=src_port,
-                dst_port=dst_port,
-                flags=flags,
-                payload=bytes(packet.payload)
-            )
+                icmp_type = icmp.type
+                icmp_code = icmp.code
 
-            # Store packet in buffer
-            with self._buffer_lock:
-                self._packet_buffer.append(packet_data)
+            # Store packet in the ring; it is dropped if the consumer has fallen behind
+            self._packet_ring.push(timestamp, size, PROTOCOL_CODES[protocol],
+                                   src_port, dst_port, tcp_flags, icmp_type, icmp_code,
+                                   bytes(packet.payload))
 
 class PcapReader(CaptureSource):
     """PCAP file reader implementation."""
 
-    def __init__(self, filepath: str, buffer_size: int = 1024, loop: bool = False):
+    def __init__(self, filepath: str, buffer_size: int = 1024, loop: bool = False,
+                 read_buffer_size: int = 1 << 20):
+        """Initialize PCAP reader.
+
+        Args:
+            filepath: Path to the PCAP file
+            buffer_size: Maximum number of decoded packets buffered ahead
+            loop: Whether to loop back to the beginning when reaching the end
+            read_buffer_size: Size in bytes of the file read buffer; larger
+                buffers mean fewer read() calls on big captures
+        """
         super().__init__(buffer_size)
         self.filepath = filepath
+        self.read_buffer_size = read_buffer_size
         self._reader = None
         self._current_index = 0
         self._packet_count = 0
@@ -169,7 +540,9 @@ class PcapReader(CaptureSource):
         try:
             from scapy.all import rdpcap
             super().start()
-            self._reader = rdpcap(self.filepath)
+            # The default stdio-sized buffer turns large captures into many small reads
+            with open(self.filepath, "rb", buffering=self.read_buffer_size) as pcap_file:
+                self._reader = rdpcap(pcap_file)
             self._packet_count = len(self._reader)
             self._current_index = 0
 
@@ -197,6 +570,28 @@ class PcapReader(CaptureSource):
                 self._fill_buffer()
             return self._packet_buffer.popleft() if self._packet_buffer else None
 
+    def get_batch(self, max_packets: int = 256) -> Optional[PacketBatch]:
+        """Get up to ``max_packets`` next packets as a single batch.
+
+        Args:
+            max_packets: Maximum number of packets in the batch
+
+        Returns:
+            PacketBatch of the next packets, or None at the end of the file
+        """
+        packets = []
+        with self._buffer_lock:
+            while len(packets) < max_packets:
+                if not self._packet_buffer:
+                    if not self._is_running:
+                        break
+                    self._fill_buffer()
+                    if not self._packet_buffer:
+                        break
+                take = min(max_packets - len(packets), len(self._packet_buffer))
+                packets.extend(self._packet_buffer.popleft() for _ in range(take))
+        return PacketBatch.from_packets(packets) if packets else None
+
     def _fill_buffer(self) -> None:
         """Fill the packet buffer with processed packets."""
         if not self._reader or not self._is_running:
@@ -232,14 +627,7 @@ class PcapReader(CaptureSource):
                     src_port = tcp.sport
                     dst_port = tcp.dport
                     # Extract TCP flags
-                    flags = {
-                        "SYN": (tcp.flags & 0x02) != 0,
-                        "ACK": (tcp.flags & 0x10) != 0,
-                        "FIN": (tcp.flags & 0x01) != 0,
-                        "RST": (tcp.flags & 0x04) != 0,
-                        "PSH": (tcp.flags & 0x08) != 0,
-                        "URG": (tcp.flags & 0x20) != 0
-                    }
+                    flags = decode_tcp_flags(int(tcp.flags))
                 elif UDP in packet:
                     protocol = "UDP"
                     udp = packet[UDP]
@@ -1,9 +1,12 @@
 """Network traffic processing and feature extraction module."""
 
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+from collections import Counter, deque
 from dataclasses import dataclass
+import math
 import numpy as np
-from ..capture import PacketData
+from ..capture import PacketData, PacketBatch, PROTOCOL_CODES
+from . import _kernels
 
 @dataclass
 class FeatureSet:
@@ -12,27 +15,78 @@ class FeatureSet:
     timestamp: float
     metadata: Dict[str, Any]
 
+@dataclass
+class FeatureBatch:
+    """Container for features extracted from a batch of packets."""
+    features: Dict[str, np.ndarray]
+    timestamps: np.ndarray
+    metadata: Dict[str, Any]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+# protocol_type feature value of each known protocol
+PROTOCOL_TYPE_VALUES: Dict[str, float] = {
+    "TCP": 0.1, "UDP": 0.2, "ICMP": 0.3, "ARP": 0.4, "DNS": 0.5
+}
+# protocol_type of any protocol not listed above
+UNKNOWN_PROTOCOL_TYPE = 0.99
+
+def _protocol_type(protocol: str) -> float:
+    """Map a protocol name to a value in [0, 1)."""
+    return PROTOCOL_TYPE_VALUES.get(protocol, UNKNOWN_PROTOCOL_TYPE)
+
 class FeatureExtractor:
     """Extract features from network packets."""
     
     def __init__(self):
         self._features: Dict[str, Callable[[PacketData], float]] = {}
+        self._batch_features: Dict[str, Callable[[PacketBatch], np.ndarray]] = {}
+        self._protocol_table = np.empty(len(PROTOCOL_CODES), dtype=np.float64)
+        for name, code in PROTOCOL_CODES.items():
+            self._protocol_table[code] = _protocol_type(name)
         self._initialize_default_features()
+        # Cleared once a default feature is replaced; see extract_batch
+        self._fused_defaults = True
 
     def _initialize_default_features(self) -> None:
         """Initialize default feature extractors."""
-        self.add_feature("packet_size", lambda p: float(p.size))
-        self.add_feature("protocol_type", lambda p: hash(p.protocol) % 1000 / 1000.0)
-        self.add_feature("port_range", lambda p: (p.src_port or 0) / 65535.0)
+        self.add_feature("packet_size", lambda p: float(p.size),
+                         lambda b: b.sizes.astype(np.float64))
+        protocol_type = PROTOCOL_TYPE_VALUES.get
+        self.add_feature("protocol_type", lambda p: protocol_type(p.protocol, UNKNOWN_PROTOCOL_TYPE),
+                         self._batch_protocol_type)
+        self.add_feature("port_range", lambda p: (p.src_port or 0) / 65535.0,
+                         lambda b: b.src_ports / 65535.0)
+
+    def _batch_protocol_type(self, batch: PacketBatch) -> np.ndarray:
+        """Vectorized protocol_type feature using the protocol code table."""
+        values = self._protocol_table[batch.protocols]
+        self._lookup_uncoded_protocols(batch, values)
+        return values
+
+    def _lookup_uncoded_protocols(self, batch: PacketBatch, values: np.ndarray) -> None:
+        """Look up protocols without a dedicated code individually, in place."""
+        for i in np.flatnonzero(batch.protocols == 0):
+            values[i] = _protocol_type(batch.packets[i].protocol)
         
-    def add_feature(self, name: str, extractor: Callable[[PacketData], float]) -> None:
+    def add_feature(self, name: str, extractor: Callable[[PacketData], float],
+                    batch_extractor: Optional[Callable[[PacketBatch], np.ndarray]] = None) -> None:
         """Add a new feature extractor.
         
         Args:
             name: Feature name
             extractor: Function that extracts the feature from a packet
+            batch_extractor: Optional vectorized version of ``extractor`` that
+                returns one value per packet of a PacketBatch
         """
+        if name in _kernels.DEFAULT_FEATURES:
+            self._fused_defaults = False
         self._features[name] = extractor
+        if batch_extractor is not None:
+            self._batch_features[name] = batch_extractor
+        else:
+            self._batch_features.pop(name, None)
 
     def extract(self, packet: PacketData) -> FeatureSet:
         """Extract all registered features from a packet.
@@ -53,6 +107,101 @@ class FeatureExtractor:
             metadata={"original_packet": packet}
         )
 
+    def extract_batch(self, batch: Union[PacketBatch, Sequence[PacketData]]) -> FeatureBatch:
+        """Extract all registered features from a batch of packets.
+
+        A plain sequence of packets is converted with PacketBatch.from_packets
+        first. The default features are computed together by one fused kernel
+        unless one of them has been replaced. Features registered without a
+        batch extractor fall back to calling the per-packet extractor on
+        each packet.
+
+        Args:
+            batch: Packets to extract features from
+
+        Returns:
+            FeatureBatch with one array per feature
+        """
+        if not isinstance(batch, PacketBatch):
+            batch = PacketBatch.from_packets(batch)
+        features = {}
+        if self._fused_defaults:
+            block = np.empty((len(_kernels.DEFAULT_FEATURES), len(batch)), dtype=np.float64)
+            _kernels.extract_default(batch.sizes, batch.protocols, batch.src_ports,
+                                     self._protocol_table, block)
+            features.update(zip(_kernels.DEFAULT_FEATURES, block))
+            self._lookup_uncoded_protocols(batch, features["protocol_type"])
+        for name, extractor in self._features.items():
+            if name in features:
+                continue
+            batch_extractor = self._batch_features.get(name)
+            if batch_extractor is not None:
+                features[name] = batch_extractor(batch)
+            else:
+                features[name] = np.fromiter(
+                    (extractor(p) for p in batch.packets),
+                    dtype=np.float64, count=len(batch)
+                )
+        return FeatureBatch(
+            features=features,
+            timestamps=batch.timestamps,
+            metadata={"original_packets": batch.packets, "protocols": batch.protocols}
+        )
+
+class _WindowedFeatureStats:
+    """Mean, standard deviation, max and min of one feature over a sliding window.
+
+    Mean and variance follow Welford's update, run backwards when a value
+    leaves the window. Max and min come from monotonic deques of
+    (sequence number, value) whose front is always the current extreme.
+    """
+
+    __slots__ = ("count", "mean", "m2", "_max", "_min")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._min: Deque[Tuple[int, float]] = deque()
+
+    def add(self, seq: int, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        # Values that can never be the extreme again are dropped for good
+        largest = self._max
+        while largest and largest[-1][1] <= value:
+            largest.pop()
+        largest.append((seq, value))
+        smallest = self._min
+        while smallest and smallest[-1][1] >= value:
+            smallest.pop()
+        smallest.append((seq, value))
+
+    def remove(self, seq: int, value: float) -> None:
+        """Remove the oldest value in the window."""
+        self.count -= 1
+        if self.count:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            # Round-off can leave a tiny negative sum of squares
+            self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+        else:
+            self.mean = self.m2 = 0.0
+
+        if self._max[0][0] == seq:
+            self._max.popleft()
+        if self._min[0][0] == seq:
+            self._min.popleft()
+
+    def summary(self) -> Tuple[float, float, float, float]:
+        """Return (mean, population std, max, min)."""
+        return (self.mean, math.sqrt(self.m2 / self.count),
+                self._max[0][1], self._min[0][1])
+
 class WindowProcessor:
     """Process packets in time windows."""
     
@@ -65,63 +214,121 @@ class WindowProcessor:
         """
         self.window_size = window_size
         self.overlap = overlap
-        self._buffer: List[FeatureSet] = []
+        # (timestamp, feature values) inside the current window, oldest first
+        self._buffer: Deque[Tuple[float, List[float]]] = deque()
         self._step_size = window_size * (1 - overlap)
+        self._last_emit = float("-inf")
+        # Feature order and running statistics, set up by the first feature set
+        self._feature_names: Optional[Tuple[str, ...]] = None
+        self._stats: List[_WindowedFeatureStats] = []
+        self._next_seq = 0
 
     def process(self, feature_set: FeatureSet) -> Optional[np.ndarray]:
         """Process a new feature set.
+
+        Statistics are updated as features enter and leave the window, so
+        each call costs the same however many packets the window holds.
         
         Args:
             feature_set: New features to process
             
         Returns:
-            Processed window data if a window is complete, None otherwise
+            Mean, std, max and min of each feature over the window,
+            interleaved per feature. Windows are emitted at most once per
+            step of ``window_size * (1 - overlap)`` seconds; None otherwise.
         """
-        self._buffer.append(feature_set)
-        
-        # Remove old features
-        cutoff_time = feature_set.timestamp - self.window_size
-        self._buffer = [f for f in self._buffer if f.timestamp > cutoff_time]
-        
-        # Check if we have enough data for a window
-        if len(self._buffer) > 0:
-            window_start = self._buffer[-1].timestamp - self.window_size
-            window_features = [f for f in self._buffer if f.timestamp > window_start]
-            
-            if len(window_features) > 0:
-                return self._process_window(window_features)
-        
-        return None
+        self._start(feature_set.features)
+        features = feature_set.features
+        values = [float(features[name]) for name in self._feature_names]
+        return self._push(feature_set.timestamp, values)
+
+    def process_batch(self, feature_batch: FeatureBatch) -> List[np.ndarray]:
+        """Process a batch of features, as ``process`` on each packet in order.
+
+        The feature columns are converted to rows of floats in one go rather
+        than packet by packet.
 
-    def _process_window(self, window_features: List[FeatureSet]) -> np.ndarray:
-        """Process a complete window of features.
-        
         Args:
-            window_features: List of feature sets in the window
-            
+            feature_batch: New features to process
+
         Returns:
-            Processed window data as numpy array
+            Every window emitted while the batch was added, oldest first
         """
-        # Extract all feature names
-        feature_names = window_features[0].features.keys()
-        
-        # Create feature arrays
-        feature_arrays = {
-            name: np.array([f.features[name] for f in window_features])
-            for name in feature_names
-        }
+        if not len(feature_batch):
+            return []
+        self._start(feature_batch.features)
+        columns = [feature_batch.features[name] for name in self._feature_names]
+        rows = np.column_stack(columns).astype(np.float64, copy=False).tolist()
+        windows = []
+        for timestamp, values in zip(feature_batch.timestamps.tolist(), rows):
+            window = self._push(timestamp, values)
+            if window is not None:
+                windows.append(window)
+        return windows
+
+    def _start(self, features: Dict[str, Any]) -> None:
+        """Fix the feature order and set up statistics on the first packet."""
+        if self._feature_names is None:
+            self._feature_names = tuple(features)
+            self._stats = [_WindowedFeatureStats() for _ in self._feature_names]
+
+    def _push(self, timestamp: float, values: List[float]) -> Optional[np.ndarray]:
+        """Add one packet's feature values; see ``process``."""
+        seq = self._next_seq
+        self._next_seq += 1
+        for stats, value in zip(self._stats, values):
+            stats.add(seq, value)
+        buffer = self._buffer
+        buffer.append((timestamp, values))
         
-        # Compute statistics for each feature
-        window_stats = []
-        for name, values in feature_arrays.items():
-            window_stats.extend([
-                np.mean(values),
-                np.std(values),
-                np.max(values),
-                np.min(values)
-            ])
-            
-        return np.array(window_stats)
+        # Remove old features
+        cutoff_time = timestamp - self.window_size
+        while buffer[0][0] <= cutoff_time:
+            _, old_values = buffer.popleft()
+            old_seq = self._next_seq - len(buffer) - 1
+            for stats, value in zip(self._stats, old_values):
+                stats.remove(old_seq, value)
+
+        if timestamp - self._last_emit < self._step_size:
+            return None
+        self._last_emit = timestamp
+        return np.array([value for stats in self._stats for value in stats.summary()])
+
+class RollingPacketStats:
+    """Byte and protocol totals over the most recent packets, updated incrementally."""
+
+    def __init__(self, window: int = 100):
+        """Initialize rolling statistics.
+
+        Args:
+            window: Number of most recent packets to cover
+        """
+        self.window = window
+        self.total_bytes = 0
+        self.protocols: Dict[str, int] = Counter()
+        self._recent: Deque[Tuple[int, str]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def add(self, packet: PacketData) -> None:
+        """Add a packet, dropping the oldest one once the window is full."""
+        if len(self._recent) == self.window:
+            size, protocol = self._recent.popleft()
+            self.total_bytes -= size
+            remaining = self.protocols[protocol] - 1
+            if remaining:
+                self.protocols[protocol] = remaining
+            else:
+                del self.protocols[protocol]
+        self._recent.append((packet.size, packet.protocol))
+        self.total_bytes += packet.size
+        self.protocols[packet.protocol] += 1
+
+    def summary(self) -> str:
+        """Format the totals as a one-line status string."""
+        counts = " | ".join(f"{proto}: {count}" for proto, count in list(self.protocols.items()))
+        return f"Last {len(self._recent)} packets: {self.total_bytes} bytes | {counts}"
 
 class DataNormalizer:
     """Normalize feature values to a specified range."""
@@ -134,6 +341,20 @@ class DataNormalizer:
         """
         self.feature_ranges = feature_ranges
         self._stats: Dict[str, Dict[str, float]] = {}
+        # name -> (min, scale, target min), so value maps to
+        # (value - min) * scale + target min; refreshed when min or max moves
+        self._coefficients: Dict[str, Tuple[float, float, float]] = {}
+
+    def _refresh_coefficients(self, name: str) -> None:
+        """Recompute the linear map of one feature from its statistics."""
+        target_range = self.feature_ranges.get(name)
+        if target_range is None:
+            return
+        target_min, target_max = target_range
+        stats = self._stats[name]
+        span = stats["max"] - stats["min"]
+        scale = (target_max - target_min) / span if span else 0.0
+        self._coefficients[name] = (stats["min"], scale, target_min)
 
     def update_stats(self, feature_set: FeatureSet) -> None:
         """Update running statistics for features.
@@ -142,11 +363,16 @@ class DataNormalizer:
             feature_set: New features to update statistics with
         """
         for name, value in feature_set.features.items():
-            if name not in self._stats:
+            stats = self._stats.get(name)
+            if stats is None:
                 self._stats[name] = {"min": value, "max": value}
+            elif value < stats["min"]:
+                stats["min"] = value
+            elif value > stats["max"]:
+                stats["max"] = value
             else:
-                self._stats[name]["min"] = min(self._stats[name]["min"], value)
-                self._stats[name]["max"] = max(self._stats[name]["max"], value)
+                continue
+            self._refresh_coefficients(name)
 
     def normalize(self, feature_set: FeatureSet) -> FeatureSet:
         """Normalize feature values to their specified ranges.
@@ -158,17 +384,16 @@ class DataNormalizer:
             New FeatureSet with normalized values
         """
         normalized_features = {}
+        coefficients = self._coefficients
         
         for name, value in feature_set.features.items():
-            if name in self.feature_ranges:
-                target_min, target_max = self.feature_ranges[name]
-                stats = self._stats.get(name, {"min": value, "max": value})
-                
-                # Normalize to [0, 1] then scale to target range
-                normalized = (value - stats["min"]) / (stats["max"] - stats["min"])
-                normalized = normalized * (target_max - target_min) + target_min
-                
-                normalized_features[name] = normalized
+            mapping = coefficients.get(name)
+            if mapping is not None:
+                feature_min, scale, target_min = mapping
+                normalized_features[name] = (value - feature_min) * scale + target_min
+            elif name in self.feature_ranges:
+                # No statistics yet: the value is both min and max
+                normalized_features[name] = self.feature_ranges[name][0]
             else:
                 normalized_features[name] = value
                 
@@ -177,3 +402,63 @@ class DataNormalizer:
             timestamp=feature_set.timestamp,
             metadata=feature_set.metadata
         )
+
+    def update_stats_batch(self, feature_batch: FeatureBatch) -> None:
+        """Update running statistics with a whole batch of features.
+
+        Args:
+            feature_batch: New features to update statistics with
+        """
+        for name, values in feature_batch.features.items():
+            if not len(values):
+                continue
+            batch_min = float(values.min())
+            batch_max = float(values.max())
+            stats = self._stats.get(name)
+            if stats is None:
+                self._stats[name] = {"min": batch_min, "max": batch_max}
+            elif batch_min < stats["min"] or batch_max > stats["max"]:
+                stats["min"] = min(stats["min"], batch_min)
+                stats["max"] = max(stats["max"], batch_max)
+            else:
+                continue
+            self._refresh_coefficients(name)
+
+    def normalize_batch(self, feature_batch: FeatureBatch) -> FeatureBatch:
+        """Normalize a batch of feature values to their specified ranges.
+
+        Args:
+            feature_batch: Features to normalize
+
+        Returns:
+            New FeatureBatch with normalized values
+        """
+        normalized_features = {}
+
+        for name, values in feature_batch.features.items():
+            if name in self.feature_ranges and name in self._stats:
+                target_min, target_max = self.feature_ranges[name]
+                stats = self._stats[name]
+                span = stats["max"] - stats["min"]
+
+                # Normalize to [0, 1] then scale to target range
+                normalized = np.subtract(values, stats["min"], dtype=np.float64)
+                if span:
+                    normalized /= span
+                else:
+                    normalized.fill(0.0)
+                normalized *= target_max - target_min
+                normalized += target_min
+
+                normalized_features[name] = normalized
+            elif name in self.feature_ranges:
+                # No statistics yet: every value is both min and max
+                normalized_features[name] = np.full(len(values), self.feature_ranges[name][0])
+            else:
+                normalized_features[name] = values
+
+        return FeatureBatch(
+            features=normalized_features,
+            timestamps=feature_batch.timestamps,
+            metadata=feature_batch.metadata
+        )
@@ -0,0 +1,24 @@
+"""Fused feature kernels that write into preallocated arrays."""
+
+import numpy as np
+
+# Features computed by extract_default, in its row order
+DEFAULT_FEATURES = ("packet_size", "protocol_type", "port_range")
+
+def extract_default(sizes: np.ndarray, protocols: np.ndarray, src_ports: np.ndarray,
+                    protocol_table: np.ndarray, out: np.ndarray) -> None:
+    """Compute the default features of a batch into the rows of ``out``.
+
+    Each feature is written straight into its row of the (3, n) block, so a
+    batch costs one allocation instead of a temporary per feature.
+
+    Args:
+        sizes: Packet sizes
+        protocols: Protocol codes, used to index ``protocol_table``
+        src_ports: Source ports, 0 where unknown
+        protocol_table: protocol_type value of each protocol code
+        out: float64 array of shape (3, n)
+    """
+    np.copyto(out[0], sizes, casting="unsafe")
+    np.take(protocol_table, protocols, out=out[1])
+    np.divide(src_ports, 65535.0, out=out[2])
@@ -6,6 +6,14 @@ from typing import Any, Dict, Optional
 from dataclasses import dataclass
 import logging
 from pathlib import Path
+from .spsc import SPSCQueue
+from .affinity import pin_current_thread
+from .sampling import AliasSampler
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib encoder is used instead
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -115,12 +123,25 @@ class ConfigManager:
             }
         }
         
+        if orjson is not None:
+            data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(config, indent=4).encode()
+
+        # Write a sibling file and rename it over the config, so an
+        # interrupted save never leaves a truncated config behind
+        tmp_path = self.config_path + ".tmp"
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=4)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.config_path)
             logger.info(f"Saved configuration to {self.config_path}")
         except Exception as e:
             logger.error(f"Error saving configuration: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
 class Validator:
     """Validate input data and parameters."""
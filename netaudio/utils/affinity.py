@@ -0,0 +1,41 @@
+"""CPU placement and scheduling for pipeline threads."""
+
+import os
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+def pin_current_thread(cpu: int, realtime_priority: Optional[int] = None) -> bool:
+    """Pin the calling thread to one CPU and optionally make it SCHED_FIFO.
+
+    Best effort: platforms without ``os.sched_setaffinity`` are left alone,
+    and a refused real-time priority (it needs root or CAP_SYS_NICE) only
+    keeps the default policy.
+
+    Args:
+        cpu: Index into the CPUs this process may run on; wraps around when
+            there are fewer CPUs than pipeline threads
+        realtime_priority: Optional SCHED_FIFO priority (1-99)
+
+    Returns:
+        True if the thread was pinned
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+
+    try:
+        # On Linux, pid 0 refers to the calling thread rather than the process
+        allowed = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {allowed[cpu % len(allowed)]})
+    except OSError as e:
+        logger.debug(f"Could not pin thread to CPU {cpu}: {e}")
+        return False
+
+    if realtime_priority is not None:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(realtime_priority))
+        except OSError as e:
+            logger.debug(f"Could not raise thread priority: {e}")
+
+    return True
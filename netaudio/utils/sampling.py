@@ -0,0 +1,62 @@
+"""Weighted random selection."""
+
+import random
+from typing import Any, List, Optional, Sequence
+
+class AliasSampler:
+    """Weighted choice from a fixed population in O(1) per draw.
+
+    Builds the probability and alias tables of Vose's alias method once, so
+    each draw costs one uniform random number and a table lookup instead of
+    the cumulative weight scan ``random.choices`` does on every call.
+    """
+
+    def __init__(self, population: Sequence[Any], weights: Sequence[float],
+                 rng: Optional[random.Random] = None):
+        """Initialize sampler.
+
+        Args:
+            population: Items to choose from
+            weights: Relative non-negative weight of each item
+            rng: Optional random generator; the module-level one if None
+        """
+        n = len(population)
+        if n == 0 or len(weights) != n:
+            raise ValueError("Population and weights must be non-empty and the same length")
+        total = float(sum(weights))
+        if total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with a positive sum")
+
+        self.population = list(population)
+        self._random = (rng or random).random
+        self._prob: List[float] = [1.0] * n
+        self._alias: List[int] = list(range(n))
+
+        # Scale so the average weight is 1, then pair each under-full column
+        # with an over-full one that tops it up
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is full up to rounding error and keeps probability 1
+
+    def __len__(self) -> int:
+        return len(self.population)
+
+    def draw(self) -> Any:
+        """Return one item chosen according to the weights."""
+        u = self._random() * len(self._prob)
+        i = int(u)
+        if u - i >= self._prob[i]:
+            i = self._alias[i]
+        return self.population[i]
+
+    def draw_many(self, k: int) -> List[Any]:
+        """Return ``k`` independent weighted draws."""
+        return [self.draw() for _ in range(k)]
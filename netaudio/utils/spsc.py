@@ -0,0 +1,123 @@
+"""Bounded single-producer/single-consumer queue."""
+
+import queue
+import threading
+from typing import Any, List, Optional
+
+class SPSCQueue:
+    """Bounded queue for exactly one producer thread and one consumer thread.
+
+    Items live in a preallocated slot list indexed by two monotonically
+    increasing counters, each written by only one side, so the common path
+    takes no lock. Events are only touched to wake a side that is waiting
+    on an empty or full queue.
+
+    ``get`` and ``put`` raise ``queue.Empty`` and ``queue.Full`` like the
+    standard library queues.
+    """
+
+    def __init__(self, capacity: int):
+        """Initialize queue.
+
+        Args:
+            capacity: Maximum number of queued items
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self._slots: List[Any] = [None] * capacity
+        self._read_pos = 0   # Total items consumed
+        self._write_pos = 0  # Total items produced
+        self._not_empty = threading.Event()
+        self._not_full = threading.Event()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return self._write_pos - self._read_pos
+
+    @property
+    def closed(self) -> bool:
+        """Whether ``close`` has been called."""
+        return self._closed
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> None:
+        """Append an item, waiting while the queue is full.
+
+        Args:
+            item: Item to append
+            timeout: Maximum time in seconds to wait for space; 0 never waits
+
+        Raises:
+            queue.Full: If no space became available in time or the queue
+                was closed
+        """
+        while self._write_pos - self._read_pos >= self.capacity:
+            if self._closed:
+                raise queue.Full
+            self._not_full.clear()
+            # Re-check after clearing so a concurrent get is not missed
+            if (self._write_pos - self._read_pos >= self.capacity
+                    and not self._not_full.wait(timeout)):
+                raise queue.Full
+
+        self._slots[self._write_pos % self.capacity] = item
+        self._write_pos += 1
+        if not self._not_empty.is_set():
+            self._not_empty.set()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Remove and return the oldest item, waiting while the queue is empty.
+
+        Args:
+            timeout: Maximum time in seconds to wait for an item; 0 never waits
+
+        Returns:
+            The oldest queued item
+
+        Raises:
+            queue.Empty: If no item arrived in time or the queue was closed
+        """
+        while self._write_pos == self._read_pos:
+            if self._closed:
+                raise queue.Empty
+            self._not_empty.clear()
+            if self._write_pos == self._read_pos and not self._not_empty.wait(timeout):
+                raise queue.Empty
+
+        index = self._read_pos % self.capacity
+        item = self._slots[index]
+        self._slots[index] = None
+        self._read_pos += 1
+        if not self._not_full.is_set():
+            self._not_full.set()
+        return item
+
+    def get_many(self, max_items: int, timeout: Optional[float] = None) -> List[Any]:
+        """Wait for at least one item, then take up to ``max_items`` without waiting.
+
+        Args:
+            max_items: Maximum number of items to return
+            timeout: Maximum time in seconds to wait for the first item
+
+        Returns:
+            List of between 1 and ``max_items`` items, oldest first
+
+        Raises:
+            queue.Empty: If no item arrived in time or the queue was closed
+        """
+        items = [self.get(timeout)]
+        available = min(max_items - 1, self._write_pos - self._read_pos)
+        for _ in range(available):
+            index = self._read_pos % self.capacity
+            items.append(self._slots[index])
+            self._slots[index] = None
+            self._read_pos += 1
+        if available and not self._not_full.is_set():
+            self._not_full.set()
+        return items
+
+    def close(self) -> None:
+        """Wake any waiting thread; further waits fail immediately."""
+        self._closed = True
+        self._not_empty.set()
+        self._not_full.set()
@@ -10,6 +10,7 @@ converting it to audio.
 
 import sys
 import os
+import functools
 import time
 import random
 import numpy as np
@@ -48,89 +49,210 @@ AUDIO_PROFILES = {
     }
 }
 
+# Packet type mix of each traffic pattern; "random" and unknown patterns
+# draw every packet type equally
+TRAFFIC_PATTERNS = {
+    # Simulate web browsing: mostly TCP, some small UDP
+    "web_browsing": {"TCP_SYN": 0.1, "TCP_ACK": 0.3, "TCP_DATA": 0.5, "UDP_SMALL": 0.1},
+    # Simulate port scan: many TCP SYN packets
+    "port_scan": {"TCP_SYN": 0.9, "TCP_ACK": 0.1},
+    # Simulate data transfer: mostly large TCP data packets
+    "data_transfer": {"TCP_SYN": 0.05, "TCP_ACK": 0.15, "TCP_DATA": 0.8},
+}
+
+# Packets' worth of random draws made at once
+DRAW_BATCH = 1024
+
+# Pitch steps across each packet type's frequency range; tones are
+# prerendered at each step instead of synthesized per packet
+TONE_BINS = 32
+
 class SimulatedPacket:
     """Simulated network packet."""
 
-    def __init__(self, packet_type):
-        """Initialize with a packet type."""
+    def __init__(self, packet_type, size=None):
+        """Initialize with a packet type and optionally a size."""
         self.type = packet_type
         self.timestamp = time.time()
 
         # Generate random size within the range for this packet type
-        size_range = PACKET_TYPES[packet_type]["size_range"]
-        self.size = random.randint(size_range[0], size_range[1])
+        if size is None:
+            size_range = PACKET_TYPES[packet_type]["size_range"]
+            size = random.randint(size_range[0], size_range[1])
+        self.size = size
 
     def __str__(self):
         """String representation."""
         return f"{self.type} packet, {self.size} bytes, {datetime.fromtimestamp(self.timestamp).strftime('%H:%M:%S.%f')[:-3]}"
 
+_ramp = np.arange(0, dtype=np.float32)
+
+def _grow_ramp(count):
+    """Make the shared sample ramp at least ``count`` samples long."""
+    global _ramp
+    if len(_ramp) < count:
+        _ramp = np.arange(count, dtype=np.float32)
+
+def _phase(frequency, duration, sample_rate):
+    """Return a new float32 array with the phase of each sample in cycles."""
+    count = int(sample_rate * duration)
+    _grow_ramp(count)
+    return np.multiply(_ramp[:count], np.float32(frequency / sample_rate))
+
 def generate_sine_wave(frequency, duration, amplitude=0.5, sample_rate=44100):
     """Generate a sine wave."""
-    t = np.linspace(0, duration, int(sample_rate * duration))
-    return amplitude * np.sin(2 * np.pi * frequency * t)
+    signal = _phase(frequency, duration, sample_rate)
+    signal *= 2 * np.pi
+    np.sin(signal, out=signal)
+    signal *= amplitude
+    return signal
+
+def _centered_fraction(signal):
+    """Wrap phases in cycles to [-0.5, 0.5) in place."""
+    signal += 0.5
+    np.mod(signal, 1.0, out=signal)
+    signal -= 0.5
 
 def generate_triangle_wave(frequency, duration, amplitude=0.5, sample_rate=44100):
     """Generate a triangle wave."""
-    t = np.linspace(0, duration, int(sample_rate * duration))
-    return amplitude * 2 * np.abs(2 * (t * frequency - np.floor(t * frequency + 0.5))) - amplitude
+    signal = _phase(frequency, duration, sample_rate)
+    _centered_fraction(signal)
+    np.abs(signal, out=signal)
+    signal *= 4 * amplitude
+    signal -= amplitude
+    return signal
 
 def generate_sawtooth_wave(frequency, duration, amplitude=0.5, sample_rate=44100):
     """Generate a sawtooth wave."""
-    t = np.linspace(0, duration, int(sample_rate * duration))
-    return amplitude * 2 * (t * frequency - np.floor(0.5 + t * frequency))
+    signal = _phase(frequency, duration, sample_rate)
+    _centered_fraction(signal)
+    signal *= 2 * amplitude
+    return signal
+
+# Waveform name -> generator
+WAVE_GENERATORS = {
+    "sine": generate_sine_wave,
+    "triangle": generate_triangle_wave,
+    "sawtooth": generate_sawtooth_wave,
+}
+
+# Wet signal of the last reverb, reused so tones allocate nothing
+_reverb_scratch = np.empty(0, dtype=np.float32)
+
+@functools.lru_cache(maxsize=32)
+def _reverb_envelope(mix, decay, sample_rate, count):
+    """Return the wet gain of each delayed sample as a read-only float32 array.
+
+    Packet types have a handful of fixed durations, so every tone after the
+    first reuses a cached envelope instead of evaluating ``np.exp`` again.
+    """
+    envelope = np.arange(count, dtype=np.float32)
+    envelope *= -1.0 / (decay * sample_rate)
+    np.exp(envelope, out=envelope)
+    envelope *= mix
+    envelope.flags.writeable = False
+    return envelope
 
 def apply_reverb(signal, mix=0.3, decay=1.0, sample_rate=44100):
-    """Apply a simple reverb effect."""
+    """Apply a simple reverb effect, mixing it into ``signal`` in place."""
     if mix == 0:
         return signal
 
+    global _reverb_scratch
+
     # Create a simple delay-based reverb
     delay_samples = int(0.05 * sample_rate)  # 50ms delay
-    decay_factor = np.exp(-np.arange(len(signal)) / (decay * sample_rate))
-
-    reverb = np.zeros_like(signal)
+    reverb = None
     if delay_samples < len(signal):
-        reverb[delay_samples:] = signal[:-delay_samples] * decay_factor[:-delay_samples]
+        count = len(signal) - delay_samples
+        envelope = _reverb_envelope(mix, decay, sample_rate, count)
+        if len(_reverb_scratch) < count or _reverb_scratch.dtype != signal.dtype:
+            _reverb_scratch = np.empty(count, dtype=signal.dtype)
+        reverb = np.multiply(signal[:-delay_samples], envelope, out=_reverb_scratch[:count])
+
+    signal *= 1 - mix
+    if reverb is not None:
+        signal[delay_samples:] += reverb
+    return signal
+
+def render_tone(packet_type, profile, frequency, sample_rate=44100):
+    """Synthesize the tone for a packet type at ``frequency`` and apply reverb."""
+    packet_info = PACKET_TYPES[packet_type]
+    profile_info = AUDIO_PROFILES[profile]
 
-    return (1 - mix) * signal + mix * reverb
+    # Get duration and amplitude
+    duration = packet_info["duration"]
+    amplitude = profile_info["amplitude"]
 
-def packet_to_audio(packet, profile="ambient", sample_rate=44100):
-    """Convert a packet to audio based on its characteristics and the selected profile."""
-    # Get packet type characteristics
-    packet_info = PACKET_TYPES[packet.type]
+    # Generate waveform based on profile; unknown waveforms fall back to sine
+    generate = WAVE_GENERATORS.get(profile_info["waveform"], generate_sine_wave)
+    signal = generate(frequency, duration, amplitude, sample_rate)
 
-    # Get profile characteristics
-    profile_info = AUDIO_PROFILES[profile]
+    # Apply reverb
+    return apply_reverb(signal, profile_info["reverb"], 1.0, sample_rate)
+
+@functools.lru_cache(maxsize=None)
+def _banked_tone(packet_type, profile, tone_bin, sample_rate):
+    """Return the read-only tone and frequency of one pitch step of a packet type."""
+    freq_range = PACKET_TYPES[packet_type]["frequency_range"]
+    frequency = freq_range[0] + tone_bin / (TONE_BINS - 1) * (freq_range[1] - freq_range[0])
+    frequency *= AUDIO_PROFILES[profile]["frequency_scale"]
+    signal = render_tone(packet_type, profile, frequency, sample_rate)
+    signal.flags.writeable = False
+    return signal, frequency
 
-    # Map packet size to frequency within the range for this packet type
-    size_range = packet_info["size_range"]
-    freq_range = packet_info["frequency_range"]
+def warm_caches(profile="ambient", sample_rate=44100):
+    """Render the tone bank of every packet type for ``profile`` up front.
 
-    # Normalize size to 0-1 range
-    normalized_size = (packet.size - size_range[0]) / (size_range[1] - size_range[0])
+    After this, playing a packet is a dictionary lookup with no synthesis.
+    """
+    for packet_type in PACKET_TYPES:
+        for tone_bin in range(TONE_BINS):
+            _banked_tone(packet_type, profile, tone_bin, sample_rate)
 
-    # Map to frequency range and apply profile scaling
-    frequency = freq_range[0] + normalized_size * (freq_range[1] - freq_range[0])
-    frequency *= profile_info["frequency_scale"]
+def packet_to_audio(packet, profile="ambient", sample_rate=44100):
+    """Convert a packet to audio based on its characteristics and the selected profile.
 
-    # Get duration and amplitude
-    duration = packet_info["duration"]
-    amplitude = profile_info["amplitude"]
+    Tones come from a bank rendered once per pitch step, so the returned
+    array is shared and read-only.
 
-    # Generate waveform based on profile
-    if profile_info["waveform"] == "sine":
-        signal = generate_sine_wave(frequency, duration, amplitude, sample_rate)
-    elif profile_info["waveform"] == "triangle":
-        signal = generate_triangle_wave(frequency, duration, amplitude, sample_rate)
-    elif profile_info["waveform"] == "sawtooth":
-        signal = generate_sawtooth_wave(frequency, duration, amplitude, sample_rate)
-    else:
-        signal = generate_sine_wave(frequency, duration, amplitude, sample_rate)
+    Returns:
+        Tuple of (signal, frequency in Hz)
+    """
+    # Map packet size to one of TONE_BINS steps across the type's frequency range
+    size_range = PACKET_TYPES[packet.type]["size_range"]
+    normalized_size = (packet.size - size_range[0]) / (size_range[1] - size_range[0])
+    tone_bin = round(normalized_size * (TONE_BINS - 1))
+    return _banked_tone(packet.type, profile, tone_bin, sample_rate)
 
-    # Apply reverb
-    signal = apply_reverb(signal, profile_info["reverb"], 1.0, sample_rate)
+def _packet_draws(pattern, rng):
+    """Yield (packet type, size, pause in seconds) for a traffic pattern forever.
 
-    return signal, frequency
+    Random values are drawn DRAW_BATCH packets at a time, so each packet
+    costs a step of the iterator rather than several Python RNG calls.
+    """
+    weights = TRAFFIC_PATTERNS.get(pattern)
+    if weights:
+        types = list(weights)
+        probabilities = np.array(list(weights.values()))
+        probabilities /= probabilities.sum()
+    else:
+        # Random pattern and anything unknown: every packet type equally likely
+        types = list(PACKET_TYPES)
+        probabilities = None
+    low = np.array([PACKET_TYPES[t]["size_range"][0] for t in types])
+    high = np.array([PACKET_TYPES[t]["size_range"][1] for t in types])
+
+    while True:
+        chosen = rng.choice(len(types), size=DRAW_BATCH, p=probabilities)
+        sizes = rng.integers(low[chosen], high[chosen], endpoint=True)
+        if pattern == "port_scan":
+            pauses = np.full(DRAW_BATCH, 0.05)  # Fast packets for port scan
+        elif pattern == "data_transfer":
+            pauses = np.full(DRAW_BATCH, 0.2)   # Steady stream for data transfer
+        else:
+            pauses = rng.uniform(0.1, 0.5, DRAW_BATCH)  # Random timing for other patterns
+        yield from zip([types[i] for i in chosen], sizes.tolist(), pauses.tolist())
 
 def simulate_network_traffic(duration=30, profile="ambient", pattern="random"):
     """Simulate network traffic and convert it to audio.
@@ -151,6 +273,8 @@ def simulate_network_traffic(duration=30, profile="ambient", pattern="random"):
     )
     stream.start()
 
+    warm_caches(profile, sample_rate)
+
     print(f"Simulating network traffic with {profile} audio profile")
     print(f"Pattern: {pattern}")
     print(f"Duration: {duration} seconds")
@@ -158,53 +282,25 @@ def simulate_network_traffic(duration=30, profile="ambient", pattern="random"):
 
     start_time = time.time()
     packet_count = 0
+    draws = _packet_draws(pattern, np.random.default_rng())
 
     try:
         while time.time() - start_time < duration:
-            # Generate packet based on pattern
-            if pattern == "random":
-                packet_type = random.choice(list(PACKET_TYPES.keys()))
-            elif pattern == "web_browsing":
-                # Simulate web browsing: mostly TCP, some small UDP
-                packet_type = random.choices(
-                    ["TCP_SYN", "TCP_ACK", "TCP_DATA", "UDP_SMALL"],
-                    weights=[0.1, 0.3, 0.5, 0.1]
-                )[0]
-            elif pattern == "port_scan":
-                # Simulate port scan: many TCP SYN packets
-                packet_type = random.choices(
-                    ["TCP_SYN", "TCP_ACK"],
-                    weights=[0.9, 0.1]
-                )[0]
-            elif pattern == "data_transfer":
-                # Simulate data transfer: mostly large TCP data packets
-                packet_type = random.choices(
-                    ["TCP_SYN", "TCP_ACK", "TCP_DATA"],
-                    weights=[0.05, 0.15, 0.8]
-                )[0]
-            else:
-                packet_type = random.choice(list(PACKET_TYPES.keys()))
-
-            # Create packet
-            packet = SimulatedPacket(packet_type)
+            packet_type, size, pause = next(draws)
+            packet = SimulatedPacket(packet_type, size)
             packet_count += 1
 
             # Convert to audio
             audio_signal, frequency = packet_to_audio(packet, profile, sample_rate)
 
             # Play audio
-            stream.write(audio_signal.astype(np.float32))
+            stream.write(audio_signal)
 
             # Print info
             print(f"\rPackets: {packet_count}, Current: {packet.type}, Size: {packet.size} bytes, Frequency: {frequency:.1f} Hz", end="")
 
             # Wait a bit between packets based on pattern
-            if pattern == "port_scan":
-                time.sleep(0.05)  # Fast packets for port scan
-            elif pattern == "data_transfer":
-                time.sleep(0.2)   # Steady stream for data transfer
-            else:
-                time.sleep(random.uniform(0.1, 0.5))  # Random timing for other patterns
+            time.sleep(pause)
 
     except KeyboardInterrupt:
         print("\nStopped by user")
@@ -5,7 +5,7 @@ import time
 # Generate a simple sine wave
 sample_rate = 44100
 duration = 2.0  # seconds
-t = np.linspace(0, duration, int(sample_rate * duration))
+t = np.arange(int(sample_rate * duration)) / sample_rate
 frequency = 440.0  # A4 note
 amplitude = 0.5
 
@@ -6,27 +6,25 @@ import sounddevice as sd
 import numpy as np
 from scapy.all import sniff
 import threading
-import queue
+from netaudio.audio import AudioRingBuffer
 
 # Global audio parameters
 SAMPLE_RATE = 44100
 BUFFER_SIZE = 1024
-audio_queue = queue.Queue()
+# Four seconds of samples between the sniffer thread and the audio callback
+audio_ring = AudioRingBuffer(SAMPLE_RATE * 4)
 running = True
 
 def generate_tone(frequency=440.0, duration=0.1):
     """Generate a simple sine wave."""
-    t = np.linspace(0, duration, int(SAMPLE_RATE * duration))
+    t = np.arange(int(SAMPLE_RATE * duration)) / SAMPLE_RATE
     return 0.5 * np.sin(2 * np.pi * frequency * t)
 
 def audio_callback(outdata, frames, time, status):
     """Audio stream callback."""
-    try:
-        data = audio_queue.get_nowait()
-        outdata[:len(data)] = data.reshape(-1, 1)
-        outdata[len(data):] = 0
-    except queue.Empty:
-        outdata.fill(0)
+    # Plays whatever is buffered, tones spanning several callbacks
+    # included, and pads an underrun with silence
+    audio_ring.read_into(outdata[:, 0])
 
 def packet_callback(packet):
     """Handle captured packets."""
@@ -34,7 +32,8 @@ def packet_callback(packet):
     size = len(packet)
     freq = 220 + (size % 1000)
     tone = generate_tone(freq)
-    audio_queue.put(tone)
+    # Never stall the sniffer; drop what does not fit
+    audio_ring.write(tone, timeout=0)
     print(f"\rPacket size: {size}, Frequency: {freq:.1f} Hz", end="")
 
 def main():
@@ -2,9 +2,11 @@
 
 import pytest
 import numpy as np
-from netaudio.capture import PacketData
-from netaudio.processors import FeatureExtractor, FeatureSet
-from netaudio.audio import AudioMapper, AudioParameters, Synthesizer
+from netaudio.capture import PacketData, PacketBatch, PacketRing
+from netaudio.processors import FeatureExtractor, FeatureSet, FeatureBatch, DataNormalizer, RollingPacketStats, WindowProcessor
+from netaudio.audio import AudioMapper, AudioParameters, Synthesizer, AudioRingBuffer, AudioBufferPool
+from netaudio.audio import _filters
+from netaudio.utils import SPSCQueue, AliasSampler
 
 @pytest.fixture
 def sample_packet():
@@ -19,17 +21,18 @@ def sample_packet():
         payload=b"Test payload"
     )
 
-@pytest.fixture
+# None of the tests reconfigure these, so each module shares one instance
+@pytest.fixture(scope="module")
 def feature_extractor():
     """Create a feature extractor instance."""
     return FeatureExtractor()
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def audio_mapper():
     """Create an audio mapper instance."""
     return AudioMapper()
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def synthesizer():
     """Create a synthesizer instance."""
     return Synthesizer(sample_rate=44100)
@@ -47,6 +50,41 @@ def test_packet_feature_extraction(sample_packet, feature_extractor):
     assert 0 <= features.features["protocol_type"] <= 1
     assert 0 <= features.features["port_range"] <= 1
 
+def test_batch_feature_pipeline(sample_packet, feature_extractor, audio_mapper):
+    """Test that batch processing matches per-packet processing."""
+    packets = [
+        sample_packet,
+        PacketData(timestamp=1234567891.0, size=60, protocol="UDP", src_port=None,
+                   dst_port=53, flags={}, payload=b""),
+        PacketData(timestamp=1234567892.0, size=90, protocol="ARP", src_port=None,
+                   dst_port=None, flags={}, payload=b"")
+    ]
+    batch = feature_extractor.extract_batch(PacketBatch.from_packets(packets))
+    assert len(batch) == len(packets)
+    from_list = feature_extractor.extract_batch(packets)
+    for name, values in batch.features.items():
+        np.testing.assert_array_equal(from_list.features[name], values)
+
+    for i, packet in enumerate(packets):
+        features = feature_extractor.extract(packet)
+        for name, value in features.features.items():
+            assert batch.features[name][i] == pytest.approx(value)
+
+    normalizer = DataNormalizer({"packet_size": (0.0, 1.0)})
+    normalizer.update_stats_batch(batch)
+    normalized = normalizer.normalize_batch(batch)
+    np.testing.assert_allclose(normalized.features["packet_size"], [1.0, 0.0, 30 / 1440])
+
+    params = audio_mapper.map_batch(normalized)
+    assert [p.waveform for p in params] == [
+        audio_mapper.map_packet(FeatureSet(
+            features={name: values[i] for name, values in normalized.features.items()},
+            timestamp=packet.timestamp,
+            metadata={"original_packet": packet}
+        )).waveform
+        for i, packet in enumerate(packets)
+    ]
+
 def test_audio_mapping(sample_packet, feature_extractor, audio_mapper):
     """Test mapping packet features to audio parameters."""
     features = feature_extractor.extract(sample_packet)
@@ -93,11 +131,51 @@ def test_waveform_types(synthesizer):
         assert len(signal) == int(synthesizer.sample_rate * duration)
         
         if waveform != "noise":
-            # Check periodicity for deterministic waveforms
-            period_samples = int(synthesizer.sample_rate / frequency)
-            first_period = signal[:period_samples]
-            second_period = signal[period_samples:2*period_samples]
-            np.testing.assert_array_almost_equal(first_period, second_period, decimal=5)
+            # Deterministic waveforms peak at their fundamental
+            spectrum = np.abs(np.fft.rfft(signal))
+            expected_bin = round(frequency * len(signal) / synthesizer.sample_rate)
+            assert abs(int(np.argmax(spectrum)) - expected_bin) <= 1
+
+def test_generate_batch():
+    """Batched synthesis should match one generate call per tone."""
+    params = [
+        AudioParameters(frequency=frequency, amplitude=0.5, waveform=waveform,
+                        duration=duration, effects={}, profile=profile)
+        for frequency, waveform, duration, profile in [
+            (440.0, "sine", 0.1, "musical"),
+            (660.0, "sawtooth", 0.2, "alert"),
+            (523.3, "sine", 0.1, "musical"),
+            (300.0, "square", 0.2, "alert"),
+            (880.0, "triangle", 0.1, "musical")
+        ]
+    ]
+
+    sequential = Synthesizer()
+    expected = [sequential.generate(p) for p in params]
+    signals = Synthesizer().generate_batch(params)
+
+    assert len(signals) == len(params)
+    for signal, reference in zip(signals, expected):
+        assert signal.shape == reference.shape
+        np.testing.assert_allclose(signal, reference, atol=1e-5)
+
+def test_filtered_noise_varying_frequency(synthesizer):
+    """Per-tone noise cutoffs should not design or evict cached FIR taps."""
+    synthesizer.generate(AudioParameters(
+        frequency=300.0, amplitude=0.5, waveform="filtered_noise", duration=0.15,
+        effects={}, profile="ambient"
+    ))
+    taps = _filters._butter_fir.cache_info().currsize
+
+    rng = np.random.default_rng(0)
+    for frequency in rng.uniform(50.0, 1000.0, 20):
+        signal = synthesizer.generate(AudioParameters(
+            frequency=float(frequency), amplitude=0.5, waveform="filtered_noise",
+            duration=0.15, effects={}, profile="ambient"
+        ))
+        assert len(signal) == int(synthesizer.sample_rate * 0.15)
+        assert np.all(np.isfinite(signal))
+    assert _filters._butter_fir.cache_info().currsize == taps
 
 def test_audio_effects(synthesizer):
     """Test audio effects processing."""
@@ -145,3 +223,169 @@ def test_invalid_parameters():
             effects={}
         )
         synthesizer.generate(params)
+
+def test_audio_ring_buffer():
+    """Test ring buffer wraparound and underrun padding."""
+    ring = AudioRingBuffer(8)
+    out = np.empty(6, dtype=np.float32)
+
+    assert ring.write(np.arange(6, dtype=np.float32)) == 6
+    assert ring.read_into(out) == 6
+    np.testing.assert_array_equal(out, np.arange(6))
+
+    # Wraps around the end of the ring
+    assert ring.write(np.arange(10, 16, dtype=np.float32)) == 6
+    assert ring.free == 2
+    assert ring.read_into(out[:4]) == 4
+    np.testing.assert_array_equal(out[:4], [10, 11, 12, 13])
+
+    # Underrun is zero padded
+    assert ring.read_into(out) == 2
+    np.testing.assert_array_equal(out, [14, 15, 0, 0, 0, 0])
+
+    # Full ring with a timeout writes what fits
+    assert ring.write(np.ones(10, dtype=np.float32), timeout=0.01) == 8
+
+def test_audio_buffer_pool():
+    """Test that released buffers are reused."""
+    pool = AudioBufferPool(1, 16)
+    first = pool.acquire()
+    assert first.dtype == np.float32 and len(first) == 16
+
+    # Empty pool allocates instead of blocking
+    extra = pool.acquire()
+    assert extra is not first
+
+    pool.release(first)
+    assert pool.acquire() is first
+
+def test_spsc_queue():
+    """Test SPSC queue ordering, bounds and close."""
+    import queue
+
+    q = SPSCQueue(2)
+    q.put(1)
+    q.put(2)
+    with pytest.raises(queue.Full):
+        q.put(3, timeout=0)
+
+    assert q.get() == 1
+    q.put(3)
+    assert q.get_many(8) == [2, 3]
+    assert len(q) == 0
+
+    q.close()
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0)
+
+def test_packet_ring():
+    """Test packet ring ordering, bounds and wrap-around batches."""
+    ring = PacketRing(3, payload_size=64)
+    assert ring.capacity == 4
+    for port in range(4):
+        assert ring.push(float(port), 100 + port, 1, port, 80, tcp_flags=0x12)
+    assert not ring.push(4.0, 104, 1, 4, 80)
+
+    packet = ring.pop()
+    assert packet.src_port is None and packet.protocol == "TCP"
+    assert packet.flags["SYN"] and packet.flags["ACK"] and not packet.flags["FIN"]
+    assert ring.push(4.0, 104, 2, 4, 53, payload=b"x" * 100)
+
+    batch = ring.pop_batch(8)
+    assert batch.src_ports.tolist() == [1, 2, 3, 4]
+    assert batch.sizes.tolist() == [101, 102, 103, 104]
+    assert batch.tcp_flags.tolist() == [0x12, 0x12, 0x12, 0]
+    assert batch.packets[-1].protocol == "UDP" and batch.packets[-1].flags == {}
+    assert batch.packets[-1].payload == b"x" * 64
+    assert ring.pop_batch(8) is None and ring.pop() is None
+
+def test_parse_ip_header():
+    """Test header parsing used by the raw-socket capture."""
+    pytest.importorskip("scapy.all")
+    from scapy.layers.inet import IP, TCP, UDP, ICMP
+    from netaudio.capture import parse_ip_header, PROTOCOL_CODES, TCP_FLAG_BITS
+
+    tcp = bytes(IP() / TCP(sport=1234, dport=80, flags="SA"))
+    syn_ack = 1 << TCP_FLAG_BITS["SYN"] | 1 << TCP_FLAG_BITS["ACK"]
+    assert parse_ip_header(tcp, 0, len(tcp)) == (PROTOCOL_CODES["TCP"], 1234, 80, syn_ack, 0, 0)
+
+    udp = b"\x00" * 14 + bytes(IP() / UDP(sport=53, dport=5353))
+    assert parse_ip_header(udp, 14, len(udp))[:3] == (PROTOCOL_CODES["UDP"], 53, 5353)
+
+    icmp = bytes(IP() / ICMP(type=3, code=1))
+    assert parse_ip_header(icmp, 0, len(icmp)) == (PROTOCOL_CODES["ICMP"], 0, 0, 0, 3, 1)
+    # Truncated transport header
+    assert parse_ip_header(tcp, 0, 24)[0] == PROTOCOL_CODES["UNKNOWN"]
+
+def test_pcap_reader_batch(tmp_path):
+    """Test reading a PCAP file in batches."""
+    scapy = pytest.importorskip("scapy.all")
+    from netaudio.capture import PcapReader
+
+    path = str(tmp_path / "udp.pcap")
+    scapy.wrpcap(path, [
+        scapy.Ether() / scapy.IP() / scapy.UDP(sport=1000 + i, dport=53)
+        for i in range(5)
+    ])
+
+    reader = PcapReader(path)
+    reader.start()
+    try:
+        first = reader.get_batch(3)
+        second = reader.get_batch(3)
+        assert len(first) == 3 and len(second) == 2
+        np.testing.assert_array_equal(first.src_ports, [1000, 1001, 1002])
+        assert reader.get_batch(3) is None
+    finally:
+        reader.stop()
+
+def test_window_processor():
+    """Test window statistics are interleaved per feature and follow eviction."""
+    processor = WindowProcessor(window_size=10.0, overlap=0.5)
+    samples = [(0.0, 1.0, 10.0), (2.5, 3.0, 20.0), (5.0, 5.0, 60.0), (12.0, 2.0, 5.0)]
+    results = [processor.process(FeatureSet({"a": a, "b": b}, t, {})) for t, a, b in samples]
+
+    # One window per 5 s step
+    assert results[0] is not None and results[1] is None
+
+    for result, window in ((results[2], samples[:3]), (results[3], samples[1:])):
+        expected = []
+        for values in ([a for _, a, _ in window], [b for _, _, b in window]):
+            expected += [np.mean(values), np.std(values), max(values), min(values)]
+        np.testing.assert_allclose(result, expected)
+
+    # The batch form emits the same windows
+    batch = FeatureBatch(
+        features={"a": np.array([a for _, a, _ in samples]), "b": np.array([b for _, _, b in samples])},
+        timestamps=np.array([t for t, _, _ in samples]),
+        metadata={}
+    )
+    windows = WindowProcessor(window_size=10.0, overlap=0.5).process_batch(batch)
+    emitted = [r for r in results if r is not None]
+    assert len(windows) == len(emitted)
+    for window, result in zip(windows, emitted):
+        np.testing.assert_allclose(window, result)
+
+def test_rolling_packet_stats():
+    """Test rolling byte and protocol totals."""
+    stats = RollingPacketStats(window=2)
+    for size, protocol in [(100, "TCP"), (200, "UDP"), (300, "UDP")]:
+        stats.add(PacketData(0.0, size, protocol, None, None, {}, b""))
+
+    assert len(stats) == 2
+    assert stats.total_bytes == 500
+    assert dict(stats.protocols) == {"UDP": 2}
+
+def test_alias_sampler():
+    """Test that alias sampling follows the weights."""
+    import random
+    from collections import Counter
+
+    sampler = AliasSampler(["a", "b", "c"], [3, 1, 0], rng=random.Random(0))
+    counts = Counter(sampler.draw_many(20000))
+
+    assert counts["c"] == 0
+    assert counts["a"] / counts["b"] == pytest.approx(3, rel=0.1)
+
+    with pytest.raises(ValueError):
+        AliasSampler(["a"], [0])